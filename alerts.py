@@ -0,0 +1,210 @@
+"""Evaluasi alert status part di latar belakang dan outbox alert.
+
+``scripts/alert_worker.py`` menjalankan ``AlertEvaluator.tick`` secara
+berkala tanpa perlu ada yang membuka dashboard. Setiap perubahan status part
+(mis. Warning -> Harus Ganti, atau kembali Normal setelah diganti) ditulis
+satu kali sebagai event ke outbox SQLite (``alerts.db``, env
+``PART_ALERT_DB``) bersama status terakhir per part, sehingga event tidak
+pernah dobel walaupun worker dijalankan ulang. Dashboard hanya membaca
+outbox ini.
+
+Biaya satu tick:
+
+- data, pembacaan meter dan tanggal tidak berubah: tidak ada yang dihitung
+- hari berganti: hanya part yang tanggal ganti atau tanggal Warning-nya
+  terlewati sejak tick terakhir, dicari lewat index jatuh tempo (O(log n + k))
+- data berubah (tulisan aplikasi, import, pembacaan meter baru): status
+  seluruh fleet dibandingkan dengan status terakhir di outbox
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from status_engine import STATUS_NAMES, compute_fleet_status
+
+DEFAULT_ALERT_DB = "alerts.db"
+ALERT_INTERVAL = 60  # detik antar tick worker
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def alert_db_file():
+    return os.environ.get("PART_ALERT_DB", DEFAULT_ALERT_DB)
+
+
+class AlertOutbox:
+    """Status alert terakhir per part dan event perubahan status (SQLite)"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS alert_state (
+            part_number TEXT PRIMARY KEY,
+            machine_name TEXT,
+            status TEXT NOT NULL,
+            since TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_alert_state_status ON alert_state (status);
+        CREATE TABLE IF NOT EXISTS alert_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created TEXT NOT NULL,
+            part_number TEXT NOT NULL,
+            machine_name TEXT,
+            previous_status TEXT,
+            status TEXT NOT NULL,
+            remaining_hours REAL,
+            replacement_date TEXT
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+    BUSY_TIMEOUT = 30
+
+    def __init__(self, db_file=None):
+        self.db_file = db_file or alert_db_file()
+        self._conn = sqlite3.connect(
+            self.db_file, timeout=self.BUSY_TIMEOUT, check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.RLock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _select(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def states(self):
+        """Status alert terakhir per ``part_number``"""
+        return dict(self._select("SELECT part_number, status FROM alert_state"))
+
+    def record(self, states, events, removed=(), now=None):
+        """Simpan perubahan status, event baru dan waktu tick dalam satu transaksi.
+
+        ``states`` berisi tuple (part_number, machine_name, status), ``events``
+        berisi tuple (part_number, machine_name, status lama, status baru,
+        sisa jam, tanggal ganti).
+        """
+        created = (now or datetime.now()).strftime(TIMESTAMP_FORMAT)
+        with self._transaction():
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO alert_state (part_number, machine_name, status, since) VALUES (?, ?, ?, ?)",
+                ((number, machine, status, created) for number, machine, status in states)
+            )
+            self._conn.executemany(
+                "DELETE FROM alert_state WHERE part_number = ?", ((number,) for number in removed)
+            )
+            self._conn.executemany(
+                "INSERT INTO alert_events (created, part_number, machine_name, previous_status, status, "
+                "remaining_hours, replacement_date) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((created,) + tuple(event) for event in events)
+            )
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_tick', ?)", (created,))
+
+    def active_counts(self):
+        """Jumlah part per status menurut evaluasi terakhir"""
+        counts = dict(self._select("SELECT status, COUNT(*) FROM alert_state GROUP BY status"))
+        return {name: counts.get(name, 0) for name in STATUS_NAMES}
+
+    def recent_events(self, limit=50):
+        """Event perubahan status terbaru (paling baru di atas)"""
+        rows = self._select(
+            "SELECT created, part_number, machine_name, previous_status, status, remaining_hours, "
+            "replacement_date FROM alert_events ORDER BY id DESC LIMIT ?", (limit,)
+        )
+        return pd.DataFrame(rows, columns=[
+            'created', 'part_number', 'machine_name', 'previous_status', 'status',
+            'remaining_hours', 'replacement_date'
+        ])
+
+    def last_tick(self):
+        rows = self._select("SELECT value FROM meta WHERE key = 'last_tick'")
+        return datetime.strptime(rows[0][0], TIMESTAMP_FORMAT) if rows else None
+
+    def close(self):
+        self._conn.close()
+
+
+_outboxes = {}
+_outboxes_lock = threading.Lock()
+
+
+def get_outbox():
+    """Outbox alert bersama per proses, None jika worker alert belum pernah berjalan"""
+    path = alert_db_file()
+    with _outboxes_lock:
+        outbox = _outboxes.get(path)
+        if outbox is None:
+            if not os.path.exists(path):
+                return None
+            outbox = _outboxes[path] = AlertOutbox(path)
+        return outbox
+
+
+class AlertEvaluator:
+    """Bandingkan status part dengan status terakhir di outbox dan tulis perubahannya"""
+
+    def __init__(self, fleet, outbox):
+        self.fleet = fleet
+        self.outbox = outbox
+        self._states = None  # salinan alert_state di memori
+        self._version = None  # versi data fleet saat evaluasi penuh terakhir
+        self._day = None  # tanggal (tengah malam) evaluasi terakhir
+
+    def tick(self, now=None):
+        """Satu putaran evaluasi; hasilnya list event yang ditulis ke outbox"""
+        now = now or datetime.now()
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        fleet = self.fleet.refresh()
+        if self._states is None:
+            self._states = self.outbox.states()
+
+        removed = []
+        if fleet.version != self._version or self._day is None:
+            status = fleet.fleet_status(now)
+            present = set(status['part_number'].astype(str))
+            removed = [number for number in self._states if number not in present]
+        elif today != self._day:
+            numbers = fleet.status_crossings(self._day, now)
+            status = compute_fleet_status([fleet.get(number) for number in numbers], now)
+        else:
+            self.outbox.record((), (), now=now)
+            return []
+
+        states, events = [], []
+        columns = ('part_number', 'machine_name', 'status', 'remaining_hours', 'replacement_date')
+        for number, machine, current, remaining, replacement in zip(*(status[c] for c in columns)):
+            number = str(number)
+            previous = self._states.get(number)
+            if previous == current:
+                continue
+            states.append((number, machine, current))
+            # Part baru yang masih Normal cukup dicatat statusnya, tanpa event
+            if previous is not None or current != "Normal":
+                events.append((
+                    number, machine, previous, current, float(remaining),
+                    replacement.strftime(TIMESTAMP_FORMAT)
+                ))
+
+        self.outbox.record(states, events, removed, now)
+        for number, _, current in states:
+            self._states[number] = current
+        for number in removed:
+            del self._states[number]
+        self._version = fleet.version
+        self._day = today
+        return events
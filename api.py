@@ -0,0 +1,345 @@
+"""HTTP API lokal (JSON) untuk integrasi MES dan sistem lain.
+
+Memakai logika dan storage yang sama dengan dashboard dan ``cli.py``
+(``fleet``, ``importer``; env ``PART_STORAGE``, ``PART_DATA_FILE``,
+``PART_DB_FILE``). Aplikasinya WSGI biasa (``PartApi``) yang dijalankan
+dengan server thread dari library standar, tanpa dependensi tambahan:
+
+- ``GET  /api/summary``        jumlah part per status (opsional ``by`` mesin/material/kategori)
+- ``GET  /api/parts``          satu halaman hasil filter (``status``, ``machine``, ``material``,
+                               ``category``, ``sort``, ``order``, ``offset``, ``limit``)
+- ``GET  /api/parts/<nomor>``  satu part beserta statusnya
+- ``GET  /api/search?q=...``   typeahead: nomor part teratas yang cocok (nomor, kode, mesin)
+- ``POST /api/parts``          upsert banyak part (list JSON); ``?dry_run=1`` hanya rencananya
+
+Data dibaca sekali ke ``Fleet`` bersama; setiap request hanya memeriksa
+apakah storage berubah (mtime/``data_version``), tidak membaca ulang file.
+Semua respons membawa ETag dari versi data dan tanggal status: request
+dengan ``If-None-Match`` yang sama dijawab ``304`` tanpa menghitung apa pun,
+dan body respons GET di-cache per ETag sehingga ratusan klien yang polling
+URL yang sama hanya dilayani dari cache. ``POST`` dengan ``If-Match`` ditolak
+``412`` jika data sudah berubah sejak ETag itu. Error dikembalikan sebagai
+``{"error": ...}``: ``400`` parameter/body tidak valid, ``404`` part atau
+endpoint tidak ada, ``409`` nomor part duplikat atau versi part bentrok.
+
+``ApiClient`` memanggil aplikasi langsung di proses yang sama (tanpa socket),
+misalnya untuk pengujian.
+
+Contoh:
+    python api.py --port 8502
+    curl "http://localhost:8502/api/parts?status=Warning&machine=Mesin%20A&limit=100"
+"""
+import argparse
+import io
+import json
+import sys
+import threading
+import uuid
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+from http import HTTPStatus
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlencode
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+from wsgiref.util import setup_testing_defaults
+
+from constants import GROUP_FIELDS, REPORT_COLUMNS, STATUS_NAMES
+from fleet import SORT_KEYS, get_fleet, status_groups
+from importer import MAX_REJECTED_ROWS, apply_upsert, plan_upsert_records
+from status_engine import compute_fleet_status
+from search import SEARCH_FIELDS, SEARCH_LIMIT
+from storage import DuplicatePartError, StaleRecordError
+
+DEFAULT_PORT = 8502
+MAX_PAGE_SIZE = 1000
+MAX_SEARCH_LIMIT = 100
+MAX_BODY_SIZE = 64 * 1024 * 1024  # byte
+RESPONSE_CACHE_SIZE = 256  # body GET per ETag
+
+
+class ApiError(Exception):
+    """Error yang dikembalikan ke klien sebagai ``{"error": ...}`` dengan status HTTP ``status``"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _status_line(status):
+    status = HTTPStatus(status)
+    return f"{status.value} {status.phrase}"
+
+
+def _part_items(status_frame):
+    """Record JSON per part: kolom laporan, tanggal sebagai teks"""
+    frame = status_frame[REPORT_COLUMNS].copy()
+    frame['replacement_date'] = frame['replacement_date'].dt.strftime("%Y-%m-%d")
+    return json.loads(frame.to_json(orient='records', force_ascii=False))
+
+
+class PartApi:
+    """Aplikasi WSGI di atas ``Fleet`` bersama"""
+
+    def __init__(self, fleet=None, backend=None, plants=None):
+        self.fleet = fleet or get_fleet(backend, plants)
+        # Versi data hanya berlaku di proses ini; token acak membedakan ETag antar proses
+        self._instance = uuid.uuid4().hex[:8]
+        self._responses = OrderedDict()
+        self._responses_lock = threading.Lock()
+        self._routes = {
+            ('GET', 'summary'): self.summary,
+            ('GET', 'parts'): self.parts,
+            ('GET', 'part'): self.part,
+            ('GET', 'search'): self.search,
+            ('POST', 'parts'): self.upsert,
+        }
+
+    def etag(self, now=None):
+        """ETag seluruh data: berubah jika data, hour meter atau tanggal status berubah"""
+        today = (now or datetime.now()).date()
+        return f'"{self._instance}-{self.fleet.version}-{today:%Y%m%d}"'
+
+    def __call__(self, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        try:
+            route, argument = self._route(environ.get('PATH_INFO', ''))
+            handler = self._routes.get((method, route))
+            if handler is None:
+                allowed = sorted(m for m, r in self._routes if r == route)
+                raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED,
+                               f"Metode {method} tidak didukung (pilih {', '.join(allowed)})")
+
+            self.fleet.refresh()
+            etag = self.etag()
+            if method == 'GET':
+                if etag in environ.get('HTTP_IF_NONE_MATCH', ''):
+                    start_response(_status_line(HTTPStatus.NOT_MODIFIED), [('ETag', etag)])
+                    return [b""]
+                key = (environ.get('PATH_INFO', ''), environ.get('QUERY_STRING', ''))
+                body = self._cached(etag, key)
+                if body is None:
+                    body = self._store(etag, key, self._encode(handler(self._query(environ), argument)))
+                status = HTTPStatus.OK
+            else:
+                expected = environ.get('HTTP_IF_MATCH')
+                if expected and expected.strip() != '*' and etag not in expected:
+                    raise ApiError(HTTPStatus.PRECONDITION_FAILED, "Data sudah berubah sejak ETag ini; baca ulang data")
+                status, result = handler(self._query(environ), self._body(environ))
+                body, etag = self._encode(result), self.etag()
+        except ApiError as e:
+            status, body, etag = e.status, self._encode({"error": str(e)}), None
+        except (StaleRecordError, DuplicatePartError) as e:
+            status, body, etag = HTTPStatus.CONFLICT, self._encode({"error": str(e)}), None
+
+        headers = [('Content-Type', 'application/json; charset=utf-8'), ('Content-Length', str(len(body)))]
+        if etag is not None:
+            headers += [('ETag', etag), ('Cache-Control', 'no-cache')]
+        start_response(_status_line(status), headers)
+        return [body]
+
+    @staticmethod
+    def _route(path):
+        """(nama route, argumen) dari path, mis. ``/api/parts/PN-1`` -> ('part', 'PN-1')"""
+        # wsgiref memberi PATH_INFO sebagai latin-1; nomor part bisa berisi UTF-8
+        parts = path.encode('latin-1').decode('utf-8', errors='replace').strip('/').split('/', 2)
+        if len(parts) >= 2 and parts[0] == 'api':
+            if len(parts) == 2 and parts[1] in ('summary', 'parts', 'search'):
+                return parts[1], None
+            if len(parts) == 3 and parts[1] == 'parts' and parts[2]:
+                return 'part', parts[2]
+        raise ApiError(HTTPStatus.NOT_FOUND, f"Endpoint tidak dikenal: {path}")
+
+    @staticmethod
+    def _query(environ):
+        return parse_qs(environ.get('QUERY_STRING', ''))
+
+    @staticmethod
+    def _body(environ):
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Content-Length tidak valid")
+        if length > MAX_BODY_SIZE:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Body maksimal {MAX_BODY_SIZE:,} byte")
+        try:
+            return json.loads(environ['wsgi.input'].read(length) or b"null")
+        except ValueError as e:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Body bukan JSON yang valid: {e}")
+
+    @staticmethod
+    def _encode(result):
+        return json.dumps(result, ensure_ascii=False, default=str).encode('utf-8')
+
+    def _cached(self, etag, key):
+        with self._responses_lock:
+            body = self._responses.get((etag, key))
+            if body is not None:
+                self._responses.move_to_end((etag, key))
+            return body
+
+    def _store(self, etag, key, body):
+        with self._responses_lock:
+            self._responses[(etag, key)] = body
+            while len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return body
+
+    @staticmethod
+    def _param(query, name, default=None, choices=None):
+        value = query.get(name, [default])[-1]
+        if choices is not None and value not in choices:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} harus salah satu dari {', '.join(choices)}")
+        return value
+
+    @staticmethod
+    def _int_param(query, name, default, minimum, maximum):
+        try:
+            value = int(query.get(name, [default])[-1])
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} harus bilangan bulat")
+        if not minimum <= value <= maximum:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} harus di antara {minimum} dan {maximum}")
+        return value
+
+    def _filters(self, query):
+        statuses = query.get('status', STATUS_NAMES)
+        unknown = [status for status in statuses if status not in STATUS_NAMES]
+        if unknown:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Status tidak dikenal: {', '.join(unknown)}")
+        return ([status for status in STATUS_NAMES if status in statuses],
+                self._param(query, 'machine', "All"), self._param(query, 'material', "All"),
+                self._param(query, 'category', "All"))
+
+    def summary(self, query, _):
+        """Jumlah part per status, dari cube index facet"""
+        filters = self._filters(query)
+        counts = self.fleet.aggregate('status', *filters)
+        result = {"date": datetime.now().strftime("%Y-%m-%d"), "total": sum(counts.values()), "counts": counts}
+        by = self._param(query, 'by', choices=(None,) + GROUP_FIELDS)
+        if by:
+            result["groups"] = status_groups(self.fleet, by, *filters)
+        return result
+
+    def parts(self, query, _):
+        """Satu halaman part yang lolos filter, urutan dan halaman di-cache di ``Fleet``"""
+        filters = self._filters(query)
+        sort = self._param(query, 'sort', 'remaining_hours', SORT_KEYS)
+        ascending = self._param(query, 'order', 'asc', ('asc', 'desc')) == 'asc'
+        offset = self._int_param(query, 'offset', 0, 0, sys.maxsize)
+        limit = self._int_param(query, 'limit', 50, 1, MAX_PAGE_SIZE)
+        page, total = self.fleet.page(*filters, sort=sort, ascending=ascending, offset=offset, limit=limit)
+        return {"total": total, "offset": offset, "limit": limit, "items": _part_items(page)}
+
+    def part(self, _, part_number):
+        """Satu part (lookup index ``part_number``) beserta status hari ini"""
+        try:
+            record = self.fleet.get(part_number)
+        except KeyError:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Part {part_number} tidak ditemukan")
+        item = _part_items(compute_fleet_status([record]))[0]
+        return dict(item, version=record.get('version', 0))
+
+    def search(self, query, _):
+        """Part teratas yang cocok dengan ``q`` lewat index pencarian, untuk typeahead klien"""
+        limit = self._int_param(query, 'limit', SEARCH_LIMIT, 1, MAX_SEARCH_LIMIT)
+        numbers = self.fleet.search(self._param(query, 'q', ''), limit)
+        return {"items": [{field: self.fleet.get(number).get(field) for field in SEARCH_FIELDS} for number in numbers]}
+
+    def upsert(self, query, body):
+        """Tambah part baru dan update part yang isinya berubah (sama dengan import mode sync)"""
+        parts = body.get('parts') if isinstance(body, dict) else body
+        if not isinstance(parts, list) or not all(isinstance(part, dict) for part in parts):
+            raise ApiError(HTTPStatus.BAD_REQUEST, 'Body harus list part atau {"parts": [...]}')
+
+        plan = plan_upsert_records(parts, self.fleet)
+        dry_run = self._param(query, 'dry_run', '0') not in ('0', 'false', '')
+        if not dry_run:
+            apply_upsert(plan, self.fleet)
+        rejected = plan.rejected_rows().rename(columns={'baris': 'index', 'alasan': 'reason'})
+        return HTTPStatus.OK, {
+            "dry_run": dry_run,
+            "received": plan.rows,
+            "new": plan.new,
+            "changed": plan.changed,
+            "unchanged": plan.unchanged,
+            "inserted": plan.inserted,
+            "updated": plan.updated,
+            "rejected": plan.rejected,
+            # Maksimal MAX_REJECTED_ROWS baris pertama yang ditolak beserta alasannya
+            "rejected_rows": json.loads(rejected.head(MAX_REJECTED_ROWS).to_json(orient='records', force_ascii=False)),
+        }
+
+
+Response = namedtuple('Response', ['status', 'headers', 'body'])
+
+
+class ApiClient:
+    """Klien in-process: memanggil aplikasi WSGI langsung, tanpa server dan socket"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def request(self, method, path, params=None, body=None, headers=None):
+        data = b"" if body is None else json.dumps(body).encode('utf-8')
+        path, _, query = path.partition('?')
+        if params:
+            query = "&".join(filter(None, [query, urlencode(params, doseq=True)]))
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': query,
+            'CONTENT_LENGTH': str(len(data)),
+            'CONTENT_TYPE': 'application/json',
+            'wsgi.input': io.BytesIO(data),
+        }
+        for name, value in (headers or {}).items():
+            environ['HTTP_' + name.upper().replace('-', '_')] = value
+        setup_testing_defaults(environ)
+
+        started = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            started['status'] = int(status.split()[0])
+            started['headers'] = dict(response_headers)
+
+        body = b"".join(self.app(environ, start_response))
+        return Response(started['status'], started['headers'], json.loads(body) if body else None)
+
+    def get(self, path, params=None, headers=None):
+        return self.request('GET', path, params, headers=headers)
+
+    def post(self, path, body, params=None, headers=None):
+        return self.request('POST', path, params, body, headers)
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="alamat yang didengarkan (default hanya lokal)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--backend", choices=["json", "sqlite", "sharded"], help="default env PART_STORAGE")
+    parser.add_argument("--plant", action="append", help="storage sharded: hanya plant ini (bisa diulang)")
+    parser.add_argument("--access-log", action="store_true", help="cetak setiap request ke stderr")
+    args = parser.parse_args(argv)
+
+    app = PartApi(backend=args.backend, plants=args.plant)
+    handler = WSGIRequestHandler if args.access_log else QuietRequestHandler
+    with make_server(args.host, args.port, app, ThreadingWSGIServer, handler) as server:
+        print(f"API part ({len(app.fleet):,} part) di http://{args.host}:{args.port}/api/", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
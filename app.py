@@ -1,12 +1,47 @@
 import streamlit as st
 import pandas as pd
-import json
-import csv
 from datetime import datetime, timedelta
-import plotly.express as px
-import plotly.graph_objects as go
-import time
-import os
+
+from status_engine import CATEGORIES, PART_COLUMNS, STATUS_EMOJI, STATUS_NAMES, compute_fleet_status
+from facets import facet_key
+from fleet import get_fleet
+from storage import StaleRecordError
+import diagnostics
+from diagnostics import span, timed
+
+# Pilihan urutan tabel dashboard -> kunci sort Fleet.page
+SORT_OPTIONS = {
+    "Sisa Usia (jam)": 'remaining_hours',
+    "Tanggal Ganti": 'replacement_date',
+    "Nama Mesin": 'machine_name',
+}
+ALERT_HISTORY = 20  # event alert terbaru yang ditampilkan di dashboard
+# Pengelompokan analitik riwayat penggantian -> kolom ReplacementHistory.summary
+HISTORY_GROUPS = {
+    "Kode Part": 'part_code',
+    "Material": 'material',
+    "Nama Mesin": 'machine_name',
+}
+HISTORY_CHART_GROUPS = 20  # kelompok dengan penggantian terbanyak di grafik MTBF
+SEARCH_RESULTS = 50  # hasil pencarian teratas yang bisa dipilih di halaman Edit
+BULK_EDIT_ROWS = 500  # baris maksimal di grid edit massal
+ALL_PLANTS = "Semua Plant"
+
+# Registry halaman: label menu -> nama method PartMonitoringSystem. Hanya
+# halaman yang dipilih yang dipanggil; modul sebuah halaman (importer, exporter,
+# meters, alerts, history, shards, plotly) di-import di dalam method yang memakainya.
+PAGES = {
+    "📊 Dashboard": "show_dashboard",
+    "📅 Jadwal Penggantian": "show_upcoming_replacements",
+    "➕ Input Data": "show_input_form",
+    "✏️ Edit Data": "show_edit_data",
+    "📈 Riwayat & MTBF": "show_replacement_history",
+    "📤 Upload CSV": "show_upload_data",
+    "📖 Manual Book": "show_manual_book",
+}
+# Halaman diagnostik hanya muncul jika PART_DIAGNOSTICS=1
+if diagnostics.ENABLED:
+    PAGES["🩺 Diagnostik"] = "show_diagnostics"
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -18,50 +53,78 @@ st.set_page_config(
 
 class PartMonitoringSystem:
     def __init__(self):
-        self.data_file = "parts_data.json"
-        self.parts_data = self.load_data()
+        try:
+            # Fleet di-cache per proses dan dipakai bersama semua session;
+            # backend dipilih lewat env PART_STORAGE (json/sqlite/sharded)
+            plants = self.select_plants()
+            with span("load_data"):
+                self.fleet = get_fleet(plants=plants)
+        except Exception as e:
+            st.error(f"Error loading data: {e}")
+            st.stop()
+        
+    def select_plants(self):
+        """Pilihan plant di sidebar untuk storage multi-plant; None = semua plant.
+
+        Hanya shard plant yang dipilih yang di-load untuk session ini.
+        """
+        from shards import list_shards, sharded_storage
+
+        if not sharded_storage():
+            return None
+        plant = st.sidebar.selectbox("🏭 Plant", [ALL_PLANTS] + list_shards(), key="plant")
+        return None if plant == ALL_PLANTS else [plant]
+    
+    @property
+    def parts_data(self):
+        """Semua record part dari cache fleet (jangan diubah langsung)"""
+        return self.fleet.parts
         
     def load_data(self):
-        """Load data dari file JSON"""
+        """Load ulang data part jika storage berubah"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
+            return self.fleet.refresh().parts
         except Exception as e:
             st.error(f"Error loading data: {e}")
             return []
     
-    def save_data(self):
-        """Simpan data ke file JSON"""
+    def save_data(self, parts=None):
+        """Simpan seluruh data (replace semua) ke storage"""
+        return self.write_data(self.fleet.replace_all, list(self.parts_data if parts is None else parts))
+    
+    def write_data(self, operation, *args):
+        """Jalankan satu operasi tulis storage, tampilkan error jika gagal"""
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.parts_data, f, indent=2, ensure_ascii=False)
+            operation(*args)
             return True
+        except StaleRecordError as e:
+            # Data di session ini sudah basi, mulai ulang dari data terbaru
+            st.session_state.pop('edit_base', None)
+            st.error(f"⚠️ {e}. Periksa data terbaru lalu ulangi perubahan.")
+            return False
         except Exception as e:
             st.error(f"Error saving data: {e}")
             return False
     
+    def show_history_error(self, part_number):
+        """Peringatan jika part sudah ditandai diganti tetapi riwayatnya gagal dicatat; True jika ada"""
+        error = self.fleet.pop_history_error(part_number)
+        if error is not None:
+            st.warning(f"⚠️ Riwayat penggantian part {part_number} gagal dicatat: {error}")
+        return error is not None
+    
     def calculate_remaining_hours(self, part):
-        """Hitung sisa usia pakai dalam jam"""
+        """Hitung sisa usia pakai dalam jam (jam aktual hour meter atau kalender operasi mesin)"""
         try:
-            install_date = datetime.strptime(part['install_date'], "%Y-%m-%d")
-            current_date = datetime.now()
-            days_passed = (current_date - install_date).days
-            hours_used = days_passed * 8  # Asumsi 8 jam operasi per hari
-            remaining_hours = part['recommended_usage'] - hours_used
-            return max(0, remaining_hours)
+            return compute_fleet_status([part])['remaining_hours'].iloc[0]
         except Exception as e:
             st.error(f"Error calculating remaining hours: {e}")
             return 0
     
     def calculate_replacement_date(self, part):
-        """Hitung tanggal penggantian"""
+        """Hitung tanggal penggantian (jam aktual hour meter atau kalender operasi mesin)"""
         try:
-            install_date = datetime.strptime(part['install_date'], "%Y-%m-%d")
-            recommended_days = part['recommended_usage'] / 8
-            replacement_date = install_date + timedelta(days=recommended_days)
-            return replacement_date
+            return compute_fleet_status([part])['replacement_date'].iloc[0].to_pydatetime()
         except Exception as e:
             st.error(f"Error calculating replacement date: {e}")
             return datetime.now()
@@ -75,78 +138,76 @@ class PartMonitoringSystem:
         else:
             return "Harus Ganti", "🔴", "red"
     
+    @timed("dashboard.sidebar")
     def show_sidebar_filters(self):
         """Tampilkan filter di sidebar"""
         st.sidebar.title("🔧 Part Monitoring System")
         st.sidebar.markdown("---")
         
+        # Index facet: jumlah part per nilai filter tanpa scan seluruh data
+        facets = self.fleet.facets()
+        
         # Status filter
         st.sidebar.subheader("📊 Filter Status")
         status_filter = st.sidebar.multiselect(
             "Pilih Status:",
             ["Normal", "Warning", "Harus Ganti"],
-            default=["Normal", "Warning", "Harus Ganti"]
+            default=["Normal", "Warning", "Harus Ganti"],
+            format_func=lambda status: f"{status} ({facets.status_count(status):,})"
         )
         
         # Data filters
         st.sidebar.subheader("🔍 Filter Data")
         
-        # Get unique values for filters
-        if self.parts_data:
-            machines = ["All"] + sorted(list(set(p['machine_name'] for p in self.parts_data)))
-            materials = ["All"] + sorted(list(set(p['material'] for p in self.parts_data)))
-            categories = ["All"] + sorted(list(set(p['category'] for p in self.parts_data)))
-        else:
-            machines = materials = categories = ["All"]
-        
-        selected_machine = st.sidebar.selectbox("Nama Mesin", machines)
-        selected_material = st.sidebar.selectbox("Material Part", materials)
-        selected_category = st.sidebar.selectbox("Kategori Part", categories)
+        selected_machine = self.facet_selectbox("Nama Mesin", 'machine_name')
+        selected_material = self.facet_selectbox("Material Part", 'material')
+        selected_category = self.facet_selectbox("Kategori Part", 'category')
         
         return status_filter, selected_machine, selected_material, selected_category
     
+    def facet_selectbox(self, label, field, container=st.sidebar):
+        """Selectbox filter dengan jumlah part per opsi, misalnya 'Suzuki (1,204)'"""
+        options = self.fleet.facet_options(field)
+        labels = {key: f"{name} ({count:,})" for key, name, count in options}
+        return container.selectbox(
+            label, ["All"] + [key for key, _, _ in options],
+            format_func=lambda key: labels.get(key, key)
+        )
+    
+    @timed("dashboard.filter")
     def apply_filters(self, status_filter, selected_machine, selected_material, selected_category):
-        """Terapkan filter pada data"""
-        filtered_data = []
-        
-        for part in self.parts_data:
-            # Calculate status for each part
-            remaining_hours = self.calculate_remaining_hours(part)
-            status, _, _ = self.get_status(remaining_hours)
-            
-            # Apply filters
-            status_match = status in status_filter
-            machine_match = selected_machine == "All" or part['machine_name'] == selected_machine
-            material_match = selected_material == "All" or part['material'] == selected_material
-            category_match = selected_category == "All" or part['category'] == selected_category
-            
-            if status_match and machine_match and material_match and category_match:
-                filtered_data.append(part)
-                
-        return filtered_data
+        """Terapkan filter pada data, hasilnya DataFrame status yang terfilter"""
+        try:
+            return self.fleet.query(status_filter, selected_machine, selected_material, selected_category)
+        except Exception as e:
+            st.error(f"Error filtering data: {e}")
+            return compute_fleet_status([])
+    
+    def load_predictions(self):
+        """Prediksi sisa usia seluruh fleet (mode prediktif), None jika model umur belum ada"""
+        try:
+            return self.fleet.predictions()
+        except Exception as e:
+            st.warning(f"Mode prediktif tidak tersedia: {e}")
+            return None
     
+    @timed("page.dashboard")
     def show_dashboard(self):
         """Tampilkan dashboard utama"""
         st.title("🔧 Dashboard Monitoring Part Mesin")
         
         # Sidebar filters
         status_filter, selected_machine, selected_material, selected_category = self.show_sidebar_filters()
-        
-        # Apply filters
-        filtered_data = self.apply_filters(status_filter, selected_machine, selected_material, selected_category)
+        filters = (status_filter, selected_machine, selected_material, selected_category)
         
         # KPI Cards
         st.subheader("📈 Key Performance Indicators")
         col1, col2, col3, col4 = st.columns(4)
         
-        total_parts = len(filtered_data)
-        
-        # Calculate status counts
-        status_counts = {"Normal": 0, "Warning": 0, "Harus Ganti": 0}
-        for part in filtered_data:
-            remaining_hours = self.calculate_remaining_hours(part)
-            status, _, _ = self.get_status(remaining_hours)
-            status_counts[status] += 1
+        # Calculate status counts (cube jumlah part, tanpa scan data yang terfilter)
+        with span("dashboard.kpi"):
+            status_counts = self.fleet.aggregate('status', *filters)
+        total_parts = sum(status_counts.values())
         
         with col1:
             st.metric(
@@ -181,105 +242,365 @@ class PartMonitoringSystem:
                 help="Part dengan sisa usia = 0 jam"
             )
         
+        from meters import get_meters
+
+        meters = get_meters()
+        if len(meters):
+            st.caption(
+                f"⏱️ Sisa usia part di {len(meters)} mesin dihitung dari jam aktual hour meter "
+                f"(pembacaan terakhir {meters.latest['timestamp'].max():%d/%m/%Y %H:%M})"
+            )
+        
+        # Mode prediktif: aktif jika model umur sudah dilatih (scripts/train_life_model.py)
+        with span("dashboard.prediction"):
+            predictions = self.load_predictions()
+            predicted_counts = self.fleet.predicted_counts(*filters) if predictions is not None else None
+        if predicted_counts is not None:
+            st.caption(
+                "🔮 Mode prediktif: sisa usia juga diprediksi dari riwayat penggantian "
+                "(material, kategori, mesin, kode part)"
+            )
+            col1, col2, col3 = st.columns(3)
+            for col, name in zip((col1, col2, col3), STATUS_NAMES):
+                with col:
+                    st.metric(
+                        f"{name} (prediksi)",
+                        predicted_counts[name],
+                        delta=predicted_counts[name] - status_counts[name],
+                        delta_color="off",
+                        help="Jumlah part menurut sisa usia prediksi; delta terhadap sisa usia nominal"
+                    )
+        
         # Visualizations
-        if filtered_data:
-            col1, col2 = st.columns(2)
+        with span("dashboard.charts"):
+            if total_parts:
+                # Plotly hanya di-import saat grafik pertama kali digambar
+                import plotly.express as px
+                
+                col1, col2 = st.columns(2)
             
-            with col1:
-                # Status Distribution Pie Chart
-                fig_pie = px.pie(
-                    values=list(status_counts.values()),
-                    names=list(status_counts.keys()),
-                    title="Distribusi Status Part",
-                    color=list(status_counts.keys()),
-                    color_discrete_map={
-                        "Normal": "#00FF00",
-                        "Warning": "#FFA500", 
-                        "Harus Ganti": "#FF0000"
-                    }
-                )
-                fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig_pie, use_container_width=True)
+                with col1:
+                    # Status Distribution Pie Chart
+                    fig_pie = px.pie(
+                        values=list(status_counts.values()),
+                        names=list(status_counts.keys()),
+                        title="Distribusi Status Part",
+                        color=list(status_counts.keys()),
+                        color_discrete_map={
+                            "Normal": "#00FF00",
+                            "Warning": "#FFA500", 
+                            "Harus Ganti": "#FF0000"
+                        }
+                    )
+                    fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+                    st.plotly_chart(fig_pie, use_container_width=True)
             
-            with col2:
-                # Category Distribution
-                category_data = {}
-                for part in filtered_data:
-                    category = part['category']
-                    category_data[category] = category_data.get(category, 0) + 1
+                with col2:
+                    # Category Distribution
+                    category_data = self.fleet.aggregate('category', *filters)
                 
-                if category_data:
-                    fig_bar = px.bar(
-                        x=list(category_data.keys()),
-                        y=list(category_data.values()),
-                        title="Distribusi Part per Kategori",
-                        labels={'x': 'Kategori', 'y': 'Jumlah Part'},
-                        color=list(category_data.keys())
-                    )
-                    st.plotly_chart(fig_bar, use_container_width=True)
+                    if category_data:
+                        fig_bar = px.bar(
+                            x=list(category_data.keys()),
+                            y=list(category_data.values()),
+                            title="Distribusi Part per Kategori",
+                            labels={'x': 'Kategori', 'y': 'Jumlah Part'},
+                            color=list(category_data.keys())
+                        )
+                        st.plotly_chart(fig_bar, use_container_width=True)
         
         # Data Table dengan Status Visual
         st.subheader("📋 Data Monitoring Part")
         
-        if filtered_data:
-            # Prepare data for display dengan status
-            display_data = []
-            for part in filtered_data:
-                remaining_hours = self.calculate_remaining_hours(part)
-                replacement_date = self.calculate_replacement_date(part)
-                status, emoji, color = self.get_status(remaining_hours)
-                
-                display_data.append({
-                    'No Part': part['part_number'],
-                    'Kode Part': part['part_code'],
-                    'Nama Mesin': part['machine_name'],
-                    'Material': part['material'],
-                    'Tanggal Pasang': part['install_date'],
-                    'Rekomendasi (jam)': part['recommended_usage'],
-                    'Kategori': part['category'],
-                    'Tanggal Ganti': replacement_date.strftime("%Y-%m-%d"),
-                    'Sisa Usia (jam)': remaining_hours,
-                    'Status': status,
-                    'Status Icon': emoji,
-                    'Color': color
-                })
-            
-            df = pd.DataFrame(display_data)
-            
-            # Tampilkan tabel dengan styling
-            st.dataframe(
-                df[[
+        if total_parts:
+            # Hanya satu halaman yang dibentuk untuk ditampilkan
+            col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+            with col1:
+                sort_label = st.selectbox("Urutkan berdasarkan", list(SORT_OPTIONS))
+            with col2:
+                ascending = st.radio("Urutan", ["Naik", "Turun"], horizontal=True) == "Naik"
+            with col3:
+                page_size = st.selectbox("Baris per halaman", [25, 50, 100, 250], index=1)
+            total_pages = max(1, -(-total_parts // page_size))
+            with col4:
+                page_number = st.number_input("Halaman", min_value=1, value=1, step=1)
+            # Nomor halaman lama bisa melewati jumlah halaman setelah filter diubah
+            page_number = min(int(page_number), total_pages)
+            
+            offset = (page_number - 1) * page_size
+            with span("dashboard.table"):
+                page_data, total_rows = self.fleet.page(
+                    *filters, sort=SORT_OPTIONS[sort_label], ascending=ascending, offset=offset, limit=page_size
+                )
+            
+                table = self.display_frame(page_data)
+                columns = [
                     'No Part', 'Kode Part', 'Nama Mesin', 'Material', 
                     'Tanggal Pasang', 'Rekomendasi (jam)', 'Kategori',
                     'Tanggal Ganti', 'Sisa Usia (jam)', 'Status Icon'
-                ]],
-                use_container_width=True,
-                height=400
+                ]
+                if predictions is not None:
+                    # Prediksi sudah di-cache untuk seluruh fleet; cukup lookup baris halaman ini
+                    table['Prediksi Sisa (jam)'] = predictions['predicted_remaining'].reindex(
+                        page_data['part_number'].astype(str)
+                    ).round().to_numpy()
+                    columns.insert(columns.index('Sisa Usia (jam)') + 1, 'Prediksi Sisa (jam)')
+                
+                # Tampilkan tabel dengan styling
+                st.dataframe(
+                    table[columns],
+                    use_container_width=True,
+                    height=400,
+                    hide_index=True
+                )
+            st.caption(
+                f"Menampilkan {offset + 1:,}–{offset + len(page_data):,} dari {total_rows:,} part "
+                f"(halaman {page_number} dari {total_pages})"
             )
             
-            # Download button
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="📥 Download Data sebagai CSV",
-                data=csv,
-                file_name="part_monitoring_data.csv",
-                mime="text/csv",
-                help="Download data monitoring dalam format CSV"
+            # Export hanya dibuat saat diminta, ditulis bertahap ke file sementara
+            self.show_export(
+                lambda: self.apply_filters(*filters),
+                (self.fleet.version, datetime.now().date(), tuple(status_filter),
+                 selected_machine, selected_material, selected_category)
             )
-            
-            # Blinking alert untuk part yang harus diganti
-            if status_counts["Harus Ganti"] > 0:
-                with st.container():
-                    st.markdown("---")
-                    # Blinking effect
-                    if int(time.time()) % 2 == 0:
-                        st.error(f"🚨 **PERINGATAN**: {status_counts['Harus Ganti']} part harus segera diganti!")
-                    else:
-                        st.warning(f"⚠️ **PERINGATAN**: {status_counts['Harus Ganti']} part harus segera diganti!")
                     
         else:
             st.info("📝 Tidak ada data yang sesuai dengan filter yang dipilih.")
+        
+        self.show_alerts(status_counts)
+    
+    def show_alerts(self, status_counts):
+        """Alert part yang harus diganti, dibaca dari outbox worker alert"""
+        from alerts import get_outbox
+
+        outbox = get_outbox()
+        st.markdown("---")
+        if outbox is None:
+            # Worker alert belum pernah berjalan: pakai hitungan dashboard yang sudah ada
+            if status_counts["Harus Ganti"] > 0:
+                st.error(f"🚨 **PERINGATAN**: {status_counts['Harus Ganti']} part harus segera diganti!")
+            st.caption("Riwayat alert tersedia setelah worker alert dijalankan (scripts/alert_worker.py).")
+            return
+        
+        active = outbox.active_counts()
+        if active["Harus Ganti"] > 0:
+            st.error(f"🚨 **PERINGATAN**: {active['Harus Ganti']} part harus segera diganti!")
+        last_tick = outbox.last_tick()
+        if last_tick:
+            st.caption(f"Alert dievaluasi terakhir {last_tick:%d/%m/%Y %H:%M}")
+        
+        events = outbox.recent_events(ALERT_HISTORY)
+        if not events.empty:
+            with st.expander(f"🔔 Riwayat Alert ({len(events)} terbaru)"):
+                st.dataframe(
+                    pd.DataFrame({
+                        'Waktu': events['created'],
+                        'No Part': events['part_number'],
+                        'Nama Mesin': events['machine_name'],
+                        'Dari': events['previous_status'].fillna("-"),
+                        'Menjadi': events['status'].map(lambda s: f"{STATUS_EMOJI[s]} {s}"),
+                        'Sisa Usia (jam)': events['remaining_hours'],
+                    }),
+                    use_container_width=True,
+                    hide_index=True
+                )
+    
+    @timed("table.format")
+    def display_frame(self, status_frame):
+        """Kolom tampilan (bahasa Indonesia) dari DataFrame status part"""
+        return pd.DataFrame({
+            'No Part': status_frame['part_number'],
+            'Kode Part': status_frame['part_code'],
+            'Nama Mesin': status_frame['machine_name'],
+            'Material': status_frame['material'],
+            'Tanggal Pasang': status_frame['install_date'],
+            'Rekomendasi (jam)': status_frame['recommended_usage'],
+            'Kategori': status_frame['category'],
+            'Tanggal Ganti': status_frame['replacement_date'].dt.strftime("%Y-%m-%d"),
+            'Sisa Usia (jam)': status_frame['remaining_hours'],
+            'Status': status_frame['status'],
+            'Status Icon': status_frame['status_icon'],
+            'Color': status_frame['color']
+        })
+    
+    def show_export(self, load_data, data_key):
+        """Tombol export CSV/Parquet/Excel; data diambil dan file dibuat hanya saat tombol ditekan"""
+        from exporter import EXPORT_FORMATS, export_bytes
+
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            export_format = st.selectbox("Format Export", list(EXPORT_FORMATS))
+        export_key = data_key + (export_format,)
+        extension, mime = EXPORT_FORMATS[export_format]
+        
+        with col2:
+            st.write("")
+            if st.button("📦 Siapkan File Export", help="Buat file export dari data yang terfilter"):
+                with st.spinner("Membuat file export..."):
+                    data = export_bytes(load_data(), export_format, transform=self.display_frame)
+                # Download Streamlit selalu disajikan dari memori; hanya export terakhir yang disimpan per sesi
+                st.session_state['export'] = (export_key, data)
+            
+            export = st.session_state.get('export')
+            if export is not None and export[0] == export_key:
+                st.download_button(
+                    label=f"📥 Download Data sebagai {export_format}",
+                    data=export[1],
+                    file_name=f"part_monitoring_data.{extension}",
+                    mime=mime,
+                    help="Download data monitoring yang terfilter"
+                )
     
+    @timed("page.upcoming")
+    def show_upcoming_replacements(self):
+        """Tampilkan part yang akan jatuh tempo penggantian, dikelompokkan per minggu"""
+        st.title("📅 Jadwal Penggantian Part")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            days = st.slider("Jatuh tempo dalam (hari)", min_value=7, max_value=180, value=30, step=7)
+        with col2:
+            machine = self.facet_selectbox("Nama Mesin", 'machine_name', container=st)
+        
+        # Index jatuh tempo: hanya part yang jatuh tempo yang diambil dan dihitung
+        due_data = self.fleet.due_within(days, machine)
+        if due_data.empty:
+            st.info(f"📝 Tidak ada part yang jatuh tempo dalam {days} hari.")
+            return
+        
+        overdue = due_data['remaining_hours'] == 0
+        col1, col2 = st.columns(2)
+        col1.metric("🔴 Sudah Harus Ganti", f"{int(overdue.sum()):,}")
+        col2.metric(f"📅 Jatuh Tempo {days} Hari ke Depan", f"{int((~overdue).sum()):,}")
+        
+        # Sisa usia mencapai 0 pada tengah malam pertama setelah tanggal ganti
+        due_day = due_data['replacement_date'].dt.ceil('D')
+        week_start = due_day - pd.to_timedelta(due_day.dt.weekday, unit='D')
+        table = self.display_frame(due_data)
+        columns = ['No Part', 'Kode Part', 'Nama Mesin', 'Kategori', 'Tanggal Ganti', 'Sisa Usia (jam)', 'Status Icon']
+        
+        if overdue.any():
+            st.subheader(f"🔴 Sudah Jatuh Tempo ({int(overdue.sum()):,} part)")
+            st.dataframe(table[overdue.to_numpy()][columns], use_container_width=True, hide_index=True)
+        
+        upcoming = ~overdue.to_numpy()
+        for start, rows in table[upcoming].groupby(week_start[upcoming], sort=True):
+            end = start + timedelta(days=6)
+            st.subheader(f"📆 Minggu {start:%d %b %Y} – {end:%d %b %Y} ({len(rows):,} part)")
+            st.dataframe(rows[columns], use_container_width=True, hide_index=True)
+        
+        # Tandai diganti langsung dari jadwal; index jatuh tempo di-update per part
+        st.markdown("---")
+        st.subheader("✅ Tandai Part Sudah Diganti")
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            part_number = st.selectbox(
+                "Pilih Part",
+                options=list(due_data['part_number']),
+                format_func=lambda number: f"{number} - {self.fleet.get(number)['machine_name']}"
+            )
+        with col2:
+            st.write("")
+            if st.button("✅ Tandai Sudah Diganti"):
+                if self.write_data(self.fleet.mark_replaced, part_number, datetime.now().strftime("%Y-%m-%d")):
+                    st.success("✅ Part berhasil ditandai sebagai sudah diganti!")
+                    if not self.show_history_error(part_number):
+                        st.rerun()
+    
+    @timed("page.history")
+    def show_replacement_history(self):
+        """Analitik riwayat penggantian: umur aktual vs rekomendasi, MTBF dan gagal dini"""
+        from history import EARLY_FAILURE_RATIO, get_history
+
+        st.title("📈 Riwayat Penggantian & MTBF")
+        
+        history = get_history()
+        if not len(history):
+            st.info("📝 Belum ada riwayat penggantian. Riwayat tercatat setiap kali part ditandai sudah diganti.")
+            return
+        
+        first, last = history.period()
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            group_label = st.selectbox("Kelompokkan per", list(HISTORY_GROUPS))
+        with col2:
+            period = st.date_input("Periode penggantian", value=(first, last))
+        with col3:
+            min_events = st.number_input("Minimal penggantian per kelompok", min_value=1, value=1, step=1)
+        # Rentang tanggal baru terisi setelah tanggal kedua dipilih
+        start, end = (period[0], period[-1]) if isinstance(period, (tuple, list)) and period else (first, last)
+        
+        with span("history.summary"):
+            totals = history.summary(None, start, end)
+            summary = history.summary(HISTORY_GROUPS[group_label], start, end, int(min_events))
+        if totals.empty:
+            st.info("📝 Tidak ada penggantian dengan data valid pada periode ini.")
+            return
+        
+        total = totals.iloc[0]
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Penggantian", f"{int(total['replacements']):,}")
+        col2.metric("MTBF (jam)", f"{total['mtbf']:,.0f}", help="Rata-rata jam operasi per lifecycle part")
+        col3.metric(
+            "Umur Aktual / Rekomendasi", f"{total['life_ratio']:.0%}",
+            help="Total jam operasi aktual dibagi total jam rekomendasi"
+        )
+        col4.metric(
+            "Gagal Dini", f"{total['early_failure_rate']:.1%}",
+            help=f"Diganti sebelum {EARLY_FAILURE_RATIO:.0%} jam rekomendasi"
+        )
+        
+        group_field = HISTORY_GROUPS[group_label]
+        if not summary.empty:
+            # Plotly hanya di-import saat grafik digambar
+            import plotly.express as px
+            
+            top = summary.head(HISTORY_CHART_GROUPS)
+            chart = top.melt(
+                id_vars=[group_field], value_vars=['mtbf', 'recommended_usage'],
+                var_name='Jenis', value_name='Jam'
+            ).replace({'Jenis': {'mtbf': "MTBF aktual", 'recommended_usage': "Rekomendasi"}})
+            fig = px.bar(
+                chart, x=group_field, y='Jam', color='Jenis', barmode='group',
+                title=f"MTBF vs Rekomendasi per {group_label} ({len(top)} kelompok teratas)",
+                labels={group_field: group_label}
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        
+        st.dataframe(
+            pd.DataFrame({
+                group_label: summary[group_field],
+                'Penggantian': summary['replacements'],
+                'MTBF (jam)': summary['mtbf'].round(),
+                'Median Umur (jam)': summary['median_hours'].round(),
+                'Rekomendasi (jam)': summary['recommended_usage'].round(),
+                'Aktual / Rekomendasi (%)': (summary['life_ratio'] * 100).round(1),
+                'Gagal Dini (%)': (summary['early_failure_rate'] * 100).round(1),
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        # Riwayat satu part lewat index offset per part
+        st.markdown("---")
+        st.subheader("🔎 Riwayat per Part")
+        part_number = st.text_input("Nomor Part", help="Semua lifecycle part ini yang sudah selesai")
+        if part_number:
+            lifecycles = history.part_events(part_number.strip())
+            if lifecycles.empty:
+                st.info(f"📝 Part {part_number} belum pernah ditandai sudah diganti.")
+            else:
+                st.dataframe(pd.DataFrame({
+                    'Tanggal Pasang': lifecycles['install_date'].dt.strftime("%d/%m/%Y"),
+                    'Tanggal Ganti': lifecycles['replaced_date'].dt.strftime("%d/%m/%Y"),
+                    'Nama Mesin': lifecycles['machine_name'],
+                    'Umur Aktual (jam)': lifecycles['actual_hours'].round(),
+                    'Rekomendasi (jam)': lifecycles['recommended_usage'],
+                    'Aktual / Rekomendasi (%)': (lifecycles['life_ratio'] * 100).round(1),
+                }), use_container_width=True, hide_index=True)
+    
+    @timed("page.input")
     def show_input_form(self):
         """Tampilkan form input data part baru"""
         st.title("➕ Input Data Part Baru")
@@ -305,7 +626,7 @@ class PartMonitoringSystem:
                 )
                 category = st.selectbox(
                     "Kategori Part*", 
-                    ["Mechanical", "Electrical", "Pneumatic"],
+                    CATEGORIES,
                     help="Pilih kategori part"
                 )
             
@@ -314,7 +635,7 @@ class PartMonitoringSystem:
             if submitted:
                 if all([part_number, part_code, machine_name, material]):
                     # Check for duplicate part number
-                    if any(p['part_number'] == part_number for p in self.parts_data):
+                    if part_number in self.fleet:
                         st.error("❌ Nomor Part sudah ada dalam database!")
                     else:
                         new_part = {
@@ -327,8 +648,7 @@ class PartMonitoringSystem:
                             'category': category
                         }
                         
-                        self.parts_data.append(new_part)
-                        if self.save_data():
+                        if self.write_data(self.fleet.insert, new_part):
                             st.success("✅ Data part berhasil disimpan!")
                             st.balloons()
                         else:
@@ -336,23 +656,53 @@ class PartMonitoringSystem:
                 else:
                     st.error("❌ Semua field bertanda * harus diisi!")
     
+    @timed("page.edit")
     def show_edit_data(self):
         """Tampilkan form edit data part"""
         st.title("✏️ Edit Data Part")
         
-        if not self.parts_data:
+        if not len(self.fleet):
             st.info("📝 Tidak ada data part untuk diedit.")
             return
         
+        mode = st.radio("Mode Edit", ["Satu Part", "Edit Massal (Grid)"], horizontal=True)
+        if mode == "Satu Part":
+            self.show_single_edit()
+        else:
+            self.show_bulk_edit()
+    
+    def show_single_edit(self):
+        """Cari part lewat index pencarian lalu edit lewat form"""
+        # Hanya hasil teratas yang dikirim ke selectbox, bukan seluruh part
+        query = st.text_input(
+            "Cari Part", key="edit_search",
+            placeholder="Ketik nomor part, kode part atau nama mesin lalu tekan Enter"
+        )
+        if not query.strip():
+            st.caption(f"Cari di antara {len(self.fleet):,} part.")
+            return
+        matches = self.fleet.search(query, SEARCH_RESULTS)
+        if not matches:
+            st.warning(f"Tidak ada part yang cocok dengan '{query}'.")
+            return
+        
         # Pilih part untuk diedit
-        part_options = {f"{p['part_number']} - {p['machine_name']}": p for p in self.parts_data}
-        selected_part_key = st.selectbox(
-            "Pilih Part untuk Diedit:",
-            options=list(part_options.keys())
+        selected_part_number = st.selectbox(
+            f"Pilih Part untuk Diedit ({len(matches)} hasil teratas):",
+            options=matches,
+            format_func=lambda number: (
+                f"{number} - {self.fleet.get(number)['part_code']} - {self.fleet.get(number)['machine_name']}"
+            )
         )
         
-        if selected_part_key:
-            selected_part = part_options[selected_part_key]
+        if selected_part_number:
+            selected_part = self.fleet.get(selected_part_number)
+            original_part_number = selected_part['part_number']
+            
+            # Simpan record saat mulai diedit untuk mendeteksi perubahan operator lain
+            if st.session_state.get('edit_base', {}).get('part_number') != original_part_number:
+                st.session_state['edit_base'] = dict(selected_part)
+            base_part = st.session_state['edit_base']
             
             with st.form("edit_part_form"):
                 st.subheader(f"Edit Data: {selected_part['part_number']}")
@@ -377,8 +727,8 @@ class PartMonitoringSystem:
                     )
                     new_category = st.selectbox(
                         "Kategori Part*", 
-                        ["Mechanical", "Electrical", "Pneumatic"],
-                        index=["Mechanical", "Electrical", "Pneumatic"].index(selected_part['category'])
+                        CATEGORIES,
+                        index=CATEGORIES.index(selected_part['category'])
                     )
                 
                 col1, col2, col3 = st.columns(3)
@@ -393,7 +743,7 @@ class PartMonitoringSystem:
                 if update_submitted:
                     if all([new_part_number, new_part_code, new_machine_name, new_material]):
                         # Update data
-                        selected_part.update({
+                        updated_part = dict(selected_part, **{
                             'part_number': new_part_number,
                             'part_code': new_part_code,
                             'machine_name': new_machine_name,
@@ -403,7 +753,8 @@ class PartMonitoringSystem:
                             'category': new_category
                         })
                         
-                        if self.save_data():
+                        if self.write_data(self.fleet.merge_update, original_part_number, base_part, updated_part):
+                            st.session_state.pop('edit_base', None)
                             st.success("✅ Data part berhasil diupdate!")
                             st.rerun()
                         else:
@@ -414,8 +765,7 @@ class PartMonitoringSystem:
                 if delete_submitted:
                     # Konfirmasi penghapusan
                     if st.checkbox("✅ Konfirmasi penghapusan part"):
-                        self.parts_data.remove(selected_part)
-                        if self.save_data():
+                        if self.write_data(self.fleet.delete, original_part_number, base_part.get('version', 0)):
                             st.success("✅ Part berhasil dihapus!")
                             st.rerun()
                         else:
@@ -423,22 +773,116 @@ class PartMonitoringSystem:
                 
                 if mark_replaced:
                     # Tandai part sudah diganti (reset tanggal pemasangan)
-                    selected_part['install_date'] = datetime.now().strftime("%Y-%m-%d")
-                    if self.save_data():
+                    if self.write_data(self.fleet.mark_replaced, original_part_number, datetime.now().strftime("%Y-%m-%d")):
+                        st.session_state.pop('edit_base', None)
                         st.success("✅ Part berhasil ditandai sebagai sudah diganti!")
-                        st.rerun()
+                        if not self.show_history_error(original_part_number):
+                            st.rerun()
                     else:
                         st.error("❌ Gagal menandai part!")
     
+    def show_bulk_edit(self):
+        """Grid editor untuk banyak part; hanya baris yang berubah yang disimpan dalam satu tulisan"""
+        from importer import apply_upsert, plan_edits
+
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            query = st.text_input(
+                "Cari Part", key="bulk_search",
+                placeholder="Nomor part, kode part atau nama mesin"
+            )
+        with col2:
+            machine = self.facet_selectbox("Nama Mesin", 'machine_name', container=st)
+        
+        if query.strip():
+            numbers = self.fleet.search(query, BULK_EDIT_ROWS)
+            if machine != "All":
+                numbers = [n for n in numbers if facet_key(self.fleet.get(n)['machine_name']) == machine]
+        elif machine != "All":
+            numbers = self.fleet.query(STATUS_NAMES, machine)['part_number'].head(BULK_EDIT_ROWS).tolist()
+        else:
+            st.info("🔍 Cari part atau pilih mesin untuk membuka grid edit massal.")
+            return
+        if not numbers:
+            st.warning("Tidak ada part yang cocok.")
+            return
+        
+        # Record saat grid dibuka disimpan per pencarian: versinya dipakai untuk
+        # mendeteksi perubahan operator lain saat disimpan
+        key = (st.session_state.get('plant'), query.strip(), machine)
+        if st.session_state.get('bulk_base', (None,))[0] != key:
+            records = [self.fleet.get(number) for number in numbers]
+            base = pd.DataFrame.from_records(records, columns=PART_COLUMNS)
+            base['version'] = [record.get('version', 0) for record in records]
+            st.session_state['bulk_base'] = (key, base)
+            st.session_state['bulk_generation'] = st.session_state.get('bulk_generation', 0) + 1
+        base = st.session_state['bulk_base'][1]
+        
+        grid = base[PART_COLUMNS].copy()
+        grid['install_date'] = pd.to_datetime(grid['install_date'], format="%Y-%m-%d", errors='coerce').dt.date
+        grid['recommended_usage'] = pd.to_numeric(grid['recommended_usage'], errors='coerce')
+        st.caption(
+            f"{len(base):,} part"
+            + (f" (maksimal {BULK_EDIT_ROWS:,} hasil teratas)" if len(base) >= BULK_EDIT_ROWS else "")
+            + ". Nomor part diubah lewat mode Satu Part."
+        )
+        edited = st.data_editor(
+            grid,
+            column_config={
+                'part_number': st.column_config.TextColumn("No Part"),
+                'part_code': st.column_config.TextColumn("Kode Part", required=True),
+                'machine_name': st.column_config.TextColumn("Nama Mesin", required=True),
+                'material': st.column_config.TextColumn("Material", required=True),
+                'install_date': st.column_config.DateColumn("Tanggal Pasang", format="YYYY-MM-DD", required=True),
+                'recommended_usage': st.column_config.NumberColumn(
+                    "Rekomendasi (jam)", min_value=1, step=1, required=True
+                ),
+                'category': st.column_config.SelectboxColumn("Kategori", options=CATEGORIES, required=True),
+            },
+            disabled=['part_number'],
+            num_rows="fixed",
+            hide_index=True,
+            use_container_width=True,
+            key=f"bulk_editor_{st.session_state['bulk_generation']}",
+        )
+        
+        edited = edited.assign(
+            install_date=pd.to_datetime(edited['install_date'], errors='coerce').dt.strftime("%Y-%m-%d")
+        )
+        plan = plan_edits(base, edited, self.fleet)
+        if plan.rejected:
+            st.error(f"❌ {plan.rejected:,} baris tidak valid dan tidak akan disimpan:")
+            st.dataframe(plan.rejected_rows(), hide_index=True, use_container_width=True)
+        if not plan.changed:
+            st.caption("Belum ada perubahan.")
+            return
+        
+        st.write(f"✏️ **{plan.changed:,}** part berubah, {plan.unchanged:,} tidak berubah.")
+        if st.button(f"💾 Simpan {plan.changed:,} Perubahan", type="primary"):
+            # Satu tulisan storage (update_many) untuk semua baris yang berubah
+            if self.write_data(apply_upsert, plan, self.fleet):
+                st.session_state.pop('bulk_base', None)
+                st.success(f"✅ {plan.updated:,} part berhasil diupdate!")
+                st.rerun()
+            else:
+                # Versi dari operator lain: buka ulang grid dengan data terbaru
+                st.session_state.pop('bulk_base', None)
+    
+    @timed("page.upload")
     def show_upload_data(self):
         """Tampilkan form upload data CSV"""
+        from importer import import_csv, read_preview
+
         st.title("📤 Upload Data dari CSV")
         
         st.info("""
         **📋 Format CSV yang Didukung:**
         - Kolom wajib: `part_number`, `part_code`, `machine_name`, `material`, `install_date`, `recommended_usage`, `category`
         - Format tanggal: YYYY-MM-DD
+        - `recommended_usage`: bilangan bulat (jam) lebih dari 0
+        - `category`: Mechanical, Electrical atau Pneumatic
         - File harus berformat CSV dengan encoding UTF-8
+        - Baris yang tidak valid tidak diimport dan ditampilkan beserta alasannya
         """)
         
         # Template download
@@ -467,57 +911,174 @@ class PartMonitoringSystem:
         
         if uploaded_file is not None:
             try:
-                df = pd.read_csv(uploaded_file)
-                required_columns = ['part_number', 'part_code', 'machine_name', 'material', 
-                                  'install_date', 'recommended_usage', 'category']
+                # Hanya header dan beberapa baris awal yang dibaca untuk preview;
+                # isi file dibaca per batch saat import dijalankan
+                preview, missing_columns = read_preview(uploaded_file)
                 
-                if all(col in df.columns for col in required_columns):
-                    st.success(f"✅ File berhasil dibaca. {len(df)} data ditemukan.")
+                if not missing_columns:
+                    st.success(f"✅ File berhasil dibaca ({uploaded_file.size / 1024:,.0f} KB).")
                     
                     # Display preview
                     st.subheader("Preview Data")
-                    st.dataframe(df.head())
+                    st.dataframe(preview)
                     
                     # Pilihan import mode
                     import_mode = st.radio(
                         "Mode Import:",
-                        ["Tambah Data Baru", "Replace Semua Data"],
-                        help="Pilih cara import data"
+                        ["Tambah Data Baru", "Sinkron (Update Data yang Berubah)", "Replace Semua Data"],
+                        help="Mode sinkron menambah part baru dan hanya mengupdate part yang isinya berubah"
                     )
                     
-                    if st.button("🚀 Import Data ke Sistem"):
-                        with st.spinner("Mengimport data..."):
+                    if import_mode == "Sinkron (Update Data yang Berubah)":
+                        self.show_upsert_import(uploaded_file)
+                    elif st.button("🚀 Import Data ke Sistem"):
+                        progress_bar = st.progress(0.0, text="Mengimport data...")
+                        
+                        # Storage tetap melewati duplikat yang masuk bersamaan dari session lain
+                        reports = []
+                        saved = self.write_data(lambda: reports.append(import_csv(
+                            uploaded_file, self.fleet,
+                            replace=import_mode == "Replace Semua Data",
+                            progress=lambda fraction, report: self.show_import_progress(progress_bar, fraction, report)
+                        )))
+                        
+                        if saved:
+                            report = reports[0]
+                            progress_bar.progress(1.0, text=f"Selesai: {report.rows:,} baris diproses")
                             if import_mode == "Tambah Data Baru":
-                                new_data = df.to_dict('records')
-                                # Check for duplicates
-                                existing_numbers = [p['part_number'] for p in self.parts_data]
-                                duplicates = [p for p in new_data if p['part_number'] in existing_numbers]
-                                
-                                if duplicates:
-                                    st.warning(f"⚠️ {len(duplicates)} data duplicate akan diabaikan.")
-                                    new_data = [p for p in new_data if p['part_number'] not in existing_numbers]
-                                
-                                self.parts_data.extend(new_data)
-                                success_msg = f"✅ Berhasil menambahkan {len(new_data)} data part baru!"
-                                
-                            else:  # Replace semua data
-                                self.parts_data = df.to_dict('records')
-                                success_msg = f"✅ Berhasil mengganti semua data dengan {len(df)} data part!"
-                            
-                            if self.save_data():
-                                st.success(success_msg)
-                                st.balloons()
+                                st.success(f"✅ Berhasil menambahkan {report.inserted:,} data part baru!")
                             else:
-                                st.error("❌ Gagal menyimpan data!")
+                                st.success(f"✅ Berhasil mengganti semua data dengan {report.inserted:,} data part!")
+                            if report.skipped:
+                                st.warning(f"⚠️ {report.skipped:,} data duplicate diabaikan.")
+                            self.show_rejected_rows(report)
+                            if report.inserted:
+                                st.balloons()
+                        else:
+                            st.error("❌ Gagal menyimpan data! Batch yang sudah tersimpan tidak dibatalkan.")
                                 
                 else:
                     st.error("❌ Format CSV tidak sesuai. Pastikan semua kolom wajib ada.")
-                    st.write("**Kolom yang dibutuhkan:**", required_columns)
-                    st.write("**Kolom yang ada dalam file:**", list(df.columns))
+                    st.write("**Kolom yang dibutuhkan:**", PART_COLUMNS)
+                    st.write("**Kolom yang ada dalam file:**", list(preview.columns))
                     
             except Exception as e:
                 st.error(f"❌ Error membaca file: {str(e)}")
     
+    def show_import_progress(self, progress_bar, fraction, report):
+        """Update progress bar import setelah satu batch selesai"""
+        progress_bar.progress(
+            fraction,
+            text=f"Batch {report.batches}: {report.rows:,} baris diproses, "
+                 f"{report.inserted + report.updated:,} tersimpan, {report.rejected:,} ditolak"
+        )
+    
+    def show_rejected_rows(self, report):
+        """Tampilkan baris CSV yang ditolak beserta alasannya"""
+        if not report.rejected:
+            return
+        rejected_rows = report.rejected_rows()
+        st.warning(f"⚠️ {report.rejected:,} baris ditolak karena data tidak valid.")
+        st.dataframe(rejected_rows, use_container_width=True, hide_index=True)
+        st.download_button(
+            label="📥 Download Baris yang Ditolak",
+            data=rejected_rows.to_csv(index=False),
+            file_name="import_ditolak.csv",
+            mime="text/csv"
+        )
+    
+    def show_upsert_import(self, uploaded_file):
+        """Mode sinkron: analisa selisih CSV dengan data saat ini, lalu tulis hanya selisihnya"""
+        from importer import apply_upsert, plan_upsert
+
+        file_key = (uploaded_file.name, uploaded_file.size)
+        plan_state = st.session_state.get('upsert_plan')
+        if plan_state is not None and plan_state[0] != file_key:
+            # Hasil analisa file lain tidak berlaku untuk file ini
+            st.session_state.pop('upsert_plan')
+            plan_state = None
+        
+        if st.button("🔍 Analisa Perubahan"):
+            progress_bar = st.progress(0.0, text="Menganalisa data...")
+            plan = plan_upsert(
+                uploaded_file, self.fleet,
+                progress=lambda fraction, report: self.show_import_progress(progress_bar, fraction, report)
+            )
+            progress_bar.progress(1.0, text=f"Selesai: {plan.rows:,} baris dianalisa")
+            plan_state = st.session_state['upsert_plan'] = (file_key, plan)
+        
+        if plan_state is None:
+            return
+        plan = plan_state[1]
+        
+        st.subheader("Ringkasan Perubahan")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("🆕 Part Baru", f"{plan.new:,}")
+        col2.metric("✏️ Berubah", f"{plan.changed:,}")
+        col3.metric("✔️ Tidak Berubah", f"{plan.unchanged:,}")
+        col4.metric("⛔ Ditolak", f"{plan.rejected:,}")
+        self.show_rejected_rows(plan)
+        
+        if not plan.new and not plan.changed:
+            st.info("Tidak ada perubahan yang perlu disimpan.")
+            return
+        
+        if st.button(f"✅ Terapkan {plan.new + plan.changed:,} Perubahan"):
+            progress_bar = st.progress(0.0, text="Menyimpan perubahan...")
+            saved = self.write_data(lambda: apply_upsert(
+                plan, self.fleet,
+                progress=lambda fraction, report: self.show_import_progress(progress_bar, fraction, report)
+            ))
+            st.session_state.pop('upsert_plan', None)
+            if saved:
+                progress_bar.progress(1.0, text="Selesai")
+                st.success(f"✅ {plan.inserted:,} part baru ditambahkan, {plan.updated:,} part diupdate.")
+                if plan.skipped:
+                    st.warning(f"⚠️ {plan.skipped:,} part baru sudah ditambahkan session lain dan diabaikan.")
+            else:
+                st.error("❌ Gagal menyimpan perubahan! Analisa ulang file lalu coba lagi.")
+    
+    def show_diagnostics(self):
+        """Tampilkan statistik waktu per tahap rerun (persentil bergulir)"""
+        st.title("🩺 Diagnostik Performa")
+        st.caption(
+            f"Persentil dihitung dari {diagnostics.WINDOW} span terakhir per tahap, "
+            f"dikumpulkan dari semua session sejak aplikasi dijalankan."
+        )
+        
+        rows = diagnostics.summary()
+        if not rows:
+            st.info("Belum ada data pengukuran.")
+            return
+        
+        table = pd.DataFrame(rows)
+        for column in ['p50', 'p90', 'p99', 'max']:
+            table[column] = (table[column] * 1000).round(1)
+        table['total_seconds'] = table['total_seconds'].round(2)
+        st.dataframe(
+            table.rename(columns={
+                'stage': 'Tahap', 'count': 'Jumlah', 'total_seconds': 'Total (detik)',
+                'window': 'Sampel', 'p50': 'p50 (ms)', 'p90': 'p90 (ms)',
+                'p99': 'p99 (ms)', 'max': 'Maks (ms)'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="📥 Download Metrics (Prometheus)",
+                data=diagnostics.prometheus_text(),
+                file_name="part_monitoring.prom",
+                mime="text/plain"
+            )
+        with col2:
+            if st.button("🔄 Reset Statistik"):
+                diagnostics.reset()
+                st.rerun()
+    
+    @timed("page.manual")
     def show_manual_book(self):
         """Tampilkan manual book"""
         st.title("📖 Manual Book")
@@ -548,6 +1109,7 @@ class PartMonitoringSystem:
             - 📊 **Dashboard Monitoring**: Pantau status semua part secara real-time
             - ➕ **Input Data**: Tambah data part baru
             - ✏️ **Edit Data**: Update atau hapus data part yang sudah ada
+            - 📈 **Riwayat & MTBF**: Umur aktual part yang sudah diganti, MTBF dan gagal dini
             - 📤 **Upload CSV**: Import data dalam jumlah besar
             - 📖 **Manual Book**: Panduan penggunaan sistem
             """)
@@ -560,12 +1122,14 @@ class PartMonitoringSystem:
             - **Filter Mesin**: Filter berdasarkan nama mesin
             - **Filter Material**: Filter berdasarkan material part
             - **Filter Kategori**: Filter berdasarkan kategori part
+            - **Plant** (storage multi-plant): hanya data plant yang dipilih yang dimuat; "Semua Plant" menggabungkan semua plant
             
             **2. Key Performance Indicators (KPI):**
             - **Total Parts**: Jumlah total part yang terfilter
             - **Normal**: Part dengan sisa usia > 500 jam
             - **Warning**: Part dengan sisa usia < 500 jam
             - **Harus Ganti**: Part dengan sisa usia = 0 jam
+            - **(prediksi)**: Jumlah part per status menurut sisa usia prediksi, tampil jika model umur sudah dilatih (`scripts/train_life_model.py`)
             
             **3. Visualisasi Data:**
             - **Pie Chart**: Distribusi status part
@@ -594,7 +1158,7 @@ class PartMonitoringSystem:
             with col3:
                 st.error("**🔴 HARUS GANTI**")
                 st.write("Sisa usia pakai = 0 jam")
-                st.write("**Tindakan**: Ganti segera! (Blinking alert)")
+                st.write("**Tindakan**: Ganti segera! (Muncul di peringatan dan riwayat alert)")
         
         # Input Data Guide
         with st.expander("➕ **Panduan Input Data**"):
@@ -621,12 +1185,14 @@ class PartMonitoringSystem:
             - **Update Data**: Ubah informasi part yang sudah ada
             - **Hapus Part**: Hapus part dari sistem
             - **Tandai Sudah Diganti**: Reset tanggal pemasangan ke hari ini
+            - **Edit Massal (Grid)**: Ubah banyak part sekaligus di tabel; hanya baris yang berubah yang disimpan
             
             **Penggunaan:**
-            1. Pilih part dari dropdown
-            2. Ubah data yang diperlukan
-            3. Klik tombol aksi yang diinginkan
-            4. Konfirmasi perubahan
+            1. Ketik nomor part, kode part atau nama mesin di kolom pencarian lalu tekan Enter
+            2. Pilih part dari hasil pencarian
+            3. Ubah data yang diperlukan
+            4. Klik tombol aksi yang diinginkan
+            5. Konfirmasi perubahan
             """)
     
     def show_manual_english(self):
@@ -643,6 +1209,7 @@ class PartMonitoringSystem:
             - 📊 **Monitoring Dashboard**: Real-time status monitoring of all parts
             - ➕ **Input Data**: Add new part data
             - ✏️ **Edit Data**: Update or delete existing part data
+            - 📈 **Riwayat & MTBF**: Actual life of replaced parts, MTBF and early failures
             - 📤 **Upload CSV**: Bulk import data
             - 📖 **Manual Book**: System usage guide
             """)
@@ -655,12 +1222,14 @@ class PartMonitoringSystem:
             - **Machine Filter**: Filter by machine name
             - **Material Filter**: Filter by part material
             - **Category Filter**: Filter by part category
+            - **Plant** (multi-plant storage): only the selected plant's data is loaded; "Semua Plant" combines all plants
             
             **2. Key Performance Indicators (KPI):**
             - **Total Parts**: Total number of filtered parts
             - **Normal**: Parts with remaining lifespan > 500 hours
             - **Warning**: Parts with remaining lifespan < 500 hours
             - **Must Replace**: Parts with remaining lifespan = 0 hours
+            - **(prediksi)**: Part count per status from the predicted remaining lifespan, shown once a life model has been trained (`scripts/train_life_model.py`)
             
             **3. Data Visualization:**
             - **Pie Chart**: Part status distribution
@@ -689,7 +1258,7 @@ class PartMonitoringSystem:
             with col3:
                 st.error("**🔴 MUST REPLACE**")
                 st.write("Remaining lifespan = 0 hours")
-                st.write("**Action**: Replace immediately! (Blinking alert)")
+                st.write("**Action**: Replace immediately! (Shown in the warning and alert history)")
         
         # Input Data Guide
         with st.expander("➕ **Input Data Guide**"):
@@ -716,34 +1285,31 @@ class PartMonitoringSystem:
             - **Update Data**: Modify existing part information
             - **Delete Part**: Remove part from system
             - **Mark as Replaced**: Reset installation date to today
+            - **Edit Massal (Grid)**: Edit many parts at once in a table; only changed rows are saved
             
             **Usage:**
-            1. Select part from dropdown
-            2. Modify required data
-            3. Click desired action button
-            4. Confirm changes
+            1. Type a part number, part code or machine name in the search box and press Enter
+            2. Select the part from the search results
+            3. Modify required data
+            4. Click desired action button
+            5. Confirm changes
             """)
 
 def main():
-    # Initialize the app
-    app = PartMonitoringSystem()
-    
-    # Sidebar navigation
-    st.sidebar.markdown("---")
-    st.sidebar.subheader("🗂️ Navigation")
-    
-    menu_options = {
-        "📊 Dashboard": app.show_dashboard,
-        "➕ Input Data": app.show_input_form,
-        "✏️ Edit Data": app.show_edit_data,
-        "📤 Upload CSV": app.show_upload_data,
-        "📖 Manual Book": app.show_manual_book
-    }
-    
-    selected_menu = st.sidebar.radio("Pilih Menu", list(menu_options.keys()))
+    with span("rerun"):
+        # Initialize the app
+        app = PartMonitoringSystem()
+        
+        # Sidebar navigation
+        st.sidebar.markdown("---")
+        st.sidebar.subheader("🗂️ Navigation")
+        
+        selected_menu = st.sidebar.radio("Pilih Menu", list(PAGES), key="page")
+        
+        # Show selected page
+        getattr(app, PAGES[selected_menu])()
     
-    # Show selected page
-    menu_options[selected_menu]()
+    diagnostics.write_prometheus()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""Kalender operasi per mesin (shift, hari libur, downtime).
+
+Tanpa konfigurasi, semua mesin memakai kalender default 8 jam operasi per
+hari setiap hari. Kalender lain didefinisikan di ``machine_calendars.json``
+(lokasi bisa diganti lewat env ``PART_CALENDAR_FILE``)::
+
+    {
+      "default": {"hours_per_day": 8},
+      "holidays": ["2025-12-25"],
+      "calendars": {
+        "tiga_shift": {
+          "shifts": [
+            {"start": "06:00", "end": "14:00", "days": [0, 1, 2, 3, 4, 5]},
+            {"start": "14:00", "end": "22:00", "days": [0, 1, 2, 3, 4, 5]},
+            {"start": "22:00", "end": "06:00", "days": [0, 1, 2, 3, 4]}
+          ],
+          "downtime": [{"start": "2025-07-01", "end": "2025-07-14"}]
+        }
+      },
+      "machines": {"Mesin A": "tiga_shift", "Mesin B": {"hours_per_day": [16, 16, 16, 16, 16, 0, 0]}}
+    }
+
+``hours_per_day`` berupa satu angka atau 7 angka (Senin..Minggu). Hari
+libur (global maupun per kalender) dan rentang downtime (inklusif) bernilai
+0 jam. Nama mesin dicocokkan tanpa membedakan huruf besar/kecil.
+
+Setiap kalender dihitung sekali menjadi array jam operasi per hari sejak
+``EPOCH`` beserta prefix sum-nya, sehingga jam terpakai antara dua tanggal
+cukup ``cum[akhir] - cum[awal]`` (O(1)) dan tanggal habisnya
+``recommended_usage`` dicari dengan binary search (O(log n)), keduanya
+tervektorisasi untuk seluruh fleet. Kalender dibaca sekali per proses;
+aplikasi perlu dijalankan ulang setelah file kalender diubah.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CALENDAR_FILE = "machine_calendars.json"
+DEFAULT_HOURS_PER_DAY = 8
+EPOCH = np.datetime64('2000-01-01', 'D')
+HORIZON_DAYS = 150 * 366  # sampai sekitar tahun 2150
+_EPOCH_WEEKDAY = 5  # 2000-01-01 adalah hari Sabtu (Senin = 0)
+
+
+def _machine_key(name):
+    return '' if name is None else str(name).strip().casefold()
+
+
+def _shift_hours(shift):
+    start = datetime.strptime(shift['start'], "%H:%M")
+    end = datetime.strptime(shift['end'], "%H:%M")
+    if end <= start:
+        end += timedelta(days=1)  # shift malam melewati tengah malam
+    return (end - start).total_seconds() / 3600
+
+
+class OperatingCalendar:
+    """Jam operasi per hari sejak ``EPOCH`` dan prefix sum-nya"""
+
+    def __init__(self, hours_per_day=DEFAULT_HOURS_PER_DAY, shifts=(), holidays=(), downtime=()):
+        if shifts:
+            weekly = np.zeros(7)
+            for shift in shifts:
+                for day in shift.get('days', range(7)):
+                    weekly[day] += _shift_hours(shift)
+        else:
+            weekly = np.broadcast_to(np.asarray(hours_per_day, dtype=float), (7,)).copy()
+
+        weekdays = (np.arange(HORIZON_DAYS) + _EPOCH_WEEKDAY) % 7
+        hours = weekly[weekdays]
+        for holiday in holidays:
+            index = day_index(np.datetime64(holiday, 'D'))
+            if 0 <= index < HORIZON_DAYS:
+                hours[index] = 0
+        for window in downtime:
+            start = max(day_index(np.datetime64(window['start'], 'D')), 0)
+            end = min(day_index(np.datetime64(window['end'], 'D')) + 1, HORIZON_DAYS)
+            hours[start:end] = 0
+
+        self.hours = hours
+        # cumulative[d] = total jam operasi pada hari 0..d-1
+        self.cumulative = np.concatenate(([0.0], np.cumsum(hours)))
+        # Jam per hari jika kalender seragam tanpa libur/downtime, selain itu None
+        self.uniform_hours = float(hours[0]) if hours[0] > 0 and np.all(hours == hours[0]) else None
+
+    def hours_used(self, start, end):
+        """Jam operasi antara indeks hari ``start`` dan ``end`` (negatif jika end < start)"""
+        return self.cumulative[end] - self.cumulative[start]
+
+    def exhaustion(self, start, usage):
+        """Indeks hari (pecahan) saat ``usage`` jam habis dipakai sejak hari ``start``.
+
+        Hasilnya ``HORIZON_DAYS`` jika tidak habis sebelum akhir kalender.
+        """
+        start = np.asarray(start)
+        usage = np.asarray(usage, dtype=float)
+        target = self.cumulative[start] + usage
+        # Hari pertama t dengan cumulative[t] >= target; jam habis di tengah hari t-1
+        end = np.searchsorted(self.cumulative, target, side='left')
+        end = np.maximum(end, start + 1)
+        inside = end <= HORIZON_DAYS
+        day = np.where(inside, end - 1, HORIZON_DAYS)
+        safe_day = np.minimum(day, HORIZON_DAYS - 1)
+        hours = self.hours[safe_day]
+        fraction = np.where(
+            hours > 0, (target - self.cumulative[safe_day]) / np.where(hours > 0, hours, 1), 0.0
+        )
+        result = np.where(inside, day + np.clip(fraction, 0, 1), HORIZON_DAYS)
+        return np.where(usage <= 0, start, result)
+
+
+def day_index(dates):
+    """Indeks hari sejak ``EPOCH`` untuk datetime64 (skalar atau array)"""
+    return (np.asarray(dates).astype('datetime64[D]') - EPOCH).astype('int64')
+
+
+class CalendarSet:
+    """Kalender default dan pemetaan mesin -> kalender"""
+
+    def __init__(self, config=None):
+        config = config or {}
+        holidays = list(config.get('holidays', []))
+
+        def build(spec):
+            spec = dict(spec)
+            return OperatingCalendar(
+                hours_per_day=spec.get('hours_per_day', DEFAULT_HOURS_PER_DAY),
+                shifts=spec.get('shifts', ()),
+                holidays=holidays + list(spec.get('holidays', [])),
+                downtime=spec.get('downtime', ()),
+            )
+
+        self.calendars = [build(config.get('default', {}))]
+        named = {}
+        for name, spec in config.get('calendars', {}).items():
+            named[name] = len(self.calendars)
+            self.calendars.append(build(spec))
+        self._machines = {}
+        for machine, spec in config.get('machines', {}).items():
+            if isinstance(spec, str):
+                self._machines[_machine_key(machine)] = named[spec]
+            else:
+                self._machines[_machine_key(machine)] = len(self.calendars)
+                self.calendars.append(build(spec))
+
+        default = self.calendars[0]
+        # Satu kalender seragam untuk semua mesin: cukup rumus jam/hari yang sederhana
+        self.uniform_hours = default.uniform_hours if len(self.calendars) == 1 else None
+
+    def calendar_for(self, machine_name):
+        return self.calendars[self._machines.get(_machine_key(machine_name), 0)]
+
+    def _groups(self, machine_names):
+        """(kalender, mask baris) untuk setiap kalender yang dipakai"""
+        keys = pd.Series(machine_names).fillna('').astype(str).str.strip().str.casefold()
+        ids = keys.map(self._machines).fillna(0).to_numpy(dtype=int)
+        for calendar_id in np.unique(ids):
+            yield self.calendars[calendar_id], ids == calendar_id
+
+    def hours_used(self, machine_names, install_dt, today):
+        """Jam operasi sejak ``install_dt`` (Series datetime64) sampai ``today`` per part"""
+        valid = install_dt.notna().to_numpy()
+        start = np.clip(day_index(install_dt.to_numpy()), 0, HORIZON_DAYS)
+        end = int(np.clip(day_index(np.datetime64(today, 'D')), 0, HORIZON_DAYS))
+        used = np.full(len(install_dt), np.nan)
+        for calendar, mask in self._groups(machine_names):
+            rows = mask & valid
+            used[rows] = calendar.hours_used(start[rows], end)
+        return pd.Series(used, index=install_dt.index)
+
+    def exhaustion_dates(self, machine_names, install_dt, usage):
+        """Tanggal ``usage`` jam habis dipakai per part (Series datetime64, NaT jika tidak valid)"""
+        usage = np.asarray(usage, dtype=float)
+        valid = install_dt.notna().to_numpy() & ~np.isnan(usage)
+        start = np.clip(day_index(install_dt.to_numpy()), 0, HORIZON_DAYS - 1)
+        days = np.full(len(install_dt), np.nan)
+        for calendar, mask in self._groups(machine_names):
+            rows = mask & valid
+            days[rows] = calendar.exhaustion(start[rows], usage[rows])
+        dates = pd.Timestamp(EPOCH) + pd.to_timedelta(days, unit='D')
+        return pd.Series(dates, index=install_dt.index)
+
+    def replacement_date(self, machine_name, install_date, usage):
+        """Versi skalar ``exhaustion_dates`` untuk satu part (datetime)"""
+        if self.uniform_hours is not None:
+            return install_date + timedelta(days=usage / self.uniform_hours)
+        calendar = self.calendar_for(machine_name)
+        start = int(np.clip(day_index(np.datetime64(install_date, 'D')), 0, HORIZON_DAYS - 1))
+        day = float(calendar.exhaustion(start, usage))
+        return pd.Timestamp(EPOCH).to_pydatetime() + timedelta(days=day)
+
+
+_calendars = None
+_calendars_lock = threading.Lock()
+
+
+def get_calendars():
+    """Kalender operasi proses ini, dibaca sekali dari file kalender"""
+    global _calendars
+    with _calendars_lock:
+        if _calendars is None:
+            path = os.environ.get("PART_CALENDAR_FILE", DEFAULT_CALENDAR_FILE)
+            config = None
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+            _calendars = CalendarSet(config)
+        return _calendars
@@ -0,0 +1,181 @@
+"""Command line untuk laporan status dan job batch tanpa Streamlit.
+
+Memakai logika yang sama dengan dashboard (``fleet``, ``status_engine``,
+``importer``, ``exporter``) dan storage yang sama (env ``PART_STORAGE``,
+``PART_DATA_FILE``, ``PART_DB_FILE``). Modul hanya di-import oleh subcommand
+yang membutuhkannya sehingga ``--help`` dan perintah ringan cepat dimulai.
+
+Contoh:
+    python cli.py status
+    python cli.py status --by machine_name --format json
+    python cli.py status --fail-on-due          # exit code 1 jika ada part Harus Ganti (untuk cron)
+    python cli.py due --days 14 --machine "Mesin A" --format csv --output jadwal.csv
+    python cli.py report --status "Harus Ganti" --output harus_ganti.xlsx
+    python cli.py import data_baru.csv --mode sync
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+# Konstanta tanpa dependensi: parser dibangun tanpa meng-import pandas
+from constants import GROUP_FIELDS, REPORT_COLUMNS, STATUS_NAMES
+
+DUE_COLUMNS = ['part_number', 'machine_name', 'category', 'replacement_date', 'remaining_hours', 'status']
+# ekstensi file -> format export
+REPORT_FORMATS = {'.csv': "CSV", '.parquet': "Parquet", '.xlsx': "Excel", '.json': "JSON"}
+
+
+def load_fleet(args):
+    from fleet import get_fleet
+    return get_fleet(args.backend, args.plant)
+
+
+def report_frame(status_frame, columns):
+    """Kolom laporan dengan tanggal sebagai teks"""
+    frame = status_frame[columns].copy()
+    frame['replacement_date'] = frame['replacement_date'].dt.strftime("%Y-%m-%d")
+    return frame
+
+
+def write_frame(frame, output_format, output=None):
+    """Tulis DataFrame sebagai tabel teks, CSV atau JSON ke stdout atau file"""
+    if output_format == "json":
+        text = frame.to_json(orient='records', force_ascii=False, indent=2)
+    elif output_format == "csv":
+        text = frame.to_csv(index=False)
+    else:
+        text = frame.to_string(index=False) if not frame.empty else "(tidak ada data)"
+    if output:
+        with open(output, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+def cmd_status(args):
+    from fleet import status_groups
+
+    fleet = load_fleet(args)
+    # Jumlah dari cube index facet, sama dengan KPI dashboard dan /api/summary
+    filters = (STATUS_NAMES, args.machine, args.material, args.category)
+    counts = fleet.aggregate('status', *filters, now=args.date)
+    summary = {"total": sum(counts.values()), **counts}
+    if args.by:
+        summary["groups"] = status_groups(fleet, args.by, *filters, now=args.date)
+
+    if args.format == "json":
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+    else:
+        print(f"Total part   : {summary['total']:,}")
+        for name in STATUS_NAMES:
+            print(f"{name:<12} : {counts[name]:,}")
+        for name, group in summary.get("groups", {}).items():
+            print(f"  {name or '-'}: " + ", ".join(f"{s} {n:,}" for s, n in group.items()))
+    return 1 if args.fail_on_due and counts["Harus Ganti"] else 0
+
+
+def cmd_due(args):
+    fleet = load_fleet(args)
+    due = fleet.due_within(args.days, args.machine, now=args.date)
+    write_frame(report_frame(due, DUE_COLUMNS), args.format, args.output)
+    return 0
+
+
+def cmd_report(args):
+    fleet = load_fleet(args)
+    statuses = args.status or STATUS_NAMES
+    frame = fleet.query(statuses, args.machine, args.material, args.category, now=args.date)
+    extension = os.path.splitext(args.output)[1].lower()
+    if extension not in REPORT_FORMATS:
+        raise SystemExit(f"Format file tidak dikenal: {extension} (pilih {', '.join(REPORT_FORMATS)})")
+
+    if REPORT_FORMATS[extension] == "JSON":
+        write_frame(report_frame(frame, REPORT_COLUMNS), "json", args.output)
+    else:
+        import shutil
+        from exporter import export_frame
+
+        path = export_frame(frame, REPORT_FORMATS[extension], lambda chunk: report_frame(chunk, REPORT_COLUMNS))
+        shutil.move(path, args.output)
+    print(f"{len(frame):,} part ditulis ke {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_import(args):
+    from importer import apply_upsert, import_csv, plan_upsert
+
+    fleet = load_fleet(args)
+    with open(args.file, 'rb') as source:
+        if args.mode == "sync":
+            report = plan_upsert(source, fleet)
+            print(f"Baru: {report.new:,}, berubah: {report.changed:,}, tidak berubah: {report.unchanged:,}")
+            if not args.dry_run:
+                apply_upsert(report, fleet)
+                print(f"Ditambahkan: {report.inserted:,}, diupdate: {report.updated:,}")
+        elif args.dry_run:
+            raise SystemExit("--dry-run hanya untuk --mode sync")
+        else:
+            report = import_csv(source, fleet, replace=args.mode == "replace")
+            print(f"Ditambahkan: {report.inserted:,}, dilewati (sudah ada): {report.skipped:,}")
+    print(f"Baris dibaca: {report.rows:,}, ditolak: {report.rejected:,}")
+    if report.rejected and args.rejected:
+        report.rejected_rows().to_csv(args.rejected, index=False)
+        print(f"Baris yang ditolak ditulis ke {args.rejected}")
+    return 0
+
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["json", "sqlite", "sharded"], help="default env PART_STORAGE")
+    parser.add_argument("--plant", action="append", help="storage sharded: hanya plant ini (bisa diulang)")
+    parser.add_argument("--date", type=parse_date, help="hitung status per tanggal ini (YYYY-MM-DD), default hari ini")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_filters(command):
+        command.add_argument("--machine", default="All", help="nama mesin")
+        command.add_argument("--material", default="All")
+        command.add_argument("--category", default="All")
+
+    status = commands.add_parser("status", help="ringkasan jumlah part per status")
+    add_filters(status)
+    status.add_argument("--by", choices=GROUP_FIELDS, help="rincian per mesin/material/kategori")
+    status.add_argument("--format", choices=["text", "json"], default="text")
+    status.add_argument("--fail-on-due", action="store_true", help="exit code 1 jika ada part Harus Ganti")
+    status.set_defaults(handler=cmd_status)
+
+    due = commands.add_parser("due", help="part yang jatuh tempo dalam N hari")
+    due.add_argument("--days", type=int, default=7)
+    due.add_argument("--machine", default="All")
+    due.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    due.add_argument("--output", help="file hasil (default stdout)")
+    due.set_defaults(handler=cmd_due)
+
+    report = commands.add_parser("report", help="laporan lengkap ke CSV/JSON/Parquet/Excel")
+    add_filters(report)
+    report.add_argument("--status", action="append", choices=STATUS_NAMES, help="bisa diulang; default semua")
+    report.add_argument("--output", required=True, help="file hasil, format dari ekstensi")
+    report.set_defaults(handler=cmd_report)
+
+    import_ = commands.add_parser("import", help="import data part dari CSV")
+    import_.add_argument("file")
+    import_.add_argument("--mode", choices=["add", "sync", "replace"], default="add",
+                         help="add: tambah part baru, sync: tambah + update yang berubah, replace: ganti semua")
+    import_.add_argument("--dry-run", action="store_true", help="sync: tampilkan rencana tanpa menulis")
+    import_.add_argument("--rejected", help="file CSV untuk baris yang ditolak")
+    import_.set_defaults(handler=cmd_import)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
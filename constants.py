@@ -0,0 +1,15 @@
+"""Konstanta status dan laporan yang dipakai bersama tanpa dependensi.
+
+Modul ini sengaja hanya berisi literal Python sehingga ``cli.py`` bisa
+membangun parser (pilihan ``--status``/``--by``) tanpa meng-import pandas;
+``status_engine`` dan ``api`` memakai konstanta yang sama dari sini.
+"""
+
+STATUS_NAMES = ["Normal", "Warning", "Harus Ganti"]
+
+# Kolom laporan status (CLI dan API) dan field rincian per kelompok
+REPORT_COLUMNS = [
+    'part_number', 'part_code', 'machine_name', 'material', 'install_date',
+    'recommended_usage', 'category', 'replacement_date', 'remaining_hours', 'status'
+]
+GROUP_FIELDS = ('machine_name', 'material', 'category')
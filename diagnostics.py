@@ -0,0 +1,133 @@
+"""Pengukuran waktu per tahap rerun dan halaman diagnostik.
+
+Aktif jika env ``PART_DIAGNOSTICS=1``. Setiap ``span(nama)`` mencatat durasi
+ke jendela bergulir per tahap (disimpan di level modul sehingga bertahan
+antar rerun dan dipakai bersama semua session). Dari jendela tersebut
+dihitung persentil p50/p90/p99, yang bisa ditulis ke file format teks
+Prometheus (env ``PART_DIAGNOSTICS_FILE``) untuk di-scrape.
+
+Saat tidak aktif, ``span`` mengembalikan context manager kosong yang sama
+dan ``timed`` mengembalikan fungsi aslinya, sehingga biayanya hampir nol.
+"""
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+ENABLED = os.environ.get("PART_DIAGNOSTICS", "").lower() in ("1", "true", "yes")
+PROMETHEUS_FILE = os.environ.get("PART_DIAGNOSTICS_FILE")
+WINDOW = 500  # durasi terakhir yang disimpan per tahap
+DUMP_INTERVAL = 10  # detik minimal antar penulisan file Prometheus
+QUANTILES = (0.5, 0.9, 0.99)
+METRIC = "part_monitoring_stage_seconds"
+
+_NOOP = nullcontext()
+_lock = threading.Lock()
+_windows = {}  # tahap -> deque durasi (detik)
+_totals = {}  # tahap -> [jumlah span, total detik] sejak proses mulai
+_last_dump = 0.0
+
+
+def record(stage, seconds):
+    with _lock:
+        window = _windows.get(stage)
+        if window is None:
+            window = _windows[stage] = deque(maxlen=WINDOW)
+            _totals[stage] = [0, 0.0]
+        window.append(seconds)
+        _totals[stage][0] += 1
+        _totals[stage][1] += seconds
+
+
+@contextmanager
+def _span(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started)
+
+
+def span(stage):
+    """Context manager pengukur waktu satu tahap"""
+    return _span(stage) if ENABLED else _NOOP
+
+
+def timed(stage):
+    """Decorator pengukur waktu satu method/halaman"""
+    def decorate(function):
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with _span(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _quantile(ordered, q):
+    """Persentil dengan interpolasi linier dari list yang sudah terurut"""
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summary():
+    """Statistik per tahap: jumlah, total, dan persentil dari jendela bergulir"""
+    with _lock:
+        snapshot = {stage: (sorted(window), list(_totals[stage])) for stage, window in _windows.items()}
+    rows = []
+    for stage in sorted(snapshot):
+        ordered, (count, total) = snapshot[stage]
+        rows.append({
+            'stage': stage,
+            'count': count,
+            'total_seconds': total,
+            'window': len(ordered),
+            **{f"p{int(q * 100)}": _quantile(ordered, q) for q in QUANTILES},
+            'max': ordered[-1],
+        })
+    return rows
+
+
+def prometheus_text():
+    """Statistik dalam format teks Prometheus (tipe summary)"""
+    lines = [
+        f"# HELP {METRIC} Durasi tahap rerun aplikasi (persentil dari {WINDOW} span terakhir).",
+        f"# TYPE {METRIC} summary",
+    ]
+    for row in summary():
+        label = row['stage'].replace('\\', '\\\\').replace('"', '\\"')
+        for q in QUANTILES:
+            lines.append(f'{METRIC}{{stage="{label}",quantile="{q}"}} {row[f"p{int(q * 100)}"]:.6f}')
+        lines.append(f'{METRIC}_sum{{stage="{label}"}} {row["total_seconds"]:.6f}')
+        lines.append(f'{METRIC}_count{{stage="{label}"}} {row["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path=None, force=False):
+    """Tulis statistik ke file Prometheus secara atomik, paling sering sekali per ``DUMP_INTERVAL``"""
+    global _last_dump
+    path = path or PROMETHEUS_FILE
+    if not ENABLED or not path:
+        return False
+    now = time.monotonic()
+    if not force and now - _last_dump < DUMP_INTERVAL:
+        return False
+    _last_dump = now
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+    return True
+
+
+def reset():
+    with _lock:
+        _windows.clear()
+        _totals.clear()
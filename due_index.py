@@ -0,0 +1,116 @@
+"""Index jatuh tempo penggantian part.
+
+Part disimpan dalam list terurut berdasarkan tanggal penggantian (saat sisa
+usia mencapai 0 jam), satu list untuk seluruh fleet dan satu per mesin.
+Pertanyaan "part yang jatuh tempo dalam N hari (di mesin X)" dijawab dengan
+binary search, O(log n + k), dan index di-update per record saat part
+ditulis atau ditandai sudah diganti.
+
+Tanggal penggantian diambil dari hasil ``compute_fleet_status`` (lihat
+``status_entries``) sehingga ikut kalender operasi dan hour meter mesin.
+Index yang sama dipakai untuk ``warning_date`` (saat part masuk status
+Warning), sehingga part yang statusnya berubah di antara dua tanggal bisa
+dicari tanpa menghitung ulang seluruh fleet.
+Sisa usia > 0 jika dan hanya jika hari ini (tengah malam) < tanggal ganti,
+sehingga part dengan tanggal ganti <= tengah malam hari H sudah 0 jam pada
+hari H. Part dengan data tidak valid dianggap sudah jatuh tempo.
+"""
+from bisect import bisect_right, insort
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from facets import facet_key
+
+_AFTER_ALL = '\uffff'  # lebih besar dari semua part_number sehingga batas inklusif
+
+
+def status_entries(status_frame, column='replacement_date'):
+    """(part_number, nama mesin, tanggal ``column`` ns atau None) dari DataFrame status"""
+    valid = (
+        status_frame['install_dt'].notna()
+        & pd.to_numeric(status_frame['recommended_usage'], errors='coerce').notna()
+    ).to_numpy()
+    stamps = status_frame[column].to_numpy(dtype='datetime64[ns]').view('int64').tolist()
+    return [
+        (str(part_number), machine, stamp if ok else None)
+        for part_number, machine, stamp, ok
+        in zip(status_frame['part_number'], status_frame['machine_name'], stamps, valid)
+    ]
+
+
+class DueIndex:
+    """List (tanggal ganti, part_number) terurut, global dan per mesin"""
+
+    def __init__(self, entries=()):
+        self._entries = []
+        self._by_machine = {}
+        self._keys = {}  # part_number -> (tanggal ganti, kunci mesin)
+        self._invalid = {}  # part_number -> kunci mesin, untuk data tidak valid
+        ordered = []
+        for part_number, machine_name, stamp in entries:
+            machine = facet_key(machine_name)
+            if stamp is None:
+                self._invalid[part_number] = machine
+            else:
+                self._keys[part_number] = (stamp, machine)
+                ordered.append((stamp, part_number, machine))
+        ordered.sort()
+        for stamp, part_number, machine in ordered:
+            self._entries.append((stamp, part_number))
+            self._by_machine.setdefault(machine, []).append((stamp, part_number))
+
+    def __len__(self):
+        return len(self._entries) + len(self._invalid)
+
+    def add(self, part_number, machine_name, stamp):
+        machine = facet_key(machine_name)
+        if stamp is None:
+            self._invalid[part_number] = machine
+            return
+        self._keys[part_number] = (stamp, machine)
+        entry = (stamp, part_number)
+        insort(self._entries, entry)
+        insort(self._by_machine.setdefault(machine, []), entry)
+
+    def remove(self, part_number):
+        if self._invalid.pop(part_number, None) is not None:
+            return
+        key = self._keys.pop(part_number, None)
+        if key is None:
+            return
+        stamp, machine = key
+        entry = (stamp, part_number)
+        for entries in (self._entries, self._by_machine.get(machine, [])):
+            position = bisect_right(entries, entry) - 1
+            if position >= 0 and entries[position] == entry:
+                del entries[position]
+        if not self._by_machine.get(machine, True):
+            del self._by_machine[machine]
+
+    def due_until(self, until, machine=None):
+        """part_number dengan tanggal ganti <= ``until``, urut dari yang paling awal.
+
+        Part dengan data tidak valid selalu ikut di urutan pertama.
+        """
+        if machine is None:
+            entries = self._entries
+            invalid = list(self._invalid)
+        else:
+            machine = facet_key(machine)
+            entries = self._by_machine.get(machine, [])
+            invalid = [number for number, key in self._invalid.items() if key == machine]
+        end = bisect_right(entries, (pd.Timestamp(until).value, _AFTER_ALL))
+        return invalid + [part_number for _, part_number in entries[:end]]
+
+    def due_between(self, start, end, machine=None):
+        """part_number dengan tanggal ganti di rentang (``start``, ``end``], tanpa data tidak valid"""
+        entries = self._entries if machine is None else self._by_machine.get(facet_key(machine), [])
+        first = bisect_right(entries, (pd.Timestamp(start).value, _AFTER_ALL))
+        last = bisect_right(entries, (pd.Timestamp(end).value, _AFTER_ALL))
+        return [part_number for _, part_number in entries[first:last]]
+
+    def due_within(self, days, machine=None, now=None):
+        """part_number yang sisa usianya sudah atau akan mencapai 0 dalam ``days`` hari"""
+        today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.due_until(today + timedelta(days=days), machine)
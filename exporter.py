@@ -0,0 +1,95 @@
+"""Export data monitoring ke CSV, Parquet dan Excel secara bertahap.
+
+File export hanya dibuat saat diminta dan ditulis per potongan baris ke file
+sementara di disk, sehingga tidak ada salinan serialisasi penuh di memori
+selama proses export. Dashboard memakai ``export_bytes``: Streamlit
+menyajikan download dari memori, jadi isi file dibaca sekali lalu file
+sementaranya langsung dihapus.
+"""
+import os
+import tempfile
+
+from storage import plain_value
+
+EXPORT_CHUNK_SIZE = 20000  # baris per potongan
+
+# label -> (ekstensi, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def _chunks(frame, chunksize, transform):
+    """Potongan baris ``frame`` yang sudah di-``transform``; selalu minimal satu (untuk header)"""
+    for start in range(0, max(len(frame), 1), chunksize):
+        chunk = frame.iloc[start:start + chunksize]
+        yield transform(chunk) if transform is not None else chunk
+
+
+def write_csv(frame, path, chunksize=EXPORT_CHUNK_SIZE, transform=None):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for i, chunk in enumerate(_chunks(frame, chunksize, transform)):
+            chunk.to_csv(f, header=i == 0, index=False)
+
+
+def write_parquet(frame, path, chunksize=EXPORT_CHUNK_SIZE, transform=None):
+    """Parquet terkompresi zstd, satu row group per potongan"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in _chunks(frame, chunksize, transform):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression='zstd')
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_excel(frame, path, chunksize=EXPORT_CHUNK_SIZE, transform=None):
+    """Excel lewat openpyxl mode write-only (baris langsung ditulis ke file)"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Data Part")
+    for i, chunk in enumerate(_chunks(frame, chunksize, transform)):
+        if i == 0:
+            sheet.append([str(column) for column in chunk.columns])
+        for row in chunk.itertuples(index=False, name=None):
+            sheet.append([plain_value(value) for value in row])
+    workbook.save(path)
+
+
+_WRITERS = {"CSV": write_csv, "Parquet": write_parquet, "Excel": write_excel}
+
+
+def export_frame(frame, export_format, transform=None, chunksize=EXPORT_CHUNK_SIZE):
+    """Tulis ``frame`` ke file sementara dalam format ``export_format``, hasilnya path file.
+
+    ``transform`` (opsional) dijalankan per potongan, misalnya untuk membentuk
+    kolom tampilan, agar salinan penuh yang sudah diformat tidak pernah dibuat.
+    """
+    extension, _ = EXPORT_FORMATS[export_format]
+    fd, path = tempfile.mkstemp(prefix="part_export_", suffix=f".{extension}")
+    os.close(fd)
+    try:
+        _WRITERS[export_format](frame, path, chunksize, transform)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def export_bytes(frame, export_format, transform=None, chunksize=EXPORT_CHUNK_SIZE):
+    """Isi file ``export_frame`` sebagai bytes; file sementaranya dihapus setelah dibaca"""
+    path = export_frame(frame, export_format, transform, chunksize)
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(path)
@@ -0,0 +1,166 @@
+"""Index facet untuk filter sidebar.
+
+Setiap dimensi filter (mesin, material, kategori) dan status menyimpan
+pemetaan nilai -> set ``part_number``. Index di-update per record saat ada
+penulisan sehingga kombinasi filter cukup diselesaikan dengan irisan set,
+dan jumlah part per nilai tersedia langsung untuk label opsi filter.
+
+Bersama status per part, index juga menyimpan cube jumlah part per status
+untuk setiap kombinasi dimensi facet (status saja, status x kategori, ...,
+status x mesin x material x kategori) yang ikut di-update setiap kali record
+atau statusnya berubah. KPI dan grafik dashboard dijawab dari cube terkecil
+yang memuat dimensi yang diminta, dalam waktu sebanding dengan jumlah
+kelompok, bukan jumlah part.
+
+Nilai dinormalisasi tanpa membedakan huruf besar/kecil ("suzuki" dan
+"Suzuki" satu opsi); label yang ditampilkan adalah ejaan yang paling sering
+dipakai.
+"""
+from collections import Counter, defaultdict
+from itertools import combinations
+
+from status_engine import STATUS_NAMES
+
+FACET_FIELDS = ('machine_name', 'material', 'category')
+# Posisi dimensi facet di setiap cube; semua cube juga dikelompokkan per status
+CUBE_DIMENSIONS = [
+    dims for size in range(len(FACET_FIELDS) + 1) for dims in combinations(range(len(FACET_FIELDS)), size)
+]
+ALL = "All"
+
+
+def facet_key(value):
+    """Kunci facet: teks tanpa spasi di tepi dan tanpa beda huruf besar/kecil"""
+    if value is None:
+        return ''
+    return str(value).strip().casefold()
+
+
+def _spelling(value):
+    return '' if value is None else str(value).strip()
+
+
+class FacetIndex:
+    """value -> set part_number per dimensi filter, ditambah status per tanggal"""
+
+    def __init__(self, records=()):
+        self._members = {field: defaultdict(set) for field in FACET_FIELDS}
+        self._spellings = {field: defaultdict(Counter) for field in FACET_FIELDS}
+        self._status_members = {name: set() for name in STATUS_NAMES}
+        self._status_of = {}
+        self._keys = {}  # part_number -> kunci facet (mesin, material, kategori)
+        self._cubes = {dims: Counter() for dims in CUBE_DIMENSIONS}  # (status, kunci...) -> jumlah part
+        self.status_date = None  # tanggal status facet dihitung, None jika belum
+        for record in records:
+            self.add(record)
+
+    def add(self, record):
+        part_number = record['part_number']
+        keys = []
+        for field in FACET_FIELDS:
+            value = record.get(field)
+            key = facet_key(value)
+            self._members[field][key].add(part_number)
+            self._spellings[field][key][_spelling(value)] += 1
+            keys.append(key)
+        self._keys[part_number] = tuple(keys)
+
+    def remove(self, record):
+        part_number = record['part_number']
+        for field in FACET_FIELDS:
+            value = record.get(field)
+            key = facet_key(value)
+            members = self._members[field].get(key)
+            if members is None:
+                continue
+            members.discard(part_number)
+            spellings = self._spellings[field][key]
+            spelling = _spelling(value)
+            spellings[spelling] -= 1
+            if spellings[spelling] <= 0:
+                del spellings[spelling]
+            if not members:
+                del self._members[field][key]
+                del self._spellings[field][key]
+        status = self._status_of.pop(part_number, None)
+        keys = self._keys.pop(part_number, None)
+        if status is not None:
+            self._status_members[status].discard(part_number)
+            self._count(status, keys, -1)
+
+    def reset_status(self, date, statuses):
+        """Isi ulang status facet dari pemetaan ``part_number -> status`` untuk ``date``"""
+        self._status_members = {name: set() for name in STATUS_NAMES}
+        self._status_of = dict(statuses)
+        for part_number, status in self._status_of.items():
+            self._status_members[status].add(part_number)
+        # Cube lengkap dihitung sekali per part, cube lain dijumlahkan dari sel-selnya
+        full = Counter((status,) + self._keys[number] for number, status in self._status_of.items())
+        self._cubes = {dims: Counter() for dims in CUBE_DIMENSIONS}
+        for dims, cube in self._cubes.items():
+            for cell, count in full.items():
+                cube[(cell[0],) + tuple(cell[1 + i] for i in dims)] += count
+        self.status_date = date
+
+    def update_status(self, statuses):
+        """Update status sebagian part (setelah part ditulis)"""
+        for part_number, status in statuses.items():
+            previous = self._status_of.get(part_number)
+            if previous == status:
+                continue
+            keys = self._keys[part_number]
+            if previous is not None:
+                self._status_members[previous].discard(part_number)
+                self._count(previous, keys, -1)
+            self._status_of[part_number] = status
+            self._status_members[status].add(part_number)
+            self._count(status, keys, 1)
+
+    def _count(self, status, keys, delta):
+        for dims, cube in self._cubes.items():
+            cell = (status,) + tuple(keys[i] for i in dims)
+            cube[cell] += delta
+            if cube[cell] <= 0:
+                del cube[cell]
+
+    def label(self, field, key):
+        """Ejaan nilai yang paling sering dipakai untuk satu kunci facet"""
+        spellings = self._spellings[field].get(key)
+        return spellings.most_common(1)[0][0] if spellings else key
+
+    def options(self, field):
+        """List (kunci, label, jumlah part) terurut berdasarkan label"""
+        return sorted(
+            ((key, self.label(field, key), len(members)) for key, members in self._members[field].items()),
+            key=lambda option: option[1].casefold()
+        )
+
+    def status_count(self, status):
+        return len(self._status_members.get(status, ()))
+
+    def aggregate(self, by, status_filter=STATUS_NAMES, machine=ALL, material=ALL, category=ALL):
+        """Jumlah part per status atau per kunci facet ``by`` untuk part yang lolos filter.
+
+        Dijawab dari cube dengan dimensi ``by`` dan dimensi yang difilter saja,
+        sehingga biayanya sebanding dengan jumlah kelompok di cube itu.
+        """
+        filters = {i: facet_key(key) for i, key in enumerate((machine, material, category)) if key != ALL}
+        grouped = set(filters) if by == 'status' else set(filters) | {FACET_FIELDS.index(by)}
+        dims = tuple(sorted(grouped))
+        position = 0 if by == 'status' else 1 + dims.index(FACET_FIELDS.index(by))
+        wanted = [(1 + dims.index(i), key) for i, key in filters.items()]
+        statuses = set(status_filter)
+        counts = Counter()
+        for cell, count in self._cubes[dims].items():
+            if cell[0] in statuses and all(cell[i] == key for i, key in wanted):
+                counts[cell[position]] += count
+        return counts
+
+    def match(self, status_filter, machine=ALL, material=ALL, category=ALL):
+        """Set part_number yang lolos semua filter (irisan set, mulai dari yang terkecil)"""
+        sets = [set().union(*(self._status_members.get(status, set()) for status in status_filter))]
+        for field, key in zip(FACET_FIELDS, (machine, material, category)):
+            if key != ALL:
+                sets.append(self._members[field].get(facet_key(key), set()))
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
@@ -0,0 +1,505 @@
+"""Cache data fleet per proses yang dipakai bersama semua session Streamlit.
+
+Streamlit menjalankan ulang ``app.py`` setiap ada interaksi, tetapi modul
+yang di-import tetap tinggal di ``sys.modules``. ``get_fleet`` menyimpan satu
+``Fleet`` per konfigurasi storage di level modul sehingga data hanya dibaca
+ulang jika storage berubah dari luar aplikasi (mtime/ukuran file JSON atau
+``data_version`` SQLite). Semua tulisan aplikasi lewat ``Fleet`` sehingga
+cache langsung ikut ter-update. Status juga dihitung ulang saat ada
+pembacaan hour meter baru (lihat ``meters``).
+
+Status per part di index facet (dan cube jumlah part untuk KPI dan grafik)
+dibawa ke hari berikutnya secara inkremental: hanya part yang tanggal
+Warning atau tanggal gantinya terlewati yang dihitung ulang.
+
+Dalam mode prediktif (lihat ``prediction``) sisa usia prediksi seluruh fleet
+dihitung dengan satu panggilan model dan di-cache per versi data, tanggal
+dan file model.
+
+Storage multi-plant (``PART_STORAGE=sharded``) memakai satu ``Fleet`` per
+shard yang digabung oleh ``shards.ShardedFleet``.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, time
+
+import numpy as np
+
+from due_index import DueIndex, status_entries
+from facets import FacetIndex, facet_key
+from history import get_history
+from meters import get_meters
+from prediction import get_model, predict_fleet
+from search import SEARCH_LIMIT, SearchIndex
+from status_engine import STATUS_NAMES, compute_fleet_status, content_hashes
+from storage import StaleRecordError, open_storage
+
+QUERY_CACHE_SIZE = 32
+PAGE_SIZE = 50
+SORT_KEYS = ('remaining_hours', 'replacement_date', 'machine_name')
+
+logger = logging.getLogger(__name__)
+
+
+def merge_record(base, mine, current):
+    """Gabungkan perubahan dua operator pada satu record (three-way merge).
+
+    ``base`` adalah record saat operator mulai mengedit, ``mine`` hasil
+    editannya dan ``current`` record terbaru di storage. Field yang hanya
+    diubah salah satu pihak digabung; jika field yang sama diubah ke nilai
+    berbeda hasilnya None (konflik).
+    """
+    merged = dict(current)
+    for field, value in mine.items():
+        if field == 'version' or value == base.get(field):
+            continue
+        if current.get(field) not in (base.get(field), value):
+            return None
+        merged[field] = value
+    return merged
+
+
+def sort_order(result, sort, ascending=True):
+    """Urutan baris DataFrame status untuk kunci sort ``SORT_KEYS``"""
+    if sort == 'machine_name':
+        # Mesin dulu, lalu part yang paling cepat harus diganti
+        machines = np.asarray(result['machine_name'].map(facet_key), dtype=str)
+        order = np.lexsort((result['replacement_date'].to_numpy(), machines))
+    else:
+        order = np.argsort(result[sort].to_numpy(), kind='stable')
+    return order[::-1] if not ascending else order
+
+
+class Fleet:
+    """Data part yang sudah di-load beserta hasil turunan (status, filter)"""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.version = 0
+        self._lock = threading.RLock()
+        self._history_errors = {}  # nomor part -> error pencatatan riwayat yang belum ditampilkan
+        self._load()
+
+    def _load(self):
+        self._index({str(p['part_number']): p for p in self.storage.load_all()})
+
+    def _index(self, records):
+        """Ganti seluruh data dan bangun ulang index facet"""
+        self._records = records
+        self._order = dict(zip(records, range(len(records))))
+        self._next_order = len(records)
+        self._facets = FacetIndex(records.values())
+        self._due = None  # index jatuh tempo, dibangun dari status saat pertama dipakai
+        self._warn = None  # index tanggal masuk Warning, dibangun bersama index jatuh tempo
+        self._search = None  # index pencarian part, dibangun saat pertama dipakai
+        self._meter_version = get_meters().version
+        self._changed()
+
+    def _changed(self):
+        """Naikkan versi data dan buang semua hasil turunan"""
+        self.version += 1
+        self._parts = None
+        self._status = None  # (tanggal, DataFrame status seluruh fleet)
+        self._hashes = None
+        self._queries = OrderedDict()
+        self._orders = OrderedDict()  # urutan baris hasil query per kunci sort
+        self._predictions = None  # (tanggal, stamp model, DataFrame prediksi, jumlah per filter)
+
+    def refresh(self):
+        """Reload data jika storage diubah di luar aplikasi ini atau ada pembacaan hour meter baru"""
+        with self._lock:
+            if self.storage.refresh():
+                self._load()
+            else:
+                self._sync_meters()
+        return self
+
+    @property
+    def parts(self):
+        """Semua record sebagai list, dibangun ulang hanya setelah data berubah"""
+        with self._lock:
+            if self._parts is None:
+                self._parts = list(self._records.values())
+            return self._parts
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, part_number):
+        return str(part_number) in self._records
+
+    def get(self, part_number):
+        """Record terbaru untuk satu nomor part (lookup O(1) lewat index part_number)"""
+        return self._records[str(part_number)]
+
+    def _write(self, apply, operation, *args, **kwargs):
+        """Jalankan operasi storage lalu terapkan hasilnya ke data dan index di memori.
+
+        Jika storage sempat memuat perubahan dari proses lain selama operasi,
+        seluruh data di-load ulang agar cache tidak tertinggal.
+        """
+        with self._lock:
+            generation = self.storage.generation
+            result = operation(*args, **kwargs)
+            if self.storage.generation != generation:
+                self._load()
+            else:
+                apply(result)
+                self._changed()
+            return result
+
+    def _pop(self, part_number):
+        record = self._records.pop(part_number, None)
+        if record is not None:
+            self._facets.remove(record)
+            if self._due is not None:
+                self._due.remove(part_number)
+                self._warn.remove(part_number)
+            if self._search is not None:
+                self._search.remove(record)
+            del self._order[part_number]
+
+    def _put(self, *records):
+        """Simpan record ke data di memori dan update index facet per record"""
+        now = datetime.now()
+        self._roll_status(now, lazy=True)
+        for record in records:
+            previous = self._records.get(record['part_number'])
+            if previous is not None:
+                self._facets.remove(previous)
+                if self._due is not None:
+                    self._due.remove(record['part_number'])
+                    self._warn.remove(record['part_number'])
+            else:
+                self._order[record['part_number']] = self._next_order
+                self._next_order += 1
+            self._records[record['part_number']] = record
+            self._facets.add(record)
+            if self._search is not None:
+                self._search.add(record)
+
+        if records and (self._facets.status_date is not None or self._due is not None):
+            status = compute_fleet_status(records, now)
+            if self._facets.status_date is not None:
+                self._facets.update_status(dict(zip((r['part_number'] for r in records), status['status'])))
+            if self._due is not None:
+                for entry in status_entries(status):
+                    self._due.add(*entry)
+                for entry in status_entries(status, 'warning_date'):
+                    self._warn.add(*entry)
+
+    def _sync_meters(self):
+        """Buang status dan index jatuh tempo jika ada pembacaan hour meter baru"""
+        version = get_meters().version
+        if version != self._meter_version:
+            self._meter_version = version
+            self._facets.status_date = None
+            self._due = self._warn = None
+            self._changed()
+
+    def insert(self, part, version=1):
+        return self._write(self._put, self.storage.insert, part, version)
+
+    def insert_many(self, parts):
+        """Tambah banyak part; hasilnya record yang benar-benar ditambahkan"""
+        return self._write(lambda records: self._put(*records), self.storage.insert_many, parts)
+
+    def update(self, part_number, part, expected_version=None):
+        def apply(record):
+            # Part tetap di posisi urutannya semula, juga jika nomornya diganti
+            slot = self._order[str(part_number)]
+            self._pop(str(part_number))
+            self._put(record)
+            self._order[record['part_number']] = slot
+        return self._write(apply, self.storage.update, part_number, part, expected_version)
+
+    def update_many(self, parts, expected_versions=None):
+        """Update banyak part dalam satu tulisan storage"""
+        return self._write(lambda records: self._put(*records), self.storage.update_many, parts, expected_versions)
+
+    def merge_update(self, part_number, base, part):
+        """Update dengan deteksi konflik berdasarkan versi ``base``.
+
+        Jika record sudah diubah operator lain, perubahan digabung bila tidak
+        bertabrakan; jika bertabrakan ``StaleRecordError`` diteruskan.
+        """
+        try:
+            return self.update(part_number, part, expected_version=base.get('version', 0))
+        except StaleRecordError:
+            with self._lock:
+                self.refresh()
+                current = self.get(part_number)
+                merged = merge_record(base, part, current)
+                if merged is None:
+                    raise
+                return self.update(part_number, merged, expected_version=current.get('version', 0))
+
+    def mark_replaced(self, part_number, install_date, expected_version=None):
+        """Reset tanggal pasang; lifecycle yang selesai dicatat di riwayat penggantian"""
+        with self._lock:
+            self.refresh()
+            previous = self.get(part_number)
+            record = self._write(self._put, self.storage.mark_replaced, part_number, install_date, expected_version)
+            try:
+                get_history().record_replacement(previous, install_date)
+            except Exception as e:
+                # Part sudah tersimpan; gagal mencatat riwayat bukan gagal simpan (lihat pop_history_error)
+                logger.exception("Riwayat penggantian part %s gagal dicatat", part_number)
+                self._history_errors[str(part_number)] = e
+            return record
+
+    def pop_history_error(self, part_number):
+        """Error pencatatan riwayat dari ``mark_replaced`` terakhir untuk part ini (sekali ambil), atau None"""
+        return self._history_errors.pop(str(part_number), None)
+
+    def delete(self, part_number, expected_version=None):
+        return self._write(lambda _: self._pop(str(part_number)), self.storage.delete, part_number, expected_version)
+
+    def replace_all(self, parts):
+        def apply(records):
+            self._index({record['part_number']: record for record in records})
+        return self._write(apply, self.storage.replace_all, parts)
+
+    def _roll_status(self, now=None, lazy=False):
+        """Bawa status di index facet ke tanggal ``now``.
+
+        Jika status hari sebelumnya dan index jatuh tempo sudah ada, hanya
+        part yang melewati tanggal Warning atau tanggal ganti yang dihitung
+        ulang; selain itu status seluruh fleet dihitung ulang. Index jatuh
+        tempo tidak dibangun saat load pertama, baru saat hari pertama kali
+        berganti. Dengan ``lazy`` (saat menulis) status yang belum pernah
+        dihitung dibiarkan sampai facet dipakai.
+        """
+        now = now or datetime.now()
+        self._sync_meters()
+        facets = self._facets
+        previous = facets.status_date
+        if previous == now.date() or (previous is None and lazy):
+            return
+        if previous is not None and previous < now.date() and self._due is not None:
+            numbers = self.status_crossings(datetime.combine(previous, time()), now)
+            status = compute_fleet_status([self._records[number] for number in numbers], now)
+            facets.update_status(dict(zip(status['part_number'].astype(str), status['status'])))
+            facets.status_date = now.date()
+        else:
+            fleet = self.fleet_status(now)
+            facets.reset_status(now.date(), dict(zip(fleet['part_number'].astype(str), fleet['status'])))
+            if previous is not None:
+                # Hari berganti tanpa index jatuh tempo: bangun dari status yang sama
+                # agar pergantian hari berikutnya cukup inkremental
+                self._due_indexes(now)
+
+    def facets(self, now=None):
+        """Index facet dengan status facet yang sudah dihitung untuk hari ini"""
+        with self._lock:
+            self._roll_status(now)
+            return self._facets
+
+    def aggregate(self, by, status_filter=STATUS_NAMES, machine="All", material="All", category="All", now=None):
+        """Jumlah part per status atau per nilai ``by`` (mesin/material/kategori) untuk filter ini.
+
+        Dijawab dari cube di index facet tanpa menghitung status per part.
+        Untuk ``by='status'`` hasilnya selalu berisi ketiga status; untuk
+        dimensi facet kuncinya label yang ditampilkan, urut label.
+        """
+        with self._lock:
+            facets = self.facets(now)
+            counts = facets.aggregate(by, status_filter, machine, material, category)
+            if by == 'status':
+                return {name: counts.get(name, 0) for name in STATUS_NAMES}
+            labels = {key: facets.label(by, key) for key in counts}
+            return {labels[key]: counts[key] for key in sorted(counts, key=lambda key: labels[key].casefold())}
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Nomor part yang cocok dengan teks pencarian (nomor, kode atau mesin), paling relevan lebih dulu"""
+        with self._lock:
+            if self._search is None:
+                self._search = SearchIndex(self._records.values())
+            return self._search.search(query, limit)
+
+    def facet_options(self, field):
+        """List (kunci, label, jumlah part) untuk satu filter sidebar"""
+        with self._lock:
+            return self._facets.options(field)
+
+    def content_hashes(self):
+        """Hash isi record per ``part_number``, di-cache per versi data"""
+        with self._lock:
+            if self._hashes is None:
+                self._hashes = content_hashes(self.parts)
+            return self._hashes
+
+    def fleet_status(self, now=None):
+        """DataFrame status seluruh fleet, dihitung ulang jika data atau tanggal berubah"""
+        today = (now or datetime.now()).date()
+        with self._lock:
+            self._sync_meters()
+            if self._status is None or self._status[0] != today:
+                self._status = (today, compute_fleet_status(self.parts, now))
+            return self._status[1]
+
+    def _predicted(self, now=None):
+        """Cache prediksi untuk hari ini dan model terakhir, None jika mode prediktif tidak aktif"""
+        model = get_model()
+        if model is None:
+            return None
+        today = (now or datetime.now()).date()
+        status = self.fleet_status(now)  # sinkron hour meter lebih dulu (bisa membuang cache)
+        if self._predictions is None or self._predictions[:2] != (today, model.stamp):
+            self._predictions = (today, model.stamp, predict_fleet(status, model), {})
+        return self._predictions
+
+    def predictions(self, now=None):
+        """DataFrame umur, sisa usia dan status prediksi per ``part_number``, None tanpa model umur"""
+        with self._lock:
+            cached = self._predicted(now)
+            return None if cached is None else cached[2]
+
+    def predicted_counts(self, status_filter=STATUS_NAMES, machine="All", material="All", category="All", now=None):
+        """Jumlah part per status prediksi untuk filter ini (filter status = status nominal)"""
+        with self._lock:
+            cached = self._predicted(now)
+            if cached is None:
+                return None
+            key = (tuple(status_filter), machine, material, category)
+            counts = cached[3].get(key)
+            if counts is None:
+                predicted = cached[2]['predicted_status']
+                matched = self.facets(now).match(status_filter, machine, material, category)
+                if len(matched) != len(self._records):
+                    predicted = predicted.reindex(list(matched))
+                totals = predicted.value_counts()
+                if len(cached[3]) >= QUERY_CACHE_SIZE:
+                    cached[3].clear()
+                counts = cached[3][key] = {name: int(totals.get(name, 0)) for name in STATUS_NAMES}
+            return counts
+
+    def query(self, status_filter, machine="All", material="All", category="All", now=None):
+        """DataFrame status part yang lolos filter, di-cache per versi data dan tanggal.
+
+        Filter diselesaikan lewat irisan set di index facet; status hanya
+        dihitung untuk part yang lolos filter.
+        """
+        today = (now or datetime.now()).date()
+        key = (today, tuple(status_filter), machine, material, category)
+        with self._lock:
+            self._sync_meters()
+            if key in self._queries:
+                self._queries.move_to_end(key)
+                return self._queries[key]
+
+            matched = self.facets(now).match(status_filter, machine, material, category)
+            if len(matched) == len(self._records):
+                result = self.fleet_status(now)
+            else:
+                numbers = sorted(matched, key=self._order.__getitem__)
+                result = compute_fleet_status([self._records[number] for number in numbers], now)
+
+            self._queries[key] = result
+            if len(self._queries) > QUERY_CACHE_SIZE:
+                self._queries.popitem(last=False)
+            return result
+
+    def due_within(self, days, machine="All", now=None):
+        """DataFrame status part yang jatuh tempo dalam ``days`` hari, urut tanggal ganti.
+
+        Dijawab lewat index jatuh tempo (O(log n + k)); status hanya dihitung
+        untuk k part yang ditemukan.
+        """
+        with self._lock:
+            numbers = self._due_indexes(now)[0].due_within(days, None if machine == "All" else machine, now)
+            return compute_fleet_status([self._records[number] for number in numbers], now)
+
+    def _due_indexes(self, now=None):
+        """(index tanggal ganti, index tanggal Warning), dibangun dari status fleet saat pertama dipakai.
+
+        Kedua tanggal tidak bergantung pada hari ini, sehingga index hanya
+        dibangun ulang setelah data dimuat ulang atau ada pembacaan meter baru.
+        """
+        self._sync_meters()
+        if self._due is None:
+            status = self.fleet_status(now)
+            self._due = DueIndex(status_entries(status))
+            self._warn = DueIndex(status_entries(status, 'warning_date'))
+        return self._due, self._warn
+
+    def status_crossings(self, since, now=None):
+        """part_number yang tanggal ganti atau tanggal Warning-nya jatuh di (``since``, hari ini].
+
+        Hanya part ini yang statusnya bisa berubah karena waktu berjalan sejak
+        tengah malam ``since`` (data tidak berubah); dijawab lewat kedua index
+        dengan binary search, O(log n + k).
+        """
+        today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        with self._lock:
+            due, warn = self._due_indexes(now)
+            return set(due.due_between(since, today)) | set(warn.due_between(since, today))
+
+    def page(self, status_filter, machine="All", material="All", category="All",
+             sort='remaining_hours', ascending=True, offset=0, limit=PAGE_SIZE, now=None):
+        """Satu halaman hasil filter yang sudah diurutkan: (DataFrame, jumlah total baris).
+
+        Urutan baris dihitung sekali per kombinasi filter, kunci sort dan
+        versi data; halaman berikutnya cukup mengambil potongan ``limit`` baris.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Kunci sort tidak dikenal: {sort}")
+        today = (now or datetime.now()).date()
+        key = (today, tuple(status_filter), machine, material, category, sort, ascending)
+        with self._lock:
+            result = self.query(status_filter, machine, material, category, now)
+            order = self._orders.get(key)
+            if order is None:
+                order = self._orders[key] = sort_order(result, sort, ascending)
+                if len(self._orders) > QUERY_CACHE_SIZE:
+                    self._orders.popitem(last=False)
+            else:
+                self._orders.move_to_end(key)
+            return result.iloc[order[offset:offset + limit]], len(result)
+
+
+def status_groups(fleet, by, status_filter=STATUS_NAMES, machine="All", material="All", category="All", now=None):
+    """Jumlah part per status untuk setiap nilai ``by`` (mesin/material/kategori), urut label.
+
+    Dijawab dari cube lewat ``aggregate`` per status; nilai yang hanya beda
+    huruf besar/kecil menjadi satu kelompok seperti filter facet di dashboard.
+    """
+    labels, groups = {}, {}
+    for status in status_filter:
+        for label, count in fleet.aggregate(by, [status], machine, material, category, now).items():
+            key = facet_key(label)
+            labels.setdefault(key, label)
+            groups.setdefault(key, dict.fromkeys(status_filter, 0))[status] += count
+    return {labels[key]: groups[key] for key in sorted(groups, key=lambda key: labels[key].casefold())}
+
+
+_fleets = {}
+_fleets_lock = threading.Lock()
+_fleet_locks = {}  # lock per kunci: fleet berbeda bisa di-load bersamaan
+
+
+def shared_fleet(key, opener):
+    """Fleet per proses untuk ``key``; storage dibuka lewat ``opener()`` saat pertama dipakai"""
+    with _fleets_lock:
+        lock = _fleet_locks.setdefault(key, threading.Lock())
+    with lock:
+        fleet = _fleets.get(key)
+        if fleet is None:
+            fleet = _fleets[key] = Fleet(opener())
+    return fleet
+
+
+def get_fleet(backend=None, plants=None):
+    """Fleet bersama untuk konfigurasi storage saat ini, di-refresh jika data berubah.
+
+    Untuk storage multi-plant (``PART_STORAGE=sharded``) hasilnya gabungan
+    shard plant ``plants`` (None = semua plant), lihat ``shards``.
+    """
+    backend = (backend or os.environ.get("PART_STORAGE", "json")).lower()
+    if backend == "sharded":
+        from shards import get_sharded_fleet
+        return get_sharded_fleet(plants)
+    key = (backend, os.environ.get("PART_DATA_FILE"), os.environ.get("PART_DB_FILE"))
+    return shared_fleet(key, lambda: open_storage(backend)).refresh()
@@ -0,0 +1,269 @@
+"""Riwayat penggantian part (append-only) dan analitik umur part / MTBF.
+
+"Tandai Sudah Diganti" me-reset ``install_date`` part. Sebelum itu lifecycle
+yang baru selesai dicatat sebagai satu event di log riwayat, sehingga umur
+aktual setiap periode pemakaian part tidak hilang. Log disimpan di folder
+``replacement_history`` (env ``PART_HISTORY_DIR``):
+
+- ``events.bin``: record biner berukuran tetap (``EVENT_DTYPE``, 36 byte per
+  event) yang hanya ditambah di akhir file
+- ``strings.txt``: tabel string (nomor/kode part, mesin, material, kategori),
+  satu string JSON per baris; event menyimpan nomor barisnya
+
+Log dibaca sekali sebagai array NumPy; setelah itu cukup event dan string
+yang ditambahkan di akhir file yang dibaca (juga tulisan proses lain).
+Index offset per part (baris event per ``part_number``, urut waktu) menjawab
+riwayat satu part tanpa scan. Umur aktual vs rekomendasi, MTBF dan tingkat
+kegagalan dini dihitung kolumnar (``np.bincount``/groupby atas kode
+kelompok), bukan per event.
+
+Umur aktual adalah jam operasi dari tanggal pasang sampai tanggal ganti,
+dihitung dengan ``compute_fleet_status`` (kalender operasi dan hour meter
+mesin), tanpa dibatasi rekomendasi.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from status_engine import compute_fleet_status
+from storage import FileLock
+
+DEFAULT_HISTORY_DIR = "replacement_history"
+EVENTS_FILE = "events.bin"
+STRINGS_FILE = "strings.txt"
+EARLY_FAILURE_RATIO = 0.5  # diganti sebelum 50% jam rekomendasi dianggap gagal dini
+NO_DAY = np.iinfo(np.int32).min  # tanggal pasang tidak valid
+
+STRING_FIELDS = ('part_number', 'part_code', 'machine_name', 'material', 'category')
+GROUP_FIELDS = ('part_code', 'material', 'machine_name')
+EVENT_DTYPE = np.dtype(
+    [(field, '<i4') for field in STRING_FIELDS]
+    + [('install_day', '<i4'), ('replaced_day', '<i4'), ('recommended_usage', '<f4'), ('actual_hours', '<f4')]
+)
+
+
+def history_dir():
+    return os.environ.get("PART_HISTORY_DIR", DEFAULT_HISTORY_DIR)
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def _day_number(value):
+    """Nomor hari sejak 1970-01-01, ``NO_DAY`` jika tanggal tidak valid"""
+    if pd.isna(value):
+        return NO_DAY
+    return int(pd.Timestamp(value).normalize().value // 86_400_000_000_000)
+
+
+def _dates(days):
+    dates = np.full(len(days), np.datetime64('NaT'), dtype='datetime64[ns]')
+    valid = days != NO_DAY
+    dates[valid] = days[valid].astype('datetime64[D]')
+    return dates
+
+
+class ReplacementHistory:
+    """Log event penggantian di memori (array terstruktur) beserta index per part"""
+
+    def __init__(self, root=None):
+        self.root = root or history_dir()
+        self.events_file = os.path.join(self.root, EVENTS_FILE)
+        self.strings_file = os.path.join(self.root, STRINGS_FILE)
+        self.version = 0
+        self._lock = threading.RLock()
+        self._events = np.empty(0, dtype=EVENT_DTYPE)
+        self._strings = []
+        self._string_ids = {}
+        self._strings_offset = 0
+        self._index = None  # (part_number id terurut, baris event) untuk riwayat per part
+        self._groups = None  # (jumlah string, kode kelompok per string id, label per kode)
+        self.refresh()
+
+    def __len__(self):
+        return len(self._events)
+
+    def refresh(self):
+        """Baca string dan event yang ditambahkan sejak pembacaan terakhir"""
+        with self._lock:
+            # String lebih dulu: penulis menulis string sebelum event yang memakainya
+            if _file_size(self.strings_file) > self._strings_offset:
+                with open(self.strings_file, 'rb') as f:
+                    f.seek(self._strings_offset)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break  # baris terakhir belum selesai ditulis
+                        value = json.loads(line)
+                        self._string_ids[value] = len(self._strings)
+                        self._strings.append(value)
+                        self._strings_offset += len(line)
+            loaded = len(self._events) * EVENT_DTYPE.itemsize
+            count = (_file_size(self.events_file) - loaded) // EVENT_DTYPE.itemsize
+            if count > 0:
+                new = np.fromfile(self.events_file, dtype=EVENT_DTYPE, count=count, offset=loaded)
+                self._events = np.concatenate([self._events, new])
+                self._index = None
+                self.version += 1
+        return self
+
+    def record_replacement(self, part, replaced_date):
+        """Catat lifecycle ``part`` (record sebelum diganti) yang selesai pada ``replaced_date``"""
+        replaced = pd.Timestamp(replaced_date).normalize()
+        status = compute_fleet_status([part], replaced).iloc[0]
+        os.makedirs(self.root, exist_ok=True)
+        with FileLock(os.path.join(self.root, "history.lock")), self._lock:
+            self.refresh()
+            # Buang sisa tulisan yang terpotong (crash) sebelum menambah di akhir file
+            for path, size in ((self.strings_file, self._strings_offset),
+                               (self.events_file, len(self._events) * EVENT_DTYPE.itemsize)):
+                if _file_size(path) > size:
+                    with open(path, 'r+b') as f:
+                        f.truncate(size)
+
+            new_strings, ids = {}, []
+            for field in STRING_FIELDS:
+                value = '' if part.get(field) is None else str(part.get(field))
+                string_id = self._string_ids.get(value)
+                if string_id is None:
+                    string_id = new_strings.setdefault(value, len(self._strings) + len(new_strings))
+                ids.append(string_id)
+            if new_strings:
+                lines = "".join(json.dumps(value, ensure_ascii=False) + "\n" for value in new_strings)
+                with open(self.strings_file, 'ab') as f:
+                    f.write(lines.encode('utf-8'))
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            event = np.zeros(1, dtype=EVENT_DTYPE)
+            for field, string_id in zip(STRING_FIELDS, ids):
+                event[field] = string_id
+            event['install_day'] = _day_number(status['install_dt'])
+            event['replaced_day'] = _day_number(replaced)
+            event['recommended_usage'] = pd.to_numeric(status['recommended_usage'], errors='coerce')
+            event['actual_hours'] = status['hours_used'] if pd.notna(status['install_dt']) else np.nan
+            with open(self.events_file, 'ab') as f:
+                f.write(event.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self.refresh()
+
+    def _frame(self, events):
+        """DataFrame event dengan string, tanggal dan rasio umur"""
+        strings = np.array(self._strings, dtype=object)
+        frame = pd.DataFrame({field: strings[events[field]] for field in STRING_FIELDS})
+        frame['install_date'] = _dates(events['install_day'])
+        frame['replaced_date'] = _dates(events['replaced_day'])
+        frame['recommended_usage'] = events['recommended_usage'].astype(float)
+        frame['actual_hours'] = events['actual_hours'].astype(float)
+        frame['life_ratio'] = frame['actual_hours'] / frame['recommended_usage']
+        frame['early_failure'] = frame['life_ratio'] < EARLY_FAILURE_RATIO
+        return frame
+
+    def events(self, start=None, end=None):
+        """Semua event (opsional tanggal ganti di rentang [``start``, ``end``]) sebagai DataFrame"""
+        with self._lock:
+            return self._frame(self._select(start, end))
+
+    def part_events(self, part_number):
+        """Seluruh lifecycle satu part, urut waktu pencatatan, lewat index offset per part"""
+        with self._lock:
+            string_id = self._string_ids.get(str(part_number))
+            if string_id is None:
+                return self._frame(self._events[:0])
+            if self._index is None:
+                order = np.argsort(self._events['part_number'], kind='stable')
+                self._index = (self._events['part_number'][order], order)
+            keys, order = self._index
+            start, end = np.searchsorted(keys, [string_id, string_id + 1])
+            return self._frame(self._events[order[start:end]])
+
+    def period(self):
+        """(tanggal ganti pertama, tanggal ganti terakhir) sebagai ``date``, None jika log kosong"""
+        with self._lock:
+            if not len(self._events):
+                return None
+            days = self._events['replaced_day']
+            return tuple(pd.Timestamp(day, unit='D').date() for day in (days.min(), days.max()))
+
+    def _in_period(self, start=None, end=None):
+        """Mask event dengan tanggal ganti di rentang [``start``, ``end``]"""
+        days = self._events['replaced_day']
+        mask = np.ones(len(days), dtype=bool)
+        if start is not None:
+            mask &= days >= _day_number(start)
+        if end is not None:
+            mask &= days <= _day_number(end)
+        return mask
+
+    def _select(self, start=None, end=None):
+        return self._events[self._in_period(start, end)]
+
+    def _group_codes(self):
+        """Kode kelompok per string id (tanpa beda huruf besar/kecil) dan label per kode"""
+        if self._groups is None or self._groups[0] != len(self._strings):
+            strings = pd.Series(self._strings, dtype=object)
+            codes, _ = pd.factorize(strings.str.strip().str.casefold())
+            labels = strings.str.strip().groupby(codes).first().to_numpy(dtype=object)
+            self._groups = (len(self._strings), codes, labels)
+        return self._groups[1:]
+
+    def summary(self, by=None, start=None, end=None, min_events=1):
+        """Umur aktual vs rekomendasi per kelompok ``by`` (``GROUP_FIELDS``), atau satu baris total.
+
+        MTBF = total jam operasi lifecycle yang selesai / jumlah penggantian.
+        Lifecycle dengan tanggal pasang atau rekomendasi tidak valid tidak dihitung.
+        """
+        if by is not None and by not in GROUP_FIELDS:
+            raise ValueError(f"Kolom kelompok tidak dikenal: {by}")
+        with self._lock:
+            # Hanya kolom yang dipakai yang diambil dari array event
+            hours = self._events['actual_hours'].astype(float)
+            recommended = self._events['recommended_usage'].astype(float)
+            mask = self._in_period(start, end) & ~np.isnan(hours) & ~np.isnan(recommended)
+            hours, recommended = hours[mask], recommended[mask]
+            if by is None:
+                codes, labels = np.zeros(len(hours), dtype=np.intp), np.array(["Semua"], dtype=object)
+            else:
+                string_codes, labels = self._group_codes()
+                codes = string_codes[self._events[by][mask]]
+
+        size = len(labels)
+        count = np.bincount(codes, minlength=size)
+        total = np.bincount(codes, weights=hours, minlength=size)
+        total_recommended = np.bincount(codes, weights=recommended, minlength=size)
+        early = np.bincount(codes, weights=hours < EARLY_FAILURE_RATIO * recommended, minlength=size)
+        median = pd.Series(hours).groupby(codes).median().reindex(range(size)).to_numpy()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = pd.DataFrame({
+                by or 'group': labels,
+                'replacements': count,
+                'mtbf': total / count,
+                'median_hours': median,
+                'recommended_usage': total_recommended / count,
+                'life_ratio': total / total_recommended,
+                'early_failure_rate': early / count,
+            })
+        result = result[result['replacements'] >= max(min_events, 1)]
+        return result.sort_values(['replacements', 'mtbf'], ascending=[False, True]).reset_index(drop=True)
+
+
+_histories = {}
+_histories_lock = threading.Lock()
+
+
+def get_history():
+    """Riwayat penggantian bersama per proses, event dari proses lain ikut dibaca"""
+    root = history_dir()
+    with _histories_lock:
+        history = _histories.get(root)
+        if history is None:
+            history = _histories[root] = ReplacementHistory(root)
+    return history.refresh()
@@ -0,0 +1,305 @@
+"""Import CSV bertahap (chunked) dengan validasi kolumnar.
+
+File CSV dibaca per batch berukuran tetap sehingga memori tidak bergantung
+pada ukuran file. Setiap batch divalidasi per kolom (format tanggal,
+rentang ``recommended_usage``, kategori), baris yang ditolak dicatat beserta
+alasannya, dan baris yang valid langsung disimpan per batch.
+
+Mode sinkron (upsert) mencocokkan setiap baris dengan data lama lewat
+``part_number`` dan hash isi record: hanya part baru dan part yang isinya
+berubah yang ditulis ke storage.
+"""
+import pandas as pd
+
+from status_engine import CATEGORIES, PART_COLUMNS, content_hashes
+
+IMPORT_CHUNK_SIZE = 10000  # baris per batch
+MIN_USAGE = 1
+MAX_USAGE = 1000000  # jam
+MAX_REJECTED_ROWS = 10000  # baris ditolak yang disimpan untuk laporan
+
+TEXT_COLUMNS = ['part_number', 'part_code', 'machine_name', 'material']
+
+
+class ImportReport:
+    """Ringkasan hasil import: jumlah baris per hasil dan daftar baris yang ditolak"""
+
+    def __init__(self):
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.skipped = 0  # valid tetapi nomor part sudah ada
+        self.rejected = 0
+        self.batches = 0
+        self._rejected_frames = []
+        self._rejected_kept = 0
+
+    def add_rejected(self, frame):
+        self.rejected += len(frame)
+        room = MAX_REJECTED_ROWS - self._rejected_kept
+        if room > 0 and len(frame):
+            self._rejected_frames.append(frame.head(room))
+            self._rejected_kept += min(room, len(frame))
+
+    def rejected_rows(self):
+        """DataFrame baris yang ditolak (nomor baris CSV, nomor part, alasan)"""
+        if not self._rejected_frames:
+            return pd.DataFrame(columns=['baris', 'part_number', 'alasan'])
+        return pd.concat(self._rejected_frames, ignore_index=True)
+
+
+def _file_size(source):
+    source.seek(0, 2)
+    size = source.tell()
+    source.seek(0)
+    return size
+
+
+def read_preview(source, rows=5):
+    """Baca beberapa baris awal dan kolom yang belum ada, posisi file dikembalikan ke awal"""
+    source.seek(0)
+    preview = pd.read_csv(source, nrows=rows, dtype=str)
+    source.seek(0)
+    missing = [column for column in PART_COLUMNS if column not in preview.columns]
+    return preview, missing
+
+
+def validate_chunk(chunk, row_offset=2):
+    """Validasi satu batch secara kolumnar.
+
+    Hasilnya tuple (DataFrame record valid, DataFrame baris yang ditolak).
+    Nomor baris yang ditolak = index ``chunk`` + ``row_offset`` (default
+    nomor baris file CSV).
+    """
+    reasons = pd.Series('', index=chunk.index)
+
+    def reject(mask, reason):
+        reasons[mask] = reasons[mask] + reason + '; '
+
+    text = {}
+    for column in TEXT_COLUMNS:
+        text[column] = chunk[column].fillna('').astype(str).str.strip()
+        reject(text[column] == '', f"{column} kosong")
+
+    install_date = pd.to_datetime(chunk['install_date'], format="%Y-%m-%d", errors='coerce')
+    reject(install_date.isna(), "install_date harus berformat YYYY-MM-DD")
+
+    usage = pd.to_numeric(chunk['recommended_usage'], errors='coerce')
+    reject(usage.isna(), "recommended_usage bukan angka")
+    reject(usage.notna() & ((usage < MIN_USAGE) | (usage > MAX_USAGE)),
+           f"recommended_usage di luar rentang {MIN_USAGE}-{MAX_USAGE}")
+    reject(usage.notna() & (usage % 1 != 0), "recommended_usage harus bilangan bulat")
+
+    category = chunk['category'].fillna('').astype(str).str.strip()
+    reject(~category.isin(CATEGORIES), f"category harus salah satu dari {', '.join(CATEGORIES)}")
+
+    valid = reasons == ''
+    rejected = pd.DataFrame({
+        'baris': chunk.index[~valid] + row_offset,  # CSV: +1 header, +1 nomor baris mulai dari 1
+        'part_number': chunk['part_number'][~valid],
+        'alasan': reasons[~valid].str.rstrip('; '),
+    })
+
+    records = pd.DataFrame({
+        **{column: text[column][valid] for column in TEXT_COLUMNS},
+        'install_date': install_date[valid].dt.strftime("%Y-%m-%d"),
+        'recommended_usage': usage[valid].astype('int64'),
+        'category': category[valid],
+    })[PART_COLUMNS]
+    return records, rejected
+
+
+def _valid_batches(source, report, chunksize, progress):
+    """Baca ``source`` per batch dan hasilkan DataFrame baris yang valid.
+
+    Baris yang ditolak dicatat di ``report``; ``progress(fraction, report)``
+    dipanggil setelah setiap batch selesai diproses pemanggil.
+    """
+    size = _file_size(source) or 1
+    for chunk in pd.read_csv(source, dtype=str, chunksize=chunksize, usecols=PART_COLUMNS):
+        records, rejected = validate_chunk(chunk)
+        report.rows += len(chunk)
+        report.batches += 1
+        report.add_rejected(rejected)
+        yield records
+        if progress is not None:
+            progress(min(source.tell() / size, 1.0), report)
+
+
+def _record_batches(parts, report, chunksize):
+    """Seperti ``_valid_batches`` untuk list dict part (mis. body JSON API).
+
+    Nomor baris yang ditolak adalah posisi di list, mulai dari 0.
+    """
+    for start in range(0, len(parts), chunksize):
+        chunk = pd.DataFrame.from_records(parts[start:start + chunksize], columns=PART_COLUMNS)
+        chunk.index += start
+        records, rejected = validate_chunk(chunk, row_offset=0)
+        report.rows += len(chunk)
+        report.batches += 1
+        report.add_rejected(rejected)
+        yield records
+
+
+def import_csv(source, fleet, replace=False, chunksize=IMPORT_CHUNK_SIZE, progress=None):
+    """Import CSV ke ``fleet`` batch demi batch.
+
+    Setiap batch yang valid langsung di-commit (``insert_many``), sehingga
+    data yang sudah masuk tetap tersimpan jika import berhenti di tengah.
+    Dengan ``replace=True`` semua batch valid dikumpulkan dulu lalu ditulis
+    sekaligus dengan satu ``replace_all`` di akhir, sehingga data lama tetap
+    utuh jika import gagal di tengah. Seperti ``insert_many``, baris dengan
+    nomor part yang sudah ada dilewati. ``progress(fraction, report)``
+    dipanggil setelah setiap batch.
+    """
+    report = ImportReport()
+    staged = {} if replace else None
+
+    for batch in _valid_batches(source, report, chunksize, progress):
+        records = batch.to_dict('records')
+        if staged is not None:
+            for record in records:
+                if staged.setdefault(record['part_number'], record) is not record:
+                    report.skipped += 1
+        elif records:
+            stored = fleet.insert_many(records)
+            report.inserted += len(stored)
+            report.skipped += len(records) - len(stored)
+
+    if staged:
+        report.inserted = len(fleet.replace_all(list(staged.values())))
+    return report
+
+
+class UpsertPlan(ImportReport):
+    """Hasil analisa mode sinkron: part baru dan part berubah yang akan ditulis.
+
+    ``expected_versions`` menyimpan versi record saat dianalisa; jika record
+    diubah operator lain sebelum rencana diterapkan, penerapan ditolak
+    dengan ``StaleRecordError``.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.new_parts = {}
+        self.changed_parts = {}
+        self.expected_versions = {}
+
+    @property
+    def new(self):
+        return len(self.new_parts)
+
+    @property
+    def changed(self):
+        return len(self.changed_parts)
+
+
+def plan_upsert(source, fleet, chunksize=IMPORT_CHUNK_SIZE, progress=None):
+    """Bandingkan CSV dengan data saat ini tanpa menulis apa pun.
+
+    Setiap baris valid diklasifikasikan sebagai baru, berubah atau tidak
+    berubah dengan membandingkan hash isinya dengan hash record lama.
+    Jika satu nomor part muncul beberapa kali, baris terakhir yang dipakai.
+    """
+    plan = UpsertPlan()
+    return _plan_batches(plan, _valid_batches(source, plan, chunksize, progress), fleet)
+
+
+def plan_upsert_records(parts, fleet, chunksize=IMPORT_CHUNK_SIZE):
+    """``plan_upsert`` untuk list dict part dengan kolom ``PART_COLUMNS``"""
+    plan = UpsertPlan()
+    return _plan_batches(plan, _record_batches(parts, plan, chunksize), fleet)
+
+
+def _plan_batches(plan, batches, fleet):
+    existing = fleet.content_hashes()
+    known_numbers = set()
+
+    for batch in batches:
+        batch = batch.drop_duplicates('part_number', keep='last')
+        hashes = content_hashes(batch)
+        positions = existing.index.get_indexer(hashes.index)
+        known = positions >= 0
+        same = known.copy()
+        same[known] = existing.to_numpy()[positions[known]] == hashes.to_numpy()[known]
+
+        for part in batch[~known].to_dict('records'):
+            plan.new_parts[part['part_number']] = part
+        for part in batch[known & ~same].to_dict('records'):
+            current = fleet.get(part['part_number'])
+            # Field tambahan di luar kolom CSV tetap dipertahankan
+            plan.changed_parts[part['part_number']] = dict(current, **part)
+            plan.expected_versions[part['part_number']] = current.get('version', 0)
+        for part_number in batch['part_number'][same]:
+            # Baris yang sama bisa muncul di batch sebelumnya dengan isi berbeda
+            plan.changed_parts.pop(part_number, None)
+            plan.expected_versions.pop(part_number, None)
+        known_numbers.update(batch['part_number'][known])
+
+    plan.unchanged = len(known_numbers) - len(plan.changed_parts)
+    return plan
+
+
+def plan_edits(base, edited, fleet):
+    """Rencana update dari grid editor: hanya baris yang diubah dari ``base``.
+
+    ``base`` adalah DataFrame record saat grid dibuka (kolom ``PART_COLUMNS``
+    dan ``version``), ``edited`` hasil editor dengan index yang sama.
+    Baris yang berbeda divalidasi seperti baris CSV lalu dibandingkan lewat
+    hash isi dengan record saat ini; versi dari ``base`` dipakai sebagai
+    versi yang diharapkan saat ditulis (``apply_upsert``).
+    """
+    plan = UpsertPlan()
+    plan.rows = len(edited)
+    normalized = {
+        name: frame[PART_COLUMNS].astype(str).apply(lambda column: column.str.strip())
+        for name, frame in (('base', base), ('edited', edited))
+    }
+    edited = edited[(normalized['base'] != normalized['edited']).any(axis=1)]
+    records, rejected = validate_chunk(edited, row_offset=1)  # nomor baris grid mulai dari 1
+    plan.add_rejected(rejected)
+    deleted = ~records['part_number'].map(fleet.__contains__).astype(bool)
+    plan.add_rejected(pd.DataFrame({
+        'baris': records.index[deleted] + 1,
+        'part_number': records['part_number'][deleted],
+        'alasan': "part sudah dihapus operator lain",
+    }))
+    records = records[~deleted]
+
+    existing = fleet.content_hashes()
+    hashes = content_hashes(records)
+    same = existing.reindex(hashes.index).to_numpy() == hashes.to_numpy()
+    for part in records[~same].to_dict('records'):
+        plan.changed_parts[part['part_number']] = dict(fleet.get(part['part_number']), **part)
+    versions = base.set_index('part_number')['version']
+    plan.expected_versions = {number: int(versions[number]) for number in plan.changed_parts}
+    plan.unchanged = plan.rows - plan.changed - plan.rejected
+    return plan
+
+
+def apply_upsert(plan, fleet, chunksize=IMPORT_CHUNK_SIZE, progress=None):
+    """Tulis hanya selisih hasil ``plan_upsert`` (part baru dan part berubah) per batch"""
+    new_parts = list(plan.new_parts.values())
+    changed_parts = list(plan.changed_parts.values())
+    total = max(len(new_parts) + len(changed_parts), 1)
+    done = 0
+
+    for start in range(0, len(new_parts), chunksize):
+        batch = new_parts[start:start + chunksize]
+        stored = fleet.insert_many(batch)
+        plan.inserted += len(stored)
+        plan.skipped += len(batch) - len(stored)
+        done += len(batch)
+        if progress is not None:
+            progress(done / total, plan)
+
+    for start in range(0, len(changed_parts), chunksize):
+        batch = changed_parts[start:start + chunksize]
+        expected = {part['part_number']: plan.expected_versions[part['part_number']] for part in batch}
+        plan.updated += len(fleet.update_many(batch, expected))
+        done += len(batch)
+        if progress is not None:
+            progress(done / total, plan)
+
+    return plan
@@ -0,0 +1,238 @@
+"""Ingest pembacaan hour meter ke store time-series kolumnar (lihat ``meters``).
+
+Sumber pembacaan berupa CSV dengan kolom ``machine_name``, ``timestamp``
+(ISO 8601) dan ``hours`` (jam operasi kumulatif hour meter). File dibaca
+bertahap per ``INGEST_CHUNK_SIZE`` baris; setiap potongan ditulis sebagai
+file Parquet baru per partisi mesin/bulan (append-only, tidak ada file lama
+yang ditulis ulang) lalu pembacaan harian batch ditambahkan sebagai file
+delta dan tabel ``latest`` diganti secara atomik. Delta digabung ke
+``daily.parquet`` setiap ``DAILY_COMPACT_EVERY`` batch dan oleh ``rebuild``.
+Ingest dari beberapa proses diserialisasi dengan file lock.
+
+Folder drop dipantau ``watch_folder``: setiap file ``*.csv`` yang masuk
+di-ingest lalu dipindah ke ``processed/``, atau ke ``failed/`` jika tidak
+bisa dibaca. Pengirim sebaiknya menulis file dengan ekstensi lain lalu
+me-rename-nya menjadi ``.csv`` agar file yang belum selesai tidak terbaca.
+"""
+import glob
+import os
+import shutil
+import threading
+import time
+import uuid
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+from calendars import day_index
+from meters import (
+    DAILY_COLUMNS, DAILY_DELTA_DIR, DAILY_FILE, LATEST_FILE, READING_COLUMNS, READINGS_DIR, merge_daily, meter_dir
+)
+from storage import FileLock
+
+INGEST_CHUNK_SIZE = 500000
+WATCH_INTERVAL = 5.0  # detik antar pemeriksaan folder drop
+DAILY_COMPACT_EVERY = 50  # file delta harian sebelum digabung ke daily.parquet
+LATEST_COLUMNS = ['machine_key', 'machine_name', 'timestamp', 'hours']
+
+
+class IngestReport:
+    """Ringkasan satu ingest: jumlah baris dibaca, disimpan, ditolak dan file partisi"""
+
+    def __init__(self):
+        self.rows = 0
+        self.ingested = 0
+        self.rejected = 0
+        self.files = 0
+
+    def __repr__(self):
+        return (f"IngestReport(rows={self.rows}, ingested={self.ingested}, "
+                f"rejected={self.rejected}, files={self.files})")
+
+
+def validate_readings(frame):
+    """Pembacaan valid (mesin terisi, timestamp terbaca, jam >= 0) dengan kolom ``machine_key``"""
+    frame = frame.reindex(columns=READING_COLUMNS)
+    machine_name = frame['machine_name'].fillna('').astype(str).str.strip()
+    timestamp = pd.to_datetime(frame['timestamp'], errors='coerce', format='ISO8601')
+    if getattr(timestamp.dt, 'tz', None) is not None:
+        timestamp = timestamp.dt.tz_convert(None)
+    hours = pd.to_numeric(frame['hours'], errors='coerce')
+    valid = (machine_name != '') & timestamp.notna() & hours.notna() & (hours >= 0)
+    return pd.DataFrame({
+        'machine_key': machine_name[valid].str.casefold(),
+        'machine_name': machine_name[valid],
+        'timestamp': timestamp[valid].astype('datetime64[ms]'),
+        'hours': hours[valid].astype('float64'),
+    })
+
+
+def _atomic_write_parquet(frame, path):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    frame.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _daily_last(readings):
+    """Pembacaan terakhir per mesin per hari"""
+    daily = readings.assign(day=day_index(readings['timestamp'].to_numpy()))
+    daily = daily.sort_values('timestamp', kind='stable')
+    return daily.drop_duplicates(['machine_key', 'day'], keep='last')
+
+
+class MeterStore:
+    """Store pembacaan hour meter: partisi Parquet append-only dan tabel materialized"""
+
+    def __init__(self, root=None):
+        self.root = root or meter_dir()
+        self.readings_dir = os.path.join(self.root, READINGS_DIR)
+        self.latest_file = os.path.join(self.root, LATEST_FILE)
+        self.daily_file = os.path.join(self.root, DAILY_FILE)
+        self.delta_dir = os.path.join(self.root, DAILY_DELTA_DIR)
+        os.makedirs(self.readings_dir, exist_ok=True)
+        self._lock = FileLock(os.path.join(self.root, "ingest.lock"))
+
+    def _partition_dir(self, key, month):
+        return os.path.join(self.readings_dir, f"machine={quote(key, safe='')}", f"month={month}")
+
+    def ingest_frame(self, frame, report=None):
+        """Simpan satu batch pembacaan; hasilnya ``IngestReport``"""
+        report = report or IngestReport()
+        readings = validate_readings(frame)
+        report.rows += len(frame)
+        report.rejected += len(frame) - len(readings)
+        if readings.empty:
+            return report
+
+        batch = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:12]}"
+        month = readings['timestamp'].dt.year * 100 + readings['timestamp'].dt.month
+        with self._lock:
+            for (key, code), group in readings.groupby([readings['machine_key'], month], sort=False):
+                directory = self._partition_dir(key, f"{code // 100:04d}-{code % 100:02d}")
+                os.makedirs(directory, exist_ok=True)
+                _atomic_write_parquet(group[READING_COLUMNS], os.path.join(directory, f"{batch}.parquet"))
+                report.files += 1
+            self._update_materialized(_daily_last(readings), batch)
+        report.ingested += len(readings)
+        return report
+
+    def ingest_csv(self, source, chunksize=INGEST_CHUNK_SIZE, report=None):
+        """Ingest file CSV pembacaan secara bertahap per ``chunksize`` baris"""
+        report = report or IngestReport()
+        for chunk in pd.read_csv(source, chunksize=chunksize, dtype={'machine_name': str}):
+            self.ingest_frame(chunk, report)
+        return report
+
+    def _update_materialized(self, batch_daily, batch):
+        """Tulis pembacaan harian batch sebagai file delta lalu perbarui ``latest`` (satu baris per mesin)"""
+        os.makedirs(self.delta_dir, exist_ok=True)
+        _atomic_write_parquet(batch_daily[DAILY_COLUMNS], os.path.join(self.delta_dir, f"{batch}.parquet"))
+        frames = [batch_daily[LATEST_COLUMNS]]
+        if os.path.exists(self.latest_file):
+            frames.insert(0, pd.read_parquet(self.latest_file))
+        latest = pd.concat(frames, ignore_index=True).sort_values('timestamp', kind='stable')
+        # Pembaca memakai stamp file latest sebagai versi, jadi latest ditulis terakhir
+        _atomic_write_parquet(latest.drop_duplicates('machine_key', keep='last'), self.latest_file)
+        if len(self._deltas()) >= DAILY_COMPACT_EVERY:
+            self.compact()
+
+    def _deltas(self):
+        return sorted(glob.glob(os.path.join(self.delta_dir, "*.parquet")))
+
+    def compact(self):
+        """Gabungkan semua file delta ke ``daily.parquet`` lalu hapus deltanya"""
+        with self._lock:
+            deltas = self._deltas()
+            if not deltas:
+                return 0
+            frames = [pd.read_parquet(self.daily_file)] if os.path.exists(self.daily_file) else []
+            self._write_materialized(merge_daily(frames + [pd.read_parquet(path) for path in deltas]))
+            for path in deltas:
+                os.remove(path)
+            return len(deltas)
+
+    def _write_materialized(self, daily):
+        latest = daily.sort_values('timestamp', kind='stable').drop_duplicates('machine_key', keep='last')
+        # daily ditulis lebih dulu; pembaca memakai stamp file latest sebagai versi
+        _atomic_write_parquet(daily[DAILY_COLUMNS], self.daily_file)
+        _atomic_write_parquet(latest[LATEST_COLUMNS], self.latest_file)
+
+    def _partition_files(self, machine=None, start=None, end=None):
+        """File Parquet yang mungkin berisi pembacaan mesin/rentang waktu tersebut"""
+        if not os.path.isdir(self.readings_dir):
+            return []
+        if machine is None:
+            machines = sorted(os.listdir(self.readings_dir))
+        else:
+            machines = [f"machine={quote(str(machine).strip().casefold(), safe='')}"]
+        first = pd.Timestamp(start).strftime('%Y-%m') if start is not None else None
+        last = pd.Timestamp(end).strftime('%Y-%m') if end is not None else None
+        files = []
+        for machine_dir in machines:
+            path = os.path.join(self.readings_dir, machine_dir)
+            if not os.path.isdir(path):
+                continue
+            for month_dir in sorted(os.listdir(path)):
+                month = month_dir.split('=', 1)[-1]
+                if (first and month < first) or (last and month > last):
+                    continue
+                files.extend(sorted(glob.glob(os.path.join(path, month_dir, "*.parquet"))))
+        return files
+
+    def read_readings(self, machine=None, start=None, end=None):
+        """Pembacaan mentah (urut waktu), hanya membaca partisi yang relevan"""
+        files = self._partition_files(machine, start, end)
+        if not files:
+            return pd.DataFrame(columns=READING_COLUMNS)
+        readings = pd.concat([pd.read_parquet(path) for path in files], ignore_index=True)
+        if start is not None:
+            readings = readings[readings['timestamp'] >= pd.Timestamp(start)]
+        if end is not None:
+            readings = readings[readings['timestamp'] <= pd.Timestamp(end)]
+        return readings.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+    def rebuild(self):
+        """Bangun ulang tabel materialized dari seluruh partisi (mis. setelah file dihapus)"""
+        with self._lock:
+            daily = []
+            for machine_dir in sorted(os.listdir(self.readings_dir)):
+                key = unquote(machine_dir.split('=', 1)[-1])
+                readings = self.read_readings(key)
+                if not readings.empty:
+                    daily.append(_daily_last(readings.assign(machine_key=key)))
+            if daily:
+                self._write_materialized(merge_daily(daily))
+            else:
+                for path in (self.latest_file, self.daily_file):
+                    if os.path.exists(path):
+                        os.remove(path)
+            # Delta sudah tercakup di tabel harian yang dibangun ulang dari partisi
+            for path in self._deltas():
+                os.remove(path)
+            return sum(len(frame) for frame in daily)
+
+
+def process_folder(folder, store, chunksize=INGEST_CHUNK_SIZE):
+    """Ingest semua file CSV di folder drop; hasilnya list (nama file, report atau error)"""
+    results = []
+    for path in sorted(glob.glob(os.path.join(folder, "*.csv"))):
+        try:
+            report = store.ingest_csv(path, chunksize)
+            target = "processed"
+        except (OSError, ValueError, pd.errors.ParserError) as e:
+            report = e
+            target = "failed"
+        os.makedirs(os.path.join(folder, target), exist_ok=True)
+        shutil.move(path, os.path.join(folder, target, os.path.basename(path)))
+        results.append((os.path.basename(path), report))
+    return results
+
+
+def watch_folder(folder, store, interval=WATCH_INTERVAL, stop=None, on_result=None):
+    """Pantau folder drop sampai ``stop`` (``threading.Event``) di-set"""
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        for name, report in process_folder(folder, store):
+            if on_result:
+                on_result(name, report)
+        stop.wait(interval)
@@ -0,0 +1,171 @@
+"""Jam operasi aktual dari pembacaan hour meter mesin.
+
+Mesin melaporkan pembacaan hour meter (jam operasi kumulatif). Pembacaan
+disimpan append-only oleh ``meter_ingest`` dalam file Parquet kolumnar yang
+dipartisi per mesin dan per bulan::
+
+    meter_data/readings/machine=<mesin>/month=2025-07/<batch>.parquet
+
+Setiap batch ingest juga memperbarui dua tabel materialized kecil:
+``latest.parquet`` (pembacaan terakhir per mesin) dan ``daily.parquet``
+(pembacaan terakhir per mesin per hari). ``daily`` tidak ditulis ulang per
+batch: pembacaan harian batch baru ditambahkan sebagai file delta di
+``daily_delta/`` yang digabung ke ``daily.parquet`` secara berkala
+(``MeterStore.compact``). Dashboard hanya membaca tabel tersebut lewat
+``get_meters``, di-cache per proses dan diperiksa ulang paling
+sering sekali per ``PART_METER_REFRESH`` detik, sehingga ingest jutaan
+pembacaan per hari tidak menambah waktu rerun.
+
+Jam terpakai part = pembacaan terakhir - pembacaan terakhir sebelum hari
+pemasangan. Pembacaan dianggap mewakili jam operasi sampai akhir harinya;
+jam setelah itu diestimasi dari kalender operasi mesin. Part di mesin yang
+belum punya pembacaan sebelum tanggal pasangnya tetap memakai estimasi
+kalender.
+"""
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from calendars import EPOCH, day_index
+
+DEFAULT_METER_DIR = "meter_data"
+READINGS_DIR = "readings"
+LATEST_FILE = "latest.parquet"
+DAILY_FILE = "daily.parquet"
+DAILY_DELTA_DIR = "daily_delta"
+DAILY_COLUMNS = ['machine_key', 'machine_name', 'day', 'timestamp', 'hours']
+READING_COLUMNS = ['machine_name', 'timestamp', 'hours']
+REFRESH_SECONDS = float(os.environ.get("PART_METER_REFRESH", 60))
+_DAY_SPAN = 1 << 20  # lebih besar dari jumlah hari kalender, untuk kunci (mesin, hari)
+
+
+def meter_dir():
+    return os.environ.get("PART_METER_DIR", DEFAULT_METER_DIR)
+
+
+def machine_key(name):
+    """Kunci mesin: tanpa spasi di tepi dan tanpa beda huruf besar/kecil"""
+    return '' if name is None else str(name).strip().casefold()
+
+
+def _machine_keys(machine_names):
+    return pd.Series(machine_names).fillna('').astype(str).str.strip().str.casefold()
+
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def merge_daily(frames):
+    """Gabungkan tabel harian (lama ke baru): per mesin per hari pembacaan terakhir, urut mesin dan hari"""
+    daily = pd.concat(frames, ignore_index=True).sort_values('timestamp', kind='stable')
+    daily = daily.drop_duplicates(['machine_key', 'day'], keep='last')
+    return daily.sort_values(['machine_key', 'day'])[DAILY_COLUMNS]
+
+
+def _read_deltas(root):
+    """File delta harian yang belum digabung, urut batch; file yang baru saja digabung dilewati"""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(root, DAILY_DELTA_DIR, "*.parquet"))):
+        try:
+            frames.append(pd.read_parquet(path))
+        except FileNotFoundError:
+            continue
+    return frames
+
+
+class MeterSnapshot:
+    """Pembacaan terakhir dan harian per mesin, siap dipakai perhitungan status"""
+
+    def __init__(self, latest=None, daily=None, version=None):
+        self.version = version
+        self.latest = latest if latest is not None else pd.DataFrame(
+            columns=['machine_key', 'machine_name', 'timestamp', 'hours']
+        )
+        self._ids = dict(zip(self.latest['machine_key'], range(len(self.latest))))
+        self._latest_hours = self.latest['hours'].to_numpy(dtype=float)
+        self._latest_day = day_index(self.latest['timestamp'].to_numpy())
+
+        if daily is None or daily.empty:
+            self._daily_keys = np.empty(0, dtype='int64')
+            self._daily_hours = np.empty(0)
+            return
+        ids = daily['machine_key'].map(self._ids)
+        known = ids.notna().to_numpy()
+        keys = ids[known].to_numpy(dtype='int64') * _DAY_SPAN + daily['day'].to_numpy(dtype='int64')[known]
+        order = np.argsort(keys, kind='stable')
+        self._daily_keys = keys[order]
+        self._daily_hours = daily['hours'].to_numpy(dtype=float)[known][order]
+
+    def __len__(self):
+        return len(self._ids)
+
+    def hours_used(self, machine_names, install_dt):
+        """Jam terpakai menurut hour meter per part dan awal periode yang belum terbaca.
+
+        Hasilnya ``(jam, mulai)``: ``jam`` NaN untuk part tanpa pembacaan
+        sebelum hari pemasangan, ``mulai`` adalah tanggal setelah pembacaan
+        terakhir (atau tanggal pasang jika lebih akhir) yang jamnya perlu
+        diestimasi dari kalender.
+        """
+        ids = _machine_keys(machine_names).map(self._ids)
+        ids.index = install_dt.index
+        valid = (ids.notna() & install_dt.notna()).to_numpy()
+        used = np.full(len(install_dt), np.nan)
+        start = np.full(len(install_dt), np.nan)
+        if valid.any():
+            machine = ids.to_numpy(dtype=float)[valid].astype('int64')
+            install_day = day_index(install_dt.to_numpy()[valid])
+            # Pembacaan harian terakhir sebelum hari pemasangan
+            position = np.searchsorted(self._daily_keys, machine * _DAY_SPAN + install_day - 1, side='right') - 1
+            found = position >= 0
+            found[found] = self._daily_keys[position[found]] // _DAY_SPAN == machine[found]
+            baseline = np.where(found, self._daily_hours[np.maximum(position, 0)], np.nan)
+            used[valid] = np.maximum(self._latest_hours[machine] - baseline, 0)
+            start[valid] = np.maximum(self._latest_day[machine] + 1, install_day)
+        start_dt = pd.Timestamp(EPOCH) + pd.to_timedelta(start, unit='D')
+        return pd.Series(used, index=install_dt.index), pd.Series(start_dt, index=install_dt.index)
+
+
+def load_snapshot(root=None):
+    """Baca tabel materialized terbaru dari folder hour meter"""
+    root = root or meter_dir()
+    latest_file = os.path.join(root, LATEST_FILE)
+    daily_file = os.path.join(root, DAILY_FILE)
+    stamp = _file_stamp(latest_file)
+    if stamp is None:
+        return MeterSnapshot(version=(root, None))
+    # latest ditulis setelah daily dan deltanya, jadi latest yang baru selalu berpasangan dengan data harian
+    # yang baru; penggabungan delta juga menulis ulang latest sehingga versinya ikut berubah
+    latest = pd.read_parquet(latest_file)
+    frames = [pd.read_parquet(daily_file)] if os.path.exists(daily_file) else []
+    frames += _read_deltas(root)
+    daily = merge_daily(frames) if frames else None
+    return MeterSnapshot(latest, daily, (root, stamp))
+
+
+_snapshot = None
+_checked = 0.0
+_snapshot_lock = threading.Lock()
+
+
+def get_meters():
+    """Snapshot hour meter proses ini, dibaca ulang jika tabel materialized berubah"""
+    global _snapshot, _checked
+    root = meter_dir()
+    with _snapshot_lock:
+        now = time.monotonic()
+        if _snapshot is None or _snapshot.version[0] != root or now - _checked >= REFRESH_SECONDS:
+            _checked = now
+            stamp = _file_stamp(os.path.join(root, LATEST_FILE))
+            if _snapshot is None or _snapshot.version != (root, stamp):
+                _snapshot = load_snapshot(root)
+        return _snapshot
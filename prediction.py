@@ -0,0 +1,168 @@
+"""Mode prediktif (opsional): sisa usia part dari model umur hasil riwayat penggantian.
+
+Sisa usia nominal adalah ``recommended_usage`` dikurangi jam operasi. Model
+umur memprediksi rasio umur aktual / rekomendasi dari material, kategori,
+mesin dan kode part, dilatih offline dari log riwayat penggantian (lihat
+``history``) oleh ``scripts/train_life_model.py``:
+
+- fitur kategorikal di-hash (``FeatureHasher``), sehingga mesin atau kode
+  part baru tidak memerlukan encoder baru
+- ``SGDRegressor.partial_fit`` hanya dengan event riwayat yang ditambahkan
+  sejak pelatihan terakhir; log riwayat append-only dan model menyimpan
+  jumlah event yang sudah dipakai
+
+Model disimpan di ``life_model.pkl`` (env ``PART_MODEL_FILE``); mode
+prediktif aktif jika file itu ada. Seluruh fleet di-score sekaligus (satu
+panggilan ``predict`` atas nilai fitur unik) dan hasilnya di-cache per versi
+data, tanggal dan file model (``Fleet.predictions``), sehingga rerun tidak
+menjalankan inferensi. scikit-learn hanya di-import saat model dibuat atau
+dimuat.
+"""
+import os
+import pickle
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from status_engine import STATUS_NAMES, status_codes
+
+DEFAULT_MODEL_FILE = "life_model.pkl"
+FEATURE_FIELDS = ('material', 'category', 'machine_name', 'part_code')
+HASH_FEATURES = 2 ** 18
+RATIO_RANGE = (0.05, 3.0)  # batas rasio umur aktual / rekomendasi untuk pelatihan dan prediksi
+MIN_TRAINING_EVENTS = 30  # penggantian valid minimal untuk pelatihan pertama
+TRAINING_EPOCHS = 5
+
+_STATUS_LABELS = np.array(STATUS_NAMES, dtype=object)
+
+
+def model_file():
+    return os.environ.get("PART_MODEL_FILE", DEFAULT_MODEL_FILE)
+
+
+def _values(frame, field):
+    """Nilai fitur tanpa beda huruf besar/kecil, seperti kunci facet"""
+    return frame[field].fillna('').astype(str).str.strip().str.casefold()
+
+
+def _tokens(frame):
+    """Token fitur ``kolom=nilai`` per baris"""
+    columns = [(field + "=") + _values(frame, field) for field in FEATURE_FIELDS]
+    return list(zip(*(column.tolist() for column in columns)))
+
+
+def training_rows(events):
+    """Event riwayat yang bisa dipakai melatih model, dengan kolom target ``ratio``"""
+    valid = events['actual_hours'].notna() & (events['recommended_usage'] > 0)
+    rows = events[valid]
+    return rows.assign(ratio=(rows['actual_hours'] / rows['recommended_usage']).clip(*RATIO_RANGE))
+
+
+class LifeModel:
+    """Regressor rasio umur aktual / rekomendasi yang dilatih bertahap"""
+
+    def __init__(self):
+        from sklearn.feature_extraction import FeatureHasher
+        from sklearn.linear_model import SGDRegressor
+
+        self.hasher = FeatureHasher(n_features=HASH_FEATURES, input_type='string', alternate_sign=False)
+        self.regressor = SGDRegressor(alpha=1e-4, learning_rate='adaptive', eta0=0.05, random_state=0)
+        self.trained_events = 0  # jumlah event riwayat yang sudah dipakai (offset log)
+        self.samples = 0  # jumlah penggantian valid yang sudah dilatih
+        self.stamp = None  # stamp file model saat dimuat, bagian kunci cache prediksi
+
+    def predict_ratio(self, frame):
+        """Rasio umur seluruh baris ``frame`` sekaligus.
+
+        Model linear: prediksi = intercept + jumlah bobot token per kolom. Bobot
+        dihitung sekali per nilai unik tiap kolom (ribuan, bukan ratusan ribu
+        baris) lewat satu panggilan ``predict``, lalu dijumlahkan per baris.
+        """
+        if frame.empty:
+            return np.empty(0)
+        codes, tokens = [], []
+        for field in FEATURE_FIELDS:
+            field_codes, uniques = pd.factorize(_values(frame, field))
+            codes.append(field_codes + len(tokens))
+            tokens.extend([field + "=" + value] for value in uniques)
+        intercept = self.regressor.intercept_[0]
+        weights = self.regressor.predict(self.hasher.transform(tokens)) - intercept
+        return np.clip(intercept + sum(weights[field_codes] for field_codes in codes), *RATIO_RANGE)
+
+    def evaluate(self, rows):
+        """Rata-rata selisih absolut rasio umur pada baris ``training_rows``"""
+        return float(np.mean(np.abs(self.predict_ratio(rows) - rows['ratio'].to_numpy())))
+
+    def partial_fit(self, rows, epochs=TRAINING_EPOCHS):
+        """Lanjutkan pelatihan dengan baris ``training_rows`` baru"""
+        if rows.empty:
+            return
+        features = self.hasher.transform(_tokens(rows))
+        target = rows['ratio'].to_numpy()
+        rng = np.random.default_rng(self.samples)
+        for _ in range(epochs):
+            order = rng.permutation(len(target))
+            self.regressor.partial_fit(features[order], target[order])
+        self.samples += len(target)
+
+
+def predict_fleet(status_frame, model):
+    """Umur, sisa usia dan status prediksi per part dari DataFrame ``compute_fleet_status``.
+
+    Hasilnya DataFrame ber-index ``part_number``. Data tidak valid mendapat
+    sisa usia 0, sama seperti status nominal.
+    """
+    usage = pd.to_numeric(status_frame['recommended_usage'], errors='coerce').to_numpy(dtype=float)
+    life = model.predict_ratio(status_frame) * usage
+    remaining = np.nan_to_num(np.clip(life - status_frame['hours_used'].to_numpy(dtype=float), 0, None))
+    return pd.DataFrame({
+        'predicted_life': life,
+        'predicted_remaining': remaining,
+        'predicted_status': _STATUS_LABELS[status_codes(remaining)],
+    }, index=status_frame['part_number'].astype(str).to_numpy())
+
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def load_model(path=None):
+    with open(path or model_file(), 'rb') as f:
+        return pickle.load(f)
+
+
+def save_model(model, path=None):
+    """Tulis model ke file sementara lalu ``os.replace`` agar pembaca tidak melihat file setengah jadi"""
+    path = path or model_file()
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(model, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_model():
+    """Model umur per proses, dimuat ulang jika file dilatih ulang; None jika mode prediktif tidak aktif"""
+    path = model_file()
+    stamp = _file_stamp(path)
+    if stamp is None:
+        return None
+    with _models_lock:
+        model = _models.get(path)
+        if model is None or model.stamp != stamp:
+            model = _models[path] = load_model(path)
+            model.stamp = stamp
+        return model
@@ -0,0 +1,51 @@
+"""Worker alert: evaluasi status part secara berkala di luar dashboard.
+
+Perubahan status (Normal/Warning/Harus Ganti) ditulis sebagai event ke outbox
+``alerts.db`` (env ``PART_ALERT_DB``) yang dibaca dashboard. Storage dipilih
+lewat env yang sama dengan aplikasi (``PART_STORAGE``, ``PART_DATA_FILE``,
+``PART_DB_FILE``).
+
+Contoh:
+    python scripts/alert_worker.py                 # tick setiap 60 detik
+    python scripts/alert_worker.py --interval 300
+    python scripts/alert_worker.py --once          # satu tick, mis. dari cron
+"""
+import argparse
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alerts import ALERT_INTERVAL, AlertEvaluator, AlertOutbox  # noqa: E402
+from fleet import get_fleet  # noqa: E402
+
+PRINT_LIMIT = 20  # event yang dicetak per tick
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interval", type=float, default=ALERT_INTERVAL, help="detik antar tick")
+    parser.add_argument("--once", action="store_true", help="jalankan satu tick lalu berhenti")
+    parser.add_argument("--backend", choices=["json", "sqlite", "sharded"], help="default env PART_STORAGE")
+    args = parser.parse_args()
+
+    evaluator = AlertEvaluator(get_fleet(args.backend), AlertOutbox())
+    stop = threading.Event()
+    try:
+        while not stop.is_set():
+            events = evaluator.tick()
+            for number, machine, previous, current, remaining, _ in events[:PRINT_LIMIT]:
+                print(f"{number} ({machine}): {previous or '-'} -> {current}, sisa {remaining:g} jam")
+            if len(events) > PRINT_LIMIT:
+                print(f"... dan {len(events) - PRINT_LIMIT:,} perubahan status lain")
+            if args.once:
+                break
+            stop.wait(args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""Benchmark jalur utama aplikasi monitoring dengan fleet sintetis.
+
+Membuat fleet sintetis (default 1k, 10k, 100k dan 1M part) dengan
+distribusi mesin/material/kategori yang timpang dan tanggal pasang yang
+tersebar, lalu mengukur tanpa browser:
+
+- ``load``       : membaca storage menjadi ``Fleet`` (``load_data``)
+- ``filter``     : kombinasi filter sidebar lewat ``Fleet.query`` (``apply_filters``)
+- ``kpi``        : jumlah per status dan per kategori dari cube (KPI dan grafik dashboard)
+- ``page``       : satu halaman tabel yang sudah diurutkan
+- ``duplicate``  : cek nomor part ganda seperti form input
+- ``import``     : import CSV bertahap ke storage kosong (``show_upload_data``)
+- ``sync``       : analisa mode sinkron CSV terhadap fleet penuh
+
+Untuk setiap langkah dicatat durasi (median dari ``--repeat`` kali) dan
+puncak alokasi memori (tracemalloc, pada satu panggilan tambahan).
+Hasilnya ditulis sebagai JSON agar bisa dibandingkan antar versi.
+
+Contoh:
+    python scripts/benchmark_fleet.py --sizes 1000 10000 --output hasil.json
+    python scripts/benchmark_fleet.py --backend sqlite --sizes 100000
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from fleet import Fleet  # noqa: E402
+from importer import import_csv, plan_upsert  # noqa: E402
+from status_engine import CATEGORIES, PART_COLUMNS, STATUS_NAMES  # noqa: E402
+from storage import JsonStorage, SqliteStorage, _atomic_write_json, new_record  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+MACHINE_COUNT = 200
+MATERIALS = ["Steel", "steel", "Karet", "Plastik", "Aluminium", "Kuningan", "Suzuki", "suzuki", "Keramik"]
+
+
+def synthetic_parts(size, seed=0):
+    """Fleet sintetis: mesin ber-distribusi Zipf, material/kategori timpang, tanggal pasang 3 tahun"""
+    rng = np.random.default_rng(seed)
+    machine_weights = 1.0 / np.arange(1, MACHINE_COUNT + 1)
+    machines = rng.choice(MACHINE_COUNT, size=size, p=machine_weights / machine_weights.sum())
+    material_weights = np.array([40, 5, 20, 15, 10, 4, 3, 2, 1], dtype=float)
+    materials = rng.choice(len(MATERIALS), size=size, p=material_weights / material_weights.sum())
+    categories = rng.choice(len(CATEGORIES), size=size, p=[0.6, 0.3, 0.1])
+    install = np.datetime64('2023-01-01') + rng.integers(0, 3 * 365, size=size).astype('timedelta64[D]')
+    usage = rng.choice([500, 1000, 2000, 4000, 8000], size=size, p=[0.1, 0.2, 0.4, 0.2, 0.1])
+
+    frame = pd.DataFrame({
+        'part_number': [f"PN{n:07d}" for n in range(size)],
+        'part_code': [f"CODE-{n % 5000:04d}" for n in range(size)],
+        'machine_name': [f"Mesin {m:03d}" for m in machines],
+        'material': np.array(MATERIALS, dtype=object)[materials],
+        'install_date': pd.Series(install).dt.strftime("%Y-%m-%d"),
+        'recommended_usage': usage,
+        'category': np.array(CATEGORIES, dtype=object)[categories],
+    })
+    return frame[PART_COLUMNS]
+
+
+def write_storage(backend, workdir, frame):
+    """Tulis fleet sintetis langsung ke file storage, hasilnya path file"""
+    records = [new_record(part, 1) for part in frame.to_dict('records')]
+    if backend == "json":
+        path = os.path.join(workdir, "parts_data.json")
+        _atomic_write_json(path, records)
+    else:
+        path = os.path.join(workdir, "parts_data.db")
+        SqliteStorage(path).replace_all(records)
+    return path
+
+
+def open_store(backend, path):
+    return JsonStorage(path) if backend == "json" else SqliteStorage(path)
+
+
+def measure(function, repeat):
+    """(median detik, puncak memori byte, hasil) dari ``function``.
+
+    Durasi diukur tanpa tracemalloc (tracing memperlambat kode Python),
+    puncak memori diukur pada satu panggilan terpisah.
+    """
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        result = function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return statistics.median(durations), peak, result
+
+
+def benchmark_size(backend, size, repeat, workdir):
+    frame = synthetic_parts(size)
+    path = write_storage(backend, workdir, frame)
+    csv_bytes = frame.to_csv(index=False).encode()
+    filters = [
+        (STATUS_NAMES, "All", "All", "All"),
+        (["Harus Ganti"], "All", "All", "All"),
+        (STATUS_NAMES, "mesin 001", "All", "All"),
+        (["Warning", "Harus Ganti"], "mesin 010", "steel", "mechanical"),
+    ]
+    results = {}
+
+    def record(step, function, step_repeat=repeat):
+        seconds, peak, value = measure(function, step_repeat)
+        results[step] = {"seconds": round(seconds, 6), "peak_bytes": peak}
+        return value
+
+    fleet = record("load", lambda: Fleet(open_store(backend, path)), 1)
+
+    def run_filters():
+        fleet._changed()  # ukur tanpa cache query
+        return [fleet.query(*f) for f in filters]
+    record("filter", run_filters)
+
+    fleet.facets()  # status per part dan cube dihitung sekali, KPI dijawab dari cube
+    record("kpi", lambda: (fleet.aggregate("status"), fleet.aggregate("category")))
+
+    def first_page():
+        fleet._changed()
+        return fleet.page(STATUS_NAMES, sort='remaining_hours', limit=50)
+    record("page", first_page)
+
+    probes = [f"PN{n:07d}" for n in range(0, size, max(size // 1000, 1))] + ["TIDAK-ADA"] * 100
+    record("duplicate", lambda: sum(number in fleet for number in probes))
+
+    def run_import():
+        target = tempfile.mkdtemp(dir=workdir)
+        try:
+            store = open_store(backend, os.path.join(target, os.path.basename(path)))
+            return import_csv(io.BytesIO(csv_bytes), Fleet(store))
+        finally:
+            shutil.rmtree(target, ignore_errors=True)
+    record("import", run_import, 1)
+
+    record("sync", lambda: plan_upsert(io.BytesIO(csv_bytes), fleet), 1)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3, help="pengulangan untuk langkah cepat")
+    parser.add_argument("--output", default="benchmark_results.json", help="file hasil JSON")
+    args = parser.parse_args()
+
+    report = {
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "revision": git_revision(),
+        "backend": args.backend,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "sizes": {},
+    }
+
+    for size in args.sizes:
+        workdir = tempfile.mkdtemp(prefix="benchmark_fleet_")
+        try:
+            results = benchmark_size(args.backend, size, args.repeat, workdir)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        report["sizes"][str(size)] = results
+        print(f"\n{size:,} part ({args.backend})")
+        for step, result in results.items():
+            print(f"  {step:<10} {result['seconds'] * 1000:>10.1f} ms  {result['peak_bytes'] / 2**20:>8.1f} MiB")
+
+    report["peak_rss_bytes"] = peak_rss_bytes()
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nHasil ditulis ke {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Benchmark cold start dan render pertama per halaman aplikasi Streamlit.
+
+Setiap halaman dijalankan di proses Python baru lewat ``streamlit.testing``
+(AppTest, tanpa browser) dengan fleet sintetis, langsung membuka halaman
+tersebut tanpa melewati Dashboard:
+
+- ``cold``   : dari awal script sampai halaman selesai digambar pertama kali
+               (import streamlit, pandas, dependensi halaman dan load data)
+- ``render`` : run pertama halaman itu sendiri (``AppTest.run``)
+- ``rerun``  : median rerun berikutnya pada halaman yang sama
+- ``heavy``  : dependensi berat milik halaman yang ikut ter-import
+               (``plotly.express``, ``pyarrow.parquet``, ``openpyxl``,
+               ``sklearn``; paket dasar plotly dan pyarrow sudah di-import
+               Streamlit sendiri)
+
+Hasil dibandingkan dengan budget; exit code 1 jika ada halaman yang melewati
+budget, error, atau meng-import dependensi berat yang bukan miliknya.
+
+Contoh:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --size 100000 --cold-budget 5 --output hasil_startup.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+STARTED = time.perf_counter()
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(os.path.dirname(SCRIPTS_DIR), "app.py")
+
+COLD_BUDGET = 3.0  # detik
+RENDER_BUDGET = 1.5
+RERUN_BUDGET = 0.5
+HEAVY_MODULES = ("plotly.express", "pyarrow.parquet", "openpyxl", "sklearn")
+# Dependensi berat -> halaman yang boleh meng-import-nya saat render pertama
+# (export Parquet/Excel hanya saat tombol ditekan, jadi tidak ada halaman;
+# sklearn hanya saat Dashboard memuat model umur mode prediktif)
+ALLOWED_HEAVY = {
+    "plotly.express": ("📊 Dashboard", "📈 Riwayat & MTBF"),
+    "pyarrow.parquet": (),
+    "openpyxl": (),
+    "sklearn": ("📊 Dashboard",),
+}
+
+
+def run_page(label, reruns):
+    """Ukur satu halaman di proses ini (dipanggil lewat --child)"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_FILE, default_timeout=300)
+    app.session_state["page"] = label
+    started = time.perf_counter()
+    app.run()
+    render = time.perf_counter() - started
+    cold = time.perf_counter() - STARTED
+    heavy = sorted(name for name in HEAVY_MODULES if name in sys.modules)
+
+    durations = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        app.run()
+        durations.append(time.perf_counter() - started)
+    return {
+        "cold": round(cold, 4),
+        "render": round(render, 4),
+        "rerun": round(statistics.median(durations), 4) if durations else None,
+        "heavy": heavy,
+        "errors": [str(e.value)[:500] for e in app.exception],
+    }
+
+
+def list_pages():
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_FILE, default_timeout=300)
+    app.run()
+    return list(app.sidebar.radio(key="page").options)
+
+
+def child(args, *extra):
+    """Jalankan script ini di proses baru dan baca hasil JSON-nya"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *extra],
+        capture_output=True, text=True, check=True, env=args.env,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def check_budget(label, result, args):
+    problems = []
+    for step, budget in (("cold", args.cold_budget), ("render", args.render_budget), ("rerun", args.rerun_budget)):
+        if result[step] is not None and result[step] > budget:
+            problems.append(f"{step} {result[step]:.2f}s > {budget:.2f}s")
+    for name in result["heavy"]:
+        if name in ALLOWED_HEAVY and label not in ALLOWED_HEAVY[name]:
+            problems.append(f"meng-import {name}")
+    problems.extend(f"error: {error}" for error in result["errors"])
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10000, help="jumlah part fleet sintetis")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--reruns", type=int, default=3)
+    parser.add_argument("--cold-budget", type=float, default=COLD_BUDGET)
+    parser.add_argument("--render-budget", type=float, default=RENDER_BUDGET)
+    parser.add_argument("--rerun-budget", type=float, default=RERUN_BUDGET)
+    parser.add_argument("--output", default="startup_results.json", help="file hasil JSON")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--list", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.list:
+        print(json.dumps(list_pages()))
+        return 0
+    if args.child is not None:
+        print(json.dumps(run_page(args.child, args.reruns)))
+        return 0
+
+    sys.path.insert(0, SCRIPTS_DIR)
+    from benchmark_fleet import synthetic_parts, write_storage
+
+    workdir = tempfile.mkdtemp(prefix="benchmark_startup_")
+    try:
+        path = write_storage(args.backend, workdir, synthetic_parts(args.size))
+        args.env = dict(
+            os.environ,
+            PART_STORAGE=args.backend,
+            PART_DATA_FILE=path if args.backend == "json" else os.path.join(workdir, "parts_data.json"),
+            PART_DB_FILE=path if args.backend == "sqlite" else os.path.join(workdir, "parts_data.db"),
+            PART_ALERT_DB=os.path.join(workdir, "alerts.db"),
+            PART_METER_DIR=os.path.join(workdir, "meter_data"),
+            PART_HISTORY_DIR=os.path.join(workdir, "replacement_history"),
+            PART_MODEL_FILE=os.path.join(workdir, "life_model.pkl"),
+        )
+        results, failed = {}, False
+        print(f"{args.size:,} part ({args.backend})")
+        for label in child(args, "--list"):
+            result = child(args, "--child", label, "--reruns", str(args.reruns))
+            problems = check_budget(label, result, args)
+            failed = failed or bool(problems)
+            results[label] = dict(result, problems=problems)
+            rerun = f"{result['rerun'] * 1000:>7.0f} ms" if result['rerun'] is not None else "      -"
+            print(
+                f"  {label:<24} cold {result['cold']:>6.2f} s  render {result['render'] * 1000:>6.0f} ms  "
+                f"rerun {rerun}  {','.join(result['heavy']) or '-'}"
+                + (f"  [MELEBIHI: {'; '.join(problems)}]" if problems else "")
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "size": args.size,
+        "backend": args.backend,
+        "budgets": {"cold": args.cold_budget, "render": args.render_budget, "rerun": args.rerun_budget},
+        "pages": results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nHasil ditulis ke {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Ingest pembacaan hour meter mesin ke store time-series (``meter_data``).
+
+CSV berisi kolom ``machine_name``, ``timestamp`` (ISO 8601) dan ``hours``
+(jam operasi kumulatif). Bisa meng-ingest file satu kali, memantau folder
+drop secara terus-menerus, atau membangun ulang tabel materialized.
+
+Contoh:
+    python scripts/ingest_meters.py pembacaan_2025-07-01.csv
+    python scripts/ingest_meters.py --watch incoming/ --interval 10
+    python scripts/ingest_meters.py --rebuild
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from meter_ingest import INGEST_CHUNK_SIZE, WATCH_INTERVAL, MeterStore, watch_folder  # noqa: E402
+
+
+def print_result(name, report):
+    if isinstance(report, Exception):
+        print(f"[GAGAL] {name}: {report}")
+    else:
+        print(f"[OK] {name}: {report.ingested:,} pembacaan disimpan, {report.rejected:,} ditolak")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="file CSV pembacaan")
+    parser.add_argument("--watch", metavar="FOLDER", help="pantau folder drop berisi file CSV")
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL, help="detik antar pemeriksaan folder")
+    parser.add_argument("--rebuild", action="store_true", help="bangun ulang tabel latest/daily dari partisi")
+    parser.add_argument("--root", help="folder store (default env PART_METER_DIR atau meter_data)")
+    parser.add_argument("--chunksize", type=int, default=INGEST_CHUNK_SIZE)
+    args = parser.parse_args()
+    if not (args.files or args.watch or args.rebuild):
+        parser.error("berikan file CSV, --watch FOLDER atau --rebuild")
+
+    store = MeterStore(args.root)
+    if args.rebuild:
+        print(f"Tabel materialized dibangun ulang dari {store.rebuild():,} pembacaan harian")
+
+    for path in args.files:
+        started = time.perf_counter()
+        report = store.ingest_csv(path, args.chunksize)
+        seconds = time.perf_counter() - started
+        print_result(path, report)
+        print(f"     {report.rows / max(seconds, 1e-9):,.0f} baris/detik, {report.files} file partisi")
+
+    if args.watch:
+        print(f"Memantau {args.watch} setiap {args.interval:g} detik (Ctrl+C untuk berhenti)")
+        try:
+            watch_folder(args.watch, store, args.interval, on_result=print_result)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Pecah data part yang ada menjadi shard per plant (atau per mesin) untuk storage multi-plant.
+
+Data dibaca dari storage saat ini (``--source``, default env ``PART_STORAGE``)
+lalu ditulis ke direktori shard (``PART_SHARD_DIR``, default
+``parts_shards``) beserta ``manifest.json`` dan index nomor part
+(``part_index.db``). Pemetaan mesin -> plant dibaca dari file JSON
+``{"Nama Plant": ["Mesin A", "Mesin B"], ...}``; mesin yang tidak terdaftar
+masuk plant ``--default-plant``. Data sumber tidak diubah.
+Setelah itu jalankan aplikasi dengan ``PART_STORAGE=sharded``.
+
+Contoh:
+    python scripts/shard_storage.py --plants plants.json
+    python scripts/shard_storage.py --by machine
+    python scripts/shard_storage.py --plants plants.json --force   # bagi ulang shard yang sudah ada
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from facets import facet_key  # noqa: E402
+from shards import DEFAULT_PLANT, SHARD_BY, PartIndex, ShardManifest, shard_dir  # noqa: E402
+from storage import JsonStorage, open_storage  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--by", choices=SHARD_BY, default="plant", help="satu shard per plant atau per mesin")
+    parser.add_argument("--plants", help="file JSON pemetaan plant -> daftar nama mesin")
+    parser.add_argument("--default-plant", default=DEFAULT_PLANT, help="plant untuk mesin yang tidak terdaftar")
+    parser.add_argument("--source", choices=["json", "sqlite"], help="storage sumber, default env PART_STORAGE")
+    parser.add_argument("--force", action="store_true", help="timpa shard di manifest yang sudah ada")
+    args = parser.parse_args()
+
+    if args.by == "plant" and not args.plants:
+        parser.error("--plants wajib untuk --by plant")
+    manifest = ShardManifest(shard_dir())
+    if manifest.shards and not args.force:
+        print(f"Manifest {manifest.path} sudah berisi {len(manifest.shards)} shard; pakai --force untuk membagi ulang")
+        return 1
+
+    plants = {}
+    if args.plants:
+        with open(args.plants, 'r', encoding='utf-8') as f:
+            plants = json.load(f)
+    manifest.shard_by = args.by
+    manifest.default_plant = args.default_plant
+    manifest.plants = plants
+    manifest.save()
+
+    parts = open_storage(args.source).load_all()
+    # Dikelompokkan per kunci facet nama shard (ejaan pertama dipakai sebagai nama),
+    # sehingga "Suzuki" dan "suzuki" masuk satu shard/file yang sama
+    names = {facet_key(name): name for name in manifest.shards}
+    groups = {key: [] for key in names}  # shard lama yang tidak kebagian part dikosongkan
+    for part in parts:
+        name = manifest.shard_of(part)
+        key = facet_key(name)
+        names.setdefault(key, name)
+        groups.setdefault(key, []).append(part)
+
+    grouped = sum(len(group) for group in groups.values())
+    if grouped != len(parts):
+        print(f"Pembagian tidak lengkap ({grouped:,} dari {len(parts):,} part); shard tidak ditulis")
+        return 1
+
+    for key in sorted(groups, key=lambda key: names[key].casefold()):
+        storage = JsonStorage(manifest.shard_file(names[key]))
+        storage.replace_all(groups[key])
+        storage.compact()  # snapshot lengkap sebelum script selesai
+        print(f"{names[key]:<30} {len(groups[key]):>10,} part -> {storage.data_file}")
+    with manifest.write_lock():
+        # Index global nomor part dibangun ulang dari hasil pembagian
+        PartIndex(manifest.directory).rebuild(
+            (str(part['part_number']), names[key]) for key in groups for part in groups[key]
+        )
+    print(f"{len(parts):,} part dibagi ke {len(groups)} shard ({args.by}), manifest: {manifest.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
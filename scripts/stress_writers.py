@@ -0,0 +1,140 @@
+"""Stress test penulisan bersamaan ke satu storage.
+
+Menjalankan N thread penulis yang bersamaan melakukan insert, bulk import
+dengan nomor part yang saling tumpang tindih, dan update optimistic
+(``expected_version`` + retry) pada record yang sama. Setelah selesai,
+hasilnya dicek: tidak ada update yang hilang, tidak ada nomor part ganda
+dan data yang dibaca ulang dari disk sama dengan data di memori.
+
+Contoh:
+    python scripts/stress_writers.py --backend json --threads 16
+    python scripts/stress_writers.py --backend json --instances   # simulasi multi-proses
+    python scripts/stress_writers.py --backend sqlite --threads 8
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import JsonStorage, SqliteStorage, StaleRecordError  # noqa: E402
+
+HOT_PARTS = 4  # record yang diperebutkan semua thread
+
+
+def make_part(part_number, counter=0):
+    return {
+        'part_number': part_number,
+        'part_code': f"CODE-{part_number}",
+        'machine_name': random.choice(["Mesin A", "Mesin B", "Mesin C"]),
+        'material': random.choice(["Steel", "Karet", "Plastik"]),
+        'install_date': "2025-01-01",
+        'recommended_usage': 2000,
+        'category': random.choice(["Mechanical", "Electrical", "Pneumatic"]),
+        'counter': counter,
+    }
+
+
+def open_store(backend, path):
+    if backend == "json":
+        store = JsonStorage(path)
+        store.COMPACT_EVERY = 200  # paksa kompaksi terjadi selama stress test
+        return store
+    return SqliteStorage(path)
+
+
+def writer(store, thread_id, args, stats, errors):
+    rng = random.Random(thread_id)
+    try:
+        for i in range(args.ops):
+            op = rng.random()
+            if op < 0.3:
+                store.insert(make_part(f"T{thread_id}-{i}"))
+                stats['inserted'][thread_id] += 1
+            elif op < 0.4:
+                # Bulk import dengan nomor part yang juga diimport thread lain
+                start = rng.randrange(0, args.bulk_keys)
+                batch = [make_part(f"B{n}") for n in range(start, min(start + 50, args.bulk_keys))]
+                stats['bulk'][thread_id] += len(store.insert_many(batch))
+            else:
+                part_number = f"HOT{rng.randrange(HOT_PARTS)}"
+                while True:
+                    current = next(p for p in store.load_all() if p['part_number'] == part_number)
+                    try:
+                        store.update(
+                            part_number, dict(current, counter=current['counter'] + 1),
+                            expected_version=current['version']
+                        )
+                        break
+                    except StaleRecordError:
+                        stats['conflicts'][thread_id] += 1
+                        if hasattr(store, 'refresh'):
+                            store.refresh()
+                stats['increments'][thread_id] += 1
+    except Exception as e:
+        errors.append((thread_id, repr(e)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=300, help="operasi per thread")
+    parser.add_argument("--bulk-keys", type=int, default=2000, help="jumlah nomor part untuk bulk import")
+    parser.add_argument("--instances", action="store_true",
+                        help="satu instance storage per thread (simulasi beberapa proses)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="stress_writers_")
+    path = os.path.join(workdir, "parts_data.json" if args.backend == "json" else "parts_data.db")
+    shared = open_store(args.backend, path)
+    shared.insert_many([make_part(f"HOT{n}") for n in range(HOT_PARTS)])
+
+    stats = {key: [0] * args.threads for key in ('inserted', 'bulk', 'increments', 'conflicts')}
+    errors = []
+    stores = [open_store(args.backend, path) if args.instances else shared for _ in range(args.threads)]
+    threads = [
+        threading.Thread(target=writer, args=(stores[t], t, args, stats, errors))
+        for t in range(args.threads)
+    ]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    shared.refresh()
+    final = shared.load_all()
+    reloaded = open_store(args.backend, path).load_all()
+    numbers = [p['part_number'] for p in final]
+    counters = sum(p['counter'] for p in final if p['part_number'].startswith("HOT"))
+
+    checks = {
+        "tidak ada error di thread": not errors,
+        "tidak ada nomor part ganda": len(numbers) == len(set(numbers)),
+        "tidak ada update yang hilang": counters == sum(stats['increments']),
+        "bulk import tidak menggandakan data": sum(stats['bulk']) == sum(1 for n in numbers if n.startswith("B")),
+        "jumlah insert sesuai": sum(stats['inserted']) == sum(1 for n in numbers if n.startswith("T")),
+        "data di disk sama dengan di memori": (
+            sorted(final, key=lambda p: p['part_number']) == sorted(reloaded, key=lambda p: p['part_number'])
+        ),
+    }
+
+    total_ops = args.threads * args.ops
+    print(f"Backend: {args.backend}, thread: {args.threads}, operasi: {total_ops}, data: {workdir}")
+    print(f"Durasi: {elapsed:.2f} s ({total_ops / elapsed:.0f} op/s), konflik versi: {sum(stats['conflicts'])}")
+    for thread_id, error in errors:
+        print(f"  thread {thread_id}: {error}")
+    for name, ok in checks.items():
+        print(f"[{'OK' if ok else 'GAGAL'}] {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
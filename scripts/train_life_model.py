@@ -0,0 +1,59 @@
+"""Latih model umur part (mode prediktif) dari riwayat penggantian, offline.
+
+Secara default pelatihan bertahap: model yang ada (``life_model.pkl``, env
+``PART_MODEL_FILE``) hanya dilatih dengan event riwayat yang ditambahkan
+sejak pelatihan terakhir. Sebelum dilatih, model diuji pada event baru itu
+(MAE rasio umur aktual / rekomendasi) sehingga kualitas prediksi terpantau
+tanpa data uji terpisah. Dashboard memuat ulang model setelah file diganti.
+
+Contoh:
+    python scripts/train_life_model.py            # lanjutkan dengan event baru, mis. dari cron
+    python scripts/train_life_model.py --full     # latih ulang dari seluruh riwayat
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import get_history  # noqa: E402
+from prediction import (  # noqa: E402
+    MIN_TRAINING_EVENTS, TRAINING_EPOCHS, LifeModel, load_model, model_file, save_model, training_rows,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="abaikan model lama dan latih dari awal")
+    parser.add_argument("--epochs", type=int, default=TRAINING_EPOCHS, help="jumlah putaran per pelatihan")
+    parser.add_argument("--min-events", type=int, default=MIN_TRAINING_EVENTS,
+                        help="penggantian valid minimal untuk pelatihan pertama")
+    args = parser.parse_args()
+
+    path = model_file()
+    model = LifeModel() if args.full or not os.path.exists(path) else load_model(path)
+    events = get_history().events()
+    if len(events) < model.trained_events:
+        print(f"Riwayat berisi {len(events):,} event, model sudah dilatih dengan {model.trained_events:,}; "
+              "jalankan dengan --full")
+        return 1
+
+    rows = training_rows(events.iloc[model.trained_events:])
+    if not model.samples and len(rows) < args.min_events:
+        print(f"Baru {len(rows):,} penggantian valid, minimal {args.min_events:,} untuk pelatihan pertama")
+        return 1
+    if rows.empty:
+        print("Tidak ada penggantian baru sejak pelatihan terakhir")
+        return 0
+
+    if model.samples:
+        print(f"MAE rasio umur pada {len(rows):,} penggantian baru (sebelum dilatih): {model.evaluate(rows):.3f}")
+    model.partial_fit(rows, epochs=args.epochs)
+    model.trained_events = len(events)
+    save_model(model, path)
+    print(f"Model dilatih dengan {len(rows):,} penggantian (total {model.samples:,}), disimpan ke {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Index pencarian part (typeahead) atas nomor part, kode part dan nama mesin.
+
+Setiap kolom disimpan sebagai satu string panjang (teks tanpa beda huruf
+besar/kecil, dipisah karakter ``SEPARATOR``) beserta posisi awal setiap
+baris. Pencarian memakai ``str.find`` di atas string itu (C, tanpa loop
+Python per part) dan berhenti begitu ``limit`` hasil terkumpul, sehingga
+biaya per ketikan bergantung pada jumlah hasil, bukan jumlah part.
+
+Urutan hasil: nomor/kode/mesin yang sama persis, lalu yang diawali teks
+pencarian, lalu yang memuatnya di tengah; di setiap tingkat nomor part lebih
+dulu, kemudian kode part dan nama mesin.
+
+Index di-update per record seperti index facet: record baru atau yang
+berubah ditambahkan di akhir string, baris lama hanya ditandai mati. String
+dibangun ulang jika baris mati sudah lebih banyak dari baris hidup.
+"""
+from bisect import bisect_right
+
+SEARCH_FIELDS = ('part_number', 'part_code', 'machine_name')
+SEARCH_LIMIT = 20
+SEPARATOR = "\x00"
+
+
+def search_key(value):
+    """Teks yang dicari: tanpa spasi di tepi, tanpa beda huruf besar/kecil"""
+    if value is None:
+        return ''
+    return str(value).strip().casefold().replace(SEPARATOR, '')
+
+
+class SearchIndex:
+    """Teks pencarian per kolom dalam string bersambung, baris -> ``part_number``"""
+
+    def __init__(self, records=()):
+        self._numbers = []  # baris -> part_number, None jika baris sudah mati
+        self._keys = []  # baris -> teks pencarian per kolom
+        self._rows = {}  # part_number -> baris hidup
+        self._reset_texts()
+        for record in records:
+            self.add(record)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _reset_texts(self):
+        self._texts = {field: SEPARATOR for field in SEARCH_FIELDS}
+        self._starts = {field: [] for field in SEARCH_FIELDS}  # posisi SEPARATOR sebelum teks baris
+        self._indexed = 0  # jumlah baris yang sudah masuk string
+
+    def add(self, record):
+        self.remove(record)
+        self._rows[record['part_number']] = len(self._numbers)
+        self._numbers.append(record['part_number'])
+        self._keys.append(tuple(search_key(record.get(field)) for field in SEARCH_FIELDS))
+
+    def remove(self, record):
+        row = self._rows.pop(record['part_number'], None)
+        if row is not None:
+            self._numbers[row] = None
+
+    def _flush(self):
+        """Tambahkan baris baru ke string, atau bangun ulang jika baris mati lebih banyak dari yang hidup"""
+        if len(self._numbers) > 2 * len(self._rows) + 1000:
+            live = [row for row, number in enumerate(self._numbers) if number is not None]
+            self._numbers = [self._numbers[row] for row in live]
+            self._keys = [self._keys[row] for row in live]
+            self._rows = dict(zip(self._numbers, range(len(self._numbers))))
+            self._reset_texts()
+        if self._indexed == len(self._keys):
+            return
+        new = self._keys[self._indexed:]
+        for position, field in enumerate(SEARCH_FIELDS):
+            text, starts = self._texts[field], self._starts[field]
+            offset = len(text) - 1
+            values = [keys[position] for keys in new]
+            for value in values:
+                starts.append(offset)
+                offset += len(value) + 1
+            self._texts[field] = text + SEPARATOR.join(values) + SEPARATOR
+        self._indexed = len(self._keys)
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Maksimal ``limit`` ``part_number`` yang cocok dengan ``query``, paling relevan lebih dulu"""
+        query = search_key(query)
+        if not query or limit <= 0:
+            return []
+        self._flush()
+        found, seen = [], set()
+        patterns = (SEPARATOR + query + SEPARATOR, SEPARATOR + query, query)
+        for pattern in patterns:
+            for field in SEARCH_FIELDS:
+                text, starts = self._texts[field], self._starts[field]
+                position = text.find(pattern)
+                while position >= 0:
+                    row = bisect_right(starts, position) - 1
+                    number = self._numbers[row]
+                    if number is not None and number not in seen:
+                        seen.add(number)
+                        found.append(number)
+                        if len(found) >= limit:
+                            return found
+                    # Lanjut dari baris berikutnya: satu baris cukup dicocokkan sekali per kolom
+                    position = text.find(pattern, starts[row + 1] if row + 1 < len(starts) else len(text))
+        return found
+
+
+def search_rank(record, query):
+    """Peringkat kecocokan ``record`` dengan ``query`` sesuai urutan hasil ``SearchIndex.search``.
+
+    Dipakai untuk menggabungkan hasil pencarian beberapa index (mis. shard
+    per plant): (tingkat kecocokan, kolom), record yang tidak cocok paling akhir.
+    """
+    query = search_key(query)
+    keys = [search_key(record.get(field)) for field in SEARCH_FIELDS]
+    for level, matches in enumerate((str.__eq__, str.startswith, str.__contains__)):
+        for position, key in enumerate(keys):
+            if matches(key, query):
+                return (level, position)
+    return (3, 0)
@@ -0,0 +1,740 @@
+"""Storage multi-plant: data part dipecah menjadi shard per plant (atau per mesin).
+
+Setiap shard adalah satu ``JsonStorage`` (snapshot + journal) di direktori
+``parts_shards`` (env ``PART_SHARD_DIR``). ``manifest.json`` di direktori
+itu mencatat cara pembagian dan file setiap shard::
+
+    {
+      "shard_by": "plant",
+      "default_plant": "Lainnya",
+      "plants": {"Plant Cikarang": ["Mesin A", "Mesin B"], "Plant Karawang": ["Mesin C"]},
+      "shards": {"Plant Cikarang": "plant-cikarang.json", "Plant Karawang": "plant-karawang.json"}
+    }
+
+Dengan ``shard_by: plant`` mesin dipetakan ke plant lewat ``plants``
+(tanpa beda huruf besar/kecil, seperti filter facet); mesin yang belum
+dipetakan masuk ``default_plant``. Dengan ``shard_by: machine`` setiap mesin
+menjadi satu shard. Shard baru ditambahkan ke manifest saat part pertamanya
+disimpan. ``scripts/shard_storage.py`` memecah data yang sudah ada.
+
+Session yang memilih satu plant hanya me-load shard plant itu, sehingga
+dashboard per plant tidak ikut melambat saat plant lain bertambah. Tampilan
+lintas plant (``ShardedFleet``) me-load dan menghitung shard secara paralel
+di thread pool, lalu menggabungkan hasilnya (jumlah status, hasil query,
+halaman terurut, pencarian). Setiap shard tetap ``Fleet`` biasa yang
+di-cache per proses, jadi session per plant dan lintas plant memakai data di
+memori yang sama.
+
+Nomor part unik di semua shard: tulisan yang menambah nomor part (insert,
+import, ganti nomor) memegang lock manifest dan memeriksa index global nomor
+part (``part_index.db``, lihat ``PartIndex``) lebih dulu, sehingga shard plant
+yang belum di-load session ini tidak perlu di-load. Operasi tulis
+atomik per shard; memindah part ke mesin di plant lain ditulis sebagai
+insert di shard baru lalu delete di shard lama.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from facets import facet_key
+from fleet import PAGE_SIZE, QUERY_CACHE_SIZE, SORT_KEYS, shared_fleet, sort_order
+from search import SEARCH_LIMIT, search_rank
+from status_engine import STATUS_NAMES, compute_fleet_status
+from storage import DuplicatePartError, FileLock, JsonStorage, StaleRecordError, _atomic_write_json, _file_stamp
+
+DEFAULT_SHARD_DIR = "parts_shards"
+MANIFEST_FILE = "manifest.json"
+PART_INDEX_FILE = "part_index.db"
+DEFAULT_PLANT = "Lainnya"
+SHARD_BY = ('plant', 'machine')
+LOAD_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def shard_dir():
+    return os.environ.get("PART_SHARD_DIR", DEFAULT_SHARD_DIR)
+
+
+def sharded_storage():
+    """True jika aplikasi memakai storage multi-plant (``PART_STORAGE=sharded``)"""
+    return os.environ.get("PART_STORAGE", "json").lower() == "sharded"
+
+
+def _slug(name):
+    return re.sub(r'[^0-9a-z]+', '-', facet_key(name)).strip('-') or 'shard'
+
+
+class ShardManifest:
+    """Isi ``manifest.json``: aturan pembagian shard dan file per shard"""
+
+    def __init__(self, directory=None):
+        self.directory = directory or shard_dir()
+        self.path = os.path.join(self.directory, MANIFEST_FILE)
+        self._lock = threading.RLock()
+        self._file_lock = None  # dibuat saat pertama menulis (direktori mungkin belum ada)
+        self._stamp = None
+        self.generation = 0  # naik setiap kali manifest dibaca ulang
+        self._read()
+
+    def _read(self):
+        self._stamp = _file_stamp(self.path)
+        self.generation += 1
+        data = {}
+        if self._stamp is not None:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        self.shard_by = data.get('shard_by', 'plant')
+        if self.shard_by not in SHARD_BY:
+            raise ValueError(f"shard_by tidak dikenal di {self.path}: {self.shard_by}")
+        self.default_plant = data.get('default_plant', DEFAULT_PLANT)
+        self.plants = data.get('plants', {})
+        self.shards = data.get('shards', {})
+        self._plant_of = {
+            facet_key(machine): plant for plant, machines in self.plants.items() for machine in machines
+        }
+        # Kunci facet -> nama shard; plant di ``plants`` yang belum punya file ikut terdaftar
+        self._names = {facet_key(name): name for name in self.plants}
+        self._names.update((facet_key(name), name) for name in self.shards)
+        self._files = {facet_key(name): file for name, file in self.shards.items()}
+
+    def refresh(self):
+        """Baca ulang manifest jika diubah proses lain; True jika berubah"""
+        with self._lock:
+            if _file_stamp(self.path) == self._stamp:
+                return False
+            self._read()
+            return True
+
+    def names(self):
+        """Nama semua shard (termasuk plant yang belum berisi part), urut nama"""
+        with self._lock:
+            return sorted(self._names.values(), key=str.casefold)
+
+    def resolve(self, name):
+        """Nama shard seperti tertulis di manifest untuk ``name`` (tanpa beda huruf besar/kecil)"""
+        with self._lock:
+            resolved = self._names.get(facet_key(name))
+        if resolved is None:
+            raise ValueError(f"Plant/shard tidak dikenal: {name}")
+        return resolved
+
+    def shard_of(self, part):
+        """Nama shard untuk sebuah record, dari nama mesinnya.
+
+        Nama yang sama tanpa beda huruf besar/kecil selalu menghasilkan satu
+        nama shard: ejaan di manifest jika shard sudah ada, selain itu ejaan
+        yang diberikan.
+        """
+        machine = str(part.get('machine_name') or '').strip()
+        if self.shard_by == 'machine':
+            name = machine or self.default_plant
+        else:
+            name = self._plant_of.get(facet_key(machine), self.default_plant)
+        return self._names.get(facet_key(name), name)
+
+    def has_file(self, name):
+        """True jika shard ``name`` sudah terdaftar dengan file storage"""
+        with self._lock:
+            return facet_key(name) in self._files
+
+    def shard_file(self, name):
+        """Path file storage shard ``name``; shard baru didaftarkan ke manifest lebih dulu"""
+        with self._lock:
+            name = self._names.get(facet_key(name), name)
+            if facet_key(name) not in self._files:
+                self._add_shard(name)
+            return os.path.join(self.directory, self._files[facet_key(name)])
+
+    def write_lock(self):
+        """Lock antar proses untuk manifest dan tulisan yang menambah nomor part (reentrant per thread)"""
+        with self._lock:
+            if self._file_lock is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._file_lock = FileLock(self.path + ".lock")
+            return self._file_lock
+
+    def _add_shard(self, name):
+        with self.write_lock():
+            self._read()  # shard mungkin sudah ditambahkan proses lain
+            if facet_key(name) in self._files:
+                return
+            used = set(self.shards.values())
+            base = file = _slug(name) + ".json"
+            suffix = 1
+            while file in used:
+                suffix += 1
+                file = base[:-len(".json")] + f"-{suffix}.json"
+            self.shards[name] = file
+            self.save()
+
+    def save(self):
+        """Tulis manifest secara atomik"""
+        os.makedirs(self.directory, exist_ok=True)
+        _atomic_write_json(self.path, {
+            'shard_by': self.shard_by,
+            'default_plant': self.default_plant,
+            'plants': self.plants,
+            'shards': self.shards,
+        })
+        self._read()
+
+
+class PartIndex:
+    """Index global nomor part -> shard di ``part_index.db`` (SQLite) di samping manifest.
+
+    Keunikan nomor part dicek lewat index ini, sehingga insert tidak perlu
+    me-load semua shard. Index hanya ditulis sambil memegang ``write_lock``
+    manifest dan selalu mencakup semua pasangan (nomor, shard) yang ada:
+    entri ditambah sebelum part ditulis ke shard dan dibuang setelahnya.
+    Entri yang tertinggal dicek ulang ke shard-nya oleh ``ShardedFleet``.
+    Jika index belum ada (direktori shard dari versi lama) isinya dibangun
+    sekali dari semua shard.
+    """
+
+    SCHEMA = """
+        CREATE TABLE parts (
+            part_number TEXT NOT NULL,
+            shard TEXT NOT NULL,
+            PRIMARY KEY (part_number, shard)
+        ) WITHOUT ROWID
+    """
+    BATCH = 500  # nomor part per query (batas parameter SQLite)
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, PART_INDEX_FILE)
+        self._conn = None
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def _transaction(self, build=None):
+        """Transaksi di index; ``build()`` mengisi index yang belum ada dengan pasangan (nomor, shard)"""
+        with self._lock:
+            if self._conn is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if not self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'parts'").fetchall():
+                    if build is None:
+                        raise RuntimeError(f"Index nomor part {self.path} belum dibangun")
+                    self._conn.execute(self.SCHEMA)
+                    self._conn.executemany("INSERT OR IGNORE INTO parts VALUES (?, ?)", build())
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def lookup(self, numbers, build):
+        """Pasangan (nomor, shard) di index untuk ``numbers``"""
+        numbers = list(numbers)
+        with self._transaction(build) as conn:
+            found = []
+            for start in range(0, len(numbers), self.BATCH):
+                batch = numbers[start:start + self.BATCH]
+                found.extend(conn.execute(
+                    f"SELECT part_number, shard FROM parts WHERE part_number IN ({', '.join('?' * len(batch))})",
+                    batch
+                ).fetchall())
+            return found
+
+    def add(self, entries, build):
+        with self._transaction(build) as conn:
+            conn.executemany("INSERT OR IGNORE INTO parts VALUES (?, ?)", entries)
+
+    def remove(self, entries, build):
+        with self._transaction(build) as conn:
+            conn.executemany("DELETE FROM parts WHERE part_number = ? AND shard = ?", entries)
+
+    def reset(self, shards, entries, build):
+        """Ganti semua entri ``shards`` dengan ``entries`` (setelah replace seluruh isi shard)"""
+        with self._transaction(build) as conn:
+            conn.executemany("DELETE FROM parts WHERE shard = ?", [(name,) for name in shards])
+            conn.executemany("INSERT OR IGNORE INTO parts VALUES (?, ?)", entries)
+
+    def rebuild(self, entries):
+        """Isi ulang seluruh index dengan ``entries``, mis. setelah shard dibagi ulang"""
+        with self._transaction(lambda: []) as conn:
+            conn.execute("DELETE FROM parts")
+            conn.executemany("INSERT OR IGNORE INTO parts VALUES (?, ?)", entries)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _map(function, fleets):
+    """``function`` untuk setiap shard, paralel di thread pool jika lebih dari satu shard"""
+    global _pool
+    if len(fleets) <= 1:
+        return [function(fleet) for fleet in fleets]
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=LOAD_WORKERS, thread_name_prefix="shard")
+    return list(_pool.map(function, fleets))
+
+
+def _concat(frames):
+    """Gabungkan DataFrame per shard (tanpa salinan jika hanya satu shard)"""
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _merge_options(option_lists):
+    """Gabungkan list (kunci, label, jumlah) per shard, urut label"""
+    labels, counts = {}, {}
+    for options in option_lists:
+        for key, label, count in options:
+            labels.setdefault(key, label)
+            counts[key] = counts.get(key, 0) + count
+    return sorted(((key, labels[key], counts[key]) for key in counts), key=lambda option: option[1].casefold())
+
+
+def _merge_counts(results):
+    """Jumlahkan dict {label: jumlah} per shard; label digabung lewat kunci facet, urut label"""
+    labels, counts = {}, {}
+    for result in results:
+        for label, count in result.items():
+            key = facet_key(label)
+            labels.setdefault(key, label)
+            counts[key] = counts.get(key, 0) + count
+    return {labels[key]: counts[key] for key in sorted(counts, key=lambda key: labels[key].casefold())}
+
+
+class ShardFacets:
+    """Jumlah part per status dan opsi filter gabungan index facet beberapa shard"""
+
+    def __init__(self, indexes):
+        self._indexes = indexes
+
+    def status_count(self, status):
+        return sum(index.status_count(status) for index in self._indexes)
+
+    def options(self, field):
+        return _merge_options(index.options(field) for index in self._indexes)
+
+
+def _shard_fleet(manifest, name):
+    path = os.path.abspath(manifest.shard_file(name))
+    return shared_fleet(('shard', path), lambda: JsonStorage(path))
+
+
+class ShardedFleet:
+    """Gabungan ``Fleet`` beberapa shard dengan interface yang sama dengan ``Fleet``.
+
+    Baca dijalankan per shard di thread pool lalu digabung; tulisan diarahkan
+    ke shard mesin part tersebut. ``version`` naik setiap kali data salah satu
+    shard berubah, sehingga cache hasil gabungan ikut kedaluwarsa.
+    """
+
+    def __init__(self, manifest, names=None):
+        self.manifest = manifest
+        self.names = names  # None = semua shard di manifest, termasuk shard baru
+        self._part_index = PartIndex(manifest.directory)
+        self._version = 0
+        self._lock = threading.RLock()
+        self._fleets = {}
+        self._versions = None
+        self._attach()
+
+    def _attach(self):
+        """Load shard yang dipilih secara paralel (yang sudah di-cache cukup di-refresh)"""
+        self._generation = self.manifest.generation
+        names = self.manifest.names() if self.names is None else self.names
+        fleets = _map(lambda name: _shard_fleet(self.manifest, name).refresh(), names)
+        self._fleets = dict(zip(names, fleets))
+        self._sync()
+
+    @property
+    def version(self):
+        with self._lock:
+            self._sync()
+            return self._version
+
+    def _sync(self):
+        """Naikkan versi gabungan dan buang hasil gabungan jika ada shard yang berubah"""
+        versions = tuple((name, fleet.version) for name, fleet in self._fleets.items())
+        if versions != self._versions:
+            self._versions = versions
+            self._version += 1
+            self._parts = None
+            self._status = None
+            self._hashes = None
+            self._queries = OrderedDict()
+            self._orders = OrderedDict()
+
+    def refresh(self):
+        """Reload shard yang diubah dari luar; shard baru di manifest ikut dipakai tampilan semua plant"""
+        with self._lock:
+            self.manifest.refresh()
+            if self.names is None and self.manifest.generation != self._generation:
+                self._attach()
+            else:
+                _map(lambda fleet: fleet.refresh(), self.fleets)
+                self._sync()
+        return self
+
+    @property
+    def fleets(self):
+        return list(self._fleets.values())
+
+    @property
+    def parts(self):
+        with self._lock:
+            self._sync()
+            if self._parts is None:
+                self._parts = [part for fleet in self.fleets for part in fleet.parts]
+            return self._parts
+
+    def __len__(self):
+        return sum(len(fleet) for fleet in self.fleets)
+
+    def __contains__(self, part_number):
+        return any(part_number in fleet for fleet in self.fleets)
+
+    def _holder(self, part_number):
+        """Fleet shard yang menyimpan ``part_number``"""
+        for fleet in self.fleets:
+            if part_number in fleet:
+                return fleet
+        raise KeyError(str(part_number))
+
+    def get(self, part_number):
+        return self._holder(part_number).get(part_number)
+
+    def _target(self, part):
+        """Fleet shard tujuan sebuah record (shard baru dibuat jika perlu)"""
+        name = self.manifest.shard_of(part)
+        with self._lock:
+            fleet = self._fleets.get(name)
+            if fleet is None:
+                fleet = _shard_fleet(self.manifest, name).refresh()
+                if self.names is None:
+                    self._fleets[name] = fleet
+                    self._generation = self.manifest.generation
+            return fleet
+
+    def _written(self, result):
+        with self._lock:
+            self._sync()
+        return result
+
+    def _index_entries(self):
+        """(nomor part, shard) dari semua shard, untuk membangun index global pertama kali"""
+        self.manifest.refresh()
+        names = [name for name in self.manifest.names() if self.manifest.has_file(name)]
+        fleets = _map(lambda name: _shard_fleet(self.manifest, name).refresh(), names)
+        return [(str(part['part_number']), name) for name, fleet in zip(names, fleets) for part in fleet.parts]
+
+    def _index_add(self, parts):
+        self._part_index.add([(str(part['part_number']), self.manifest.shard_of(part)) for part in parts],
+                             self._index_entries)
+
+    def _existing(self, numbers):
+        """{nomor part: shard} untuk nomor dari ``numbers`` yang sudah ada di shard mana pun.
+
+        Kandidat dari index global dicek ke shard yang tercatat (hanya shard itu
+        yang di-load); entri yang tidak berlaku lagi dibuang dari index.
+        Pemanggil memegang lock manifest.
+        """
+        self.manifest.refresh()
+        found, stale = {}, []
+        for number, name in self._part_index.lookup(numbers, self._index_entries):
+            if self.manifest.has_file(name) and number in _shard_fleet(self.manifest, name).refresh():
+                found[number] = name
+            else:
+                stale.append((number, name))
+        if stale:
+            self._part_index.remove(stale, self._index_entries)
+        return found
+
+    def _check_new(self, part_number):
+        """``DuplicatePartError`` jika nomor part sudah ada di shard mana pun (pemanggil memegang lock manifest)"""
+        if self._existing([str(part_number)]):
+            raise DuplicatePartError(str(part_number))
+
+    def _relocated(self, part_number, part, write):
+        """Jalankan ``write()`` yang mengganti nomor atau shard part; index global ikut diperbarui"""
+        with self.manifest.write_lock():
+            self._index_add([part])
+            try:
+                record = write()
+            finally:
+                # Buang entri nomor/shard lama, atau entri baru jika tulisan gagal
+                self._existing({str(part_number), str(part['part_number'])})
+            return self._written(record)
+
+    def insert(self, part):
+        with self.manifest.write_lock():
+            self._check_new(part['part_number'])
+            self._index_add([part])
+            return self._written(self._target(part).insert(part))
+
+    def insert_many(self, parts):
+        """Tambah banyak part, dikelompokkan per shard tujuan; nomor yang sudah ada di shard mana pun dilewati"""
+        with self.manifest.write_lock():
+            existing = self._existing({str(part['part_number']) for part in parts})
+            groups, seen = {}, set()
+            for part in parts:
+                number = str(part['part_number'])
+                if number in seen or number in existing:
+                    continue
+                seen.add(number)
+                fleet = self._target(part)
+                groups.setdefault(id(fleet), (fleet, []))[1].append(part)
+            self._index_add([part for _, group in groups.values() for part in group])
+            records = [record for fleet, group in groups.values() for record in fleet.insert_many(group)]
+            return self._written(records)
+
+    def update(self, part_number, part, expected_version=None):
+        if str(part['part_number']) != str(part_number):
+            # Ganti nomor part: nomor baru harus belum dipakai di shard mana pun
+            with self.manifest.write_lock():
+                self._check_new(part['part_number'])
+                return self._update(part_number, part, expected_version)
+        return self._update(part_number, part, expected_version)
+
+    def _update(self, part_number, part, expected_version):
+        source, target = self._holder(part_number), self._target(part)
+        if source is target:
+            if str(part['part_number']) != str(part_number):
+                return self._relocated(part_number, part, lambda: source.update(part_number, part, expected_version))
+            return self._written(source.update(part_number, part, expected_version))
+
+        def move():
+            # Pindah plant: record baru di shard tujuan, lalu hapus dari shard lama
+            current = source.refresh().get(part_number)
+            if expected_version is not None and current.get('version', 0) != expected_version:
+                raise StaleRecordError(part_number, expected_version, current.get('version', 0))
+            record = target.insert(part, current.get('version', 0) + 1)
+            source.delete(part_number, current.get('version', 0))
+            return record
+        return self._relocated(part_number, part, move)
+
+    def update_many(self, parts, expected_versions=None):
+        """Update banyak part; satu tulisan per shard, part yang pindah plant ditulis satu per satu"""
+        expected_versions = expected_versions or {}
+        groups, moved = {}, []
+        for part in parts:
+            source = self._holder(part['part_number'])
+            if source is self._target(part):
+                groups.setdefault(id(source), (source, []))[1].append(part)
+            else:
+                moved.append(part)
+        records = []
+        for fleet, group in groups.values():
+            numbers = {str(part['part_number']) for part in group}
+            versions = {number: version for number, version in expected_versions.items() if number in numbers}
+            records.extend(fleet.update_many(group, versions))
+        for part in moved:
+            number = str(part['part_number'])
+            records.append(self.update(number, part, expected_versions.get(number)))
+        return self._written(records)
+
+    def merge_update(self, part_number, base, part):
+        if str(part['part_number']) != str(part_number):
+            with self.manifest.write_lock():
+                self._check_new(part['part_number'])
+                return self._merge_update(part_number, base, part)
+        return self._merge_update(part_number, base, part)
+
+    def _merge_update(self, part_number, base, part):
+        source = self._holder(part_number)
+        if source is not self._target(part):
+            return self.update(part_number, part, expected_version=base.get('version', 0))
+        if str(part['part_number']) != str(part_number):
+            return self._relocated(part_number, part, lambda: source.merge_update(part_number, base, part))
+        return self._written(source.merge_update(part_number, base, part))
+
+    def mark_replaced(self, part_number, install_date, expected_version=None):
+        return self._written(self._holder(part_number).mark_replaced(part_number, install_date, expected_version))
+
+    def pop_history_error(self, part_number):
+        return self._holder(part_number).pop_history_error(part_number)
+
+    def delete(self, part_number, expected_version=None):
+        result = self._holder(part_number).delete(part_number, expected_version)
+        with self.manifest.write_lock():
+            self._existing([str(part_number)])  # buang entri index part yang dihapus
+        return self._written(result)
+
+    def replace_all(self, parts):
+        """Ganti seluruh data shard yang dipilih; part plant lain atau bernomor sama dengan part plant lain ditolak"""
+        with self.manifest.write_lock():
+            groups = {name: [] for name in self._fleets}
+            for part in parts:
+                name = self.manifest.shard_of(part)
+                if name not in groups:
+                    if self.names is not None:
+                        raise ValueError(f"Part {part['part_number']} milik {name}, di luar plant yang dipilih")
+                    self._target(part)
+                    groups[name] = []
+                groups[name].append(part)
+            entries = [(str(part['part_number']), name) for name, group in groups.items() for part in group]
+            if self.names is not None:
+                selected = {facet_key(name) for name in groups}
+                for number, name in self._existing({number for number, _ in entries}).items():
+                    if facet_key(name) not in selected:
+                        raise DuplicatePartError(number)
+            self._part_index.add(entries, self._index_entries)
+            stored = {name: self._fleets[name].replace_all(group) for name, group in groups.items()}
+            self._part_index.reset(list(stored), [
+                (str(record['part_number']), name) for name, records in stored.items() for record in records
+            ], self._index_entries)
+            return self._written([record for records in stored.values() for record in records])
+
+    def facets(self, now=None):
+        """Jumlah status dan opsi filter gabungan; status setiap shard dihitung paralel"""
+        return ShardFacets(_map(lambda fleet: fleet.facets(now), self.fleets))
+
+    def aggregate(self, by, status_filter=STATUS_NAMES, machine="All", material="All", category="All", now=None):
+        results = _map(lambda fleet: fleet.aggregate(by, status_filter, machine, material, category, now),
+                       self.fleets)
+        if by == 'status':
+            return {name: sum(result[name] for result in results) for name in STATUS_NAMES}
+        return _merge_counts(results)
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Hasil teratas setiap shard, diurutkan ulang dengan aturan relevansi yang sama"""
+        found = []
+        for fleet in self.fleets:
+            found.extend((number, fleet) for number in fleet.search(query, limit))
+        if len(self._fleets) > 1:
+            found.sort(key=lambda item: search_rank(item[1].get(item[0]), query))
+        return [number for number, _ in found[:limit]]
+
+    def facet_options(self, field):
+        return _merge_options(fleet.facet_options(field) for fleet in self.fleets)
+
+    def content_hashes(self):
+        with self._lock:
+            self._sync()
+            if self._hashes is None:
+                hashes = [fleet.content_hashes() for fleet in self.fleets]
+                self._hashes = hashes[0] if len(hashes) == 1 else pd.concat(hashes)
+            return self._hashes
+
+    def fleet_status(self, now=None):
+        today = (now or datetime.now()).date()
+        with self._lock:
+            self._sync()
+            if self._status is None or self._status[0] != today:
+                frames = _map(lambda fleet: fleet.fleet_status(now), self.fleets)
+                self._status = (today, _concat(frames) if frames else compute_fleet_status([]))
+            return self._status[1]
+
+    def predictions(self, now=None):
+        frames = _map(lambda fleet: fleet.predictions(now), self.fleets)
+        if not frames or frames[0] is None:
+            return None
+        return frames[0] if len(frames) == 1 else pd.concat(frames)
+
+    def predicted_counts(self, status_filter=STATUS_NAMES, machine="All", material="All", category="All", now=None):
+        results = _map(lambda fleet: fleet.predicted_counts(status_filter, machine, material, category, now),
+                       self.fleets)
+        if not results or results[0] is None:
+            return None
+        return {name: sum(result[name] for result in results) for name in STATUS_NAMES}
+
+    def query(self, status_filter, machine="All", material="All", category="All", now=None):
+        """Hasil query setiap shard (paralel) digabung, di-cache per versi gabungan dan tanggal"""
+        today = (now or datetime.now()).date()
+        key = (today, tuple(status_filter), machine, material, category)
+        with self._lock:
+            self._sync()
+            if key in self._queries:
+                self._queries.move_to_end(key)
+                return self._queries[key]
+            frames = _map(lambda fleet: fleet.query(status_filter, machine, material, category, now), self.fleets)
+            result = self._queries[key] = _concat(frames) if frames else compute_fleet_status([])
+            if len(self._queries) > QUERY_CACHE_SIZE:
+                self._queries.popitem(last=False)
+            return result
+
+    def due_within(self, days, machine="All", now=None):
+        """Gabungan ``Fleet.due_within`` per shard dengan urutan yang sama.
+
+        Part dengan data tidak valid (tanpa tanggal ganti) di urutan pertama,
+        lalu part lain urut tanggal ganti dan ``part_number`` seperti index
+        jatuh tempo.
+        """
+        frames = _map(lambda fleet: fleet.due_within(days, machine, now), self.fleets)
+        if len(frames) == 1:
+            return frames[0]
+        if not frames:
+            return compute_fleet_status([])
+        merged = _concat(frames)
+        valid = (
+            merged['install_dt'].notna() & pd.to_numeric(merged['recommended_usage'], errors='coerce').notna()
+        ).to_numpy()
+        numbers = np.where(valid, merged['part_number'].astype(str).to_numpy(), '')
+        dates = merged['replacement_date'].to_numpy(dtype='datetime64[ns]')
+        return merged.iloc[np.lexsort((numbers, dates, valid))].reset_index(drop=True)
+
+    def status_crossings(self, since, now=None):
+        return set().union(*_map(lambda fleet: fleet.status_crossings(since, now), self.fleets))
+
+    def page(self, status_filter, machine="All", material="All", category="All",
+             sort='remaining_hours', ascending=True, offset=0, limit=PAGE_SIZE, now=None):
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Kunci sort tidak dikenal: {sort}")
+        today = (now or datetime.now()).date()
+        key = (today, tuple(status_filter), machine, material, category, sort, ascending)
+        with self._lock:
+            result = self.query(status_filter, machine, material, category, now)
+            order = self._orders.get(key)
+            if order is None:
+                order = self._orders[key] = sort_order(result, sort, ascending)
+                if len(self._orders) > QUERY_CACHE_SIZE:
+                    self._orders.popitem(last=False)
+            else:
+                self._orders.move_to_end(key)
+            return result.iloc[order[offset:offset + limit]], len(result)
+
+
+_manifests = {}
+_groups = {}
+_groups_lock = threading.Lock()
+_group_locks = {}  # lock per pilihan plant: session plant lain tidak menunggu load lintas plant
+
+
+def get_manifest(directory=None):
+    """Manifest shard per proses untuk direktori ``directory`` (default env ``PART_SHARD_DIR``)"""
+    directory = os.path.abspath(directory or shard_dir())
+    with _groups_lock:
+        manifest = _manifests.get(directory)
+        if manifest is None:
+            manifest = _manifests[directory] = ShardManifest(directory)
+    return manifest
+
+
+def list_shards():
+    """Nama shard (plant atau mesin) di manifest saat ini"""
+    manifest = get_manifest()
+    manifest.refresh()
+    return manifest.names()
+
+
+def get_sharded_fleet(plants=None):
+    """``ShardedFleet`` bersama untuk shard ``plants`` (None = semua), di-refresh jika data berubah"""
+    manifest = get_manifest()
+    manifest.refresh()
+    names = None if plants is None else tuple(manifest.resolve(name) for name in plants)
+    key = (manifest.directory, names)
+    with _groups_lock:
+        lock = _group_locks.setdefault(key, threading.Lock())
+    with lock:
+        group = _groups.get(key)
+        if group is None:
+            group = _groups[key] = ShardedFleet(manifest, None if names is None else list(names))
+            return group
+    return group.refresh()
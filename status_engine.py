@@ -0,0 +1,157 @@
+"""Perhitungan status part secara kolumnar untuk seluruh fleet.
+
+Semua part dihitung dalam satu pass NumPy/pandas: ``install_date`` di-parse
+sekali menjadi kolom datetime64, lalu sisa usia, tanggal penggantian dan
+status diturunkan dari kolom tersebut. Jam operasi per hari mengikuti
+kalender operasi mesin (lihat ``calendars``); untuk mesin yang punya
+pembacaan hour meter dipakai jam operasi aktual (lihat ``meters``).
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from calendars import get_calendars
+from constants import STATUS_NAMES
+from meters import get_meters
+
+WARNING_THRESHOLD = 500  # Batas sisa usia (jam) untuk status Warning
+
+PART_COLUMNS = [
+    'part_number', 'part_code', 'machine_name', 'material',
+    'install_date', 'recommended_usage', 'category'
+]
+
+CATEGORIES = ["Mechanical", "Electrical", "Pneumatic"]
+
+STATUS_EMOJI = {"Normal": "🟢", "Warning": "🟡", "Harus Ganti": "🔴"}
+STATUS_COLOR = {"Normal": "green", "Warning": "orange", "Harus Ganti": "red"}
+
+_STATUS_LABELS = np.array(STATUS_NAMES, dtype=object)
+_EMOJI_LABELS = np.array([STATUS_EMOJI[s] for s in STATUS_NAMES], dtype=object)
+_COLOR_LABELS = np.array([STATUS_COLOR[s] for s in STATUS_NAMES], dtype=object)
+
+
+def status_codes(remaining_hours):
+    """Kode status (0=Normal, 1=Warning, 2=Harus Ganti) untuk array sisa usia"""
+    remaining_hours = np.asarray(remaining_hours, dtype=float)
+    return np.select(
+        [remaining_hours > WARNING_THRESHOLD, remaining_hours > 0],
+        [0, 1],
+        default=2
+    )
+
+
+def parts_frame(parts):
+    """Ubah list record part menjadi DataFrame dengan kolom standar"""
+    if isinstance(parts, pd.DataFrame):
+        frame = parts.copy()
+    else:
+        frame = pd.DataFrame.from_records(list(parts))
+    for column in PART_COLUMNS:
+        if column not in frame.columns:
+            frame[column] = None
+    return frame
+
+
+def content_hashes(parts):
+    """Hash isi setiap record (kolom ``PART_COLUMNS``) sebagai Series per ``part_number``.
+
+    Angka dinormalisasi lebih dulu sehingga ``2000`` dan ``2000.0`` dianggap
+    sama; dipakai untuk membedakan record yang berubah dan yang tidak.
+    """
+    frame = parts_frame(parts)
+    normalized = pd.DataFrame({
+        column: frame[column].astype(str).str.strip() for column in PART_COLUMNS
+    })
+    normalized['recommended_usage'] = (
+        pd.to_numeric(frame['recommended_usage'], errors='coerce').astype('float64').astype(str)
+    )
+    hashes = pd.util.hash_pandas_object(normalized, index=False)
+    hashes.index = normalized['part_number']
+    return hashes
+
+
+def compute_fleet_status(parts, now=None):
+    """Hitung sisa usia, tanggal ganti dan status seluruh part sekaligus.
+
+    Hasilnya adalah DataFrame berisi kolom part asli ditambah
+    ``install_dt``, ``hours_used`` (jam operasi sejak pasang, tanpa batas
+    atas), ``remaining_hours``, ``replacement_date``,
+    ``warning_date`` (saat sisa usia mencapai ``WARNING_THRESHOLD``),
+    ``status``, ``status_icon`` dan ``color``. Nilainya identik dengan
+    ``calculate_remaining_hours``/``calculate_replacement_date``/``get_status``
+    yang dihitung per part.
+    """
+    now = pd.Timestamp(now if now is not None else datetime.now())
+    today = now.normalize()
+    frame = parts_frame(parts)
+
+    install_dt = pd.to_datetime(
+        frame['install_date'].astype(str), format="%Y-%m-%d", errors='coerce'
+    )
+    usage = pd.to_numeric(frame['recommended_usage'], errors='coerce')
+    calendars = get_calendars()
+
+    if calendars.uniform_hours is not None:
+        # Semua mesin memakai jam/hari yang sama (default 8 jam). Selisih hari
+        # dihitung dari tengah malam hari ini: floor((now - install).days)
+        # selalu sama dengan (today - install).days karena install_date tanpa jam.
+        days_passed = (today - install_dt).dt.days
+        hours_used = days_passed * calendars.uniform_hours
+        replacement_date = install_dt + pd.to_timedelta(usage / calendars.uniform_hours, unit='D')
+        warning_date = install_dt + pd.to_timedelta((usage - WARNING_THRESHOLD) / calendars.uniform_hours, unit='D')
+    else:
+        # Prefix sum jam operasi per kalender mesin: O(1) per part, binary search untuk tanggal habis
+        hours_used = calendars.hours_used(frame['machine_name'], install_dt, today)
+        replacement_date = calendars.exhaustion_dates(frame['machine_name'], install_dt, usage)
+        warning_date = calendars.exhaustion_dates(frame['machine_name'], install_dt, usage - WARNING_THRESHOLD)
+
+    meters = get_meters()
+    if len(meters):
+        metered, unread_from = meters.hours_used(frame['machine_name'], install_dt)
+        metered = metered.where(usage.notna())
+        has_meter = metered.notna()
+        if has_meter.any():
+            # Jam aktual dari hour meter ditambah estimasi kalender sejak pembacaan terakhir
+            unread = calendars.hours_used(frame['machine_name'], unread_from, today).clip(lower=0)
+            hours_used = hours_used.where(~has_meter, metered + unread.fillna(0))
+            budget = usage - metered  # jam tersisa sejak awal periode yang belum terbaca meter
+
+            def project(dates, hours, threshold):
+                """Tanggal ``hours`` jam habis sejak periode belum terbaca; jika sudah lewat paling lambat hari ini.
+
+                Tanggalnya tetap sama dari hari ke hari selama tidak ada pembacaan baru.
+                """
+                projected = calendars.exhaustion_dates(frame['machine_name'], unread_from, hours.clip(lower=0))
+                projected = projected.where(usage - hours_used > threshold, projected.clip(upper=today))
+                return dates.where(~has_meter, projected)
+
+            replacement_date = project(replacement_date, budget, 0)
+            warning_date = project(warning_date, budget - WARNING_THRESHOLD, WARNING_THRESHOLD)
+
+    remaining = (usage - hours_used).clip(lower=0)
+    # Data tidak valid diperlakukan seperti versi per-part: sisa usia 0
+    remaining = remaining.fillna(0)
+    if np.all(np.mod(remaining.to_numpy(), 1) == 0):
+        remaining = remaining.astype('int64')
+
+    replacement_date = replacement_date.fillna(now)
+    warning_date = warning_date.fillna(now)
+
+    codes = status_codes(remaining.to_numpy())
+    frame['install_dt'] = install_dt
+    frame['hours_used'] = hours_used
+    frame['remaining_hours'] = remaining
+    frame['replacement_date'] = replacement_date
+    frame['warning_date'] = warning_date
+    frame['status'] = _STATUS_LABELS[codes]
+    frame['status_icon'] = _EMOJI_LABELS[codes]
+    frame['color'] = _COLOR_LABELS[codes]
+    return frame
+
+
+def status_counts(status_frame):
+    """Jumlah part per status, selalu berisi ketiga status"""
+    counts = status_frame['status'].value_counts()
+    return {name: int(counts.get(name, 0)) for name in STATUS_NAMES}
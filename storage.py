@@ -0,0 +1,723 @@
+"""Storage backend untuk data part.
+
+``PartMonitoringSystem`` hanya berbicara dengan interface ``PartStorage``:
+baca semua data, operasi per-record (insert/update/delete) dan replace semua
+data. Filter dashboard tidak dijalankan di storage melainkan lewat index
+facet di memori (lihat ``fleet``). Backend yang tersedia:
+
+- ``JsonStorage``: snapshot ``parts_data.json`` + journal mutasi append-only
+- ``SqliteStorage``: database SQLite, operasi per-record lewat primary key
+
+Setiap record membawa nomor ``version`` yang naik setiap kali record
+diubah. Operasi tulis bisa diberi ``expected_version``; jika record sudah
+diubah session atau proses lain, operasi ditolak dengan ``StaleRecordError``.
+"""
+import json
+import math
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from status_engine import PART_COLUMNS
+
+DEFAULT_JSON_FILE = "parts_data.json"
+DEFAULT_SQLITE_FILE = "parts_data.db"
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+class StaleRecordError(Exception):
+    """Record sudah diubah session/proses lain sejak dibaca"""
+
+    def __init__(self, part_number, expected_version, current_version):
+        self.part_number = part_number
+        self.expected_version = expected_version
+        self.current_version = current_version
+        super().__init__(
+            f"Part {part_number} sudah diubah oleh operator lain "
+            f"(versi {expected_version}, sekarang {current_version})"
+        )
+
+
+class DuplicatePartError(ValueError):
+    """Nomor part sudah ada di storage"""
+
+    def __init__(self, part_number):
+        self.part_number = part_number
+        super().__init__(f"Nomor Part {part_number} sudah ada dalam database")
+
+
+def plain_value(value):
+    """Ubah nilai numpy/pandas menjadi tipe Python biasa (NaN -> None)"""
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def new_record(part, version):
+    """Salinan record siap simpan: nilai Python biasa, part_number teks, versi baru"""
+    record = {k: plain_value(v) for k, v in part.items()}
+    record['part_number'] = str(record['part_number'])
+    record['version'] = version
+    return record
+
+
+def _check_version(part_number, current, expected_version):
+    if expected_version is not None and current.get('version', 0) != expected_version:
+        raise StaleRecordError(part_number, expected_version, current.get('version', 0))
+
+
+def _file_stamp(path):
+    """(mtime, ukuran) file, None jika file tidak ada"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _atomic_write_json(path, data):
+    """Tulis JSON ke file sementara, fsync, lalu ganti file lama secara atomik"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False, default=plain_value)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    if hasattr(os, 'O_DIRECTORY'):
+        # Pastikan rename tercatat di direktori (POSIX)
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class FileLock:
+    """Lock eksklusif antar proses berbasis file, reentrant di dalam satu thread.
+
+    Memakai ``fcntl.flock`` di POSIX dan ``msvcrt.locking`` di Windows.
+    Thread lain di proses yang sama menunggu di ``threading.RLock``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self, blocking=True):
+        if not self._thread_lock.acquire(blocking):
+            return False
+        if self._depth == 0:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+            if not self._lock_fd(fd, blocking):
+                os.close(fd)
+                self._thread_lock.release()
+                return False
+            self._fd = fd
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._unlock_fd(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    @staticmethod
+    def _lock_fd(fd, blocking):
+        if os.name == 'nt':
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                    return True
+                except OSError:
+                    if not blocking:
+                        return False
+                    threading.Event().wait(0.05)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    @staticmethod
+    def _unlock_fd(fd):
+        if os.name == 'nt':
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class PartStorage:
+    """Interface dasar storage data part"""
+
+    # Naik setiap kali storage memuat perubahan dari proses lain
+    generation = 0
+
+    def refresh(self):
+        """Muat ulang jika data diubah dari luar proses ini; True jika ada perubahan"""
+        raise NotImplementedError
+
+    def load_all(self):
+        """Semua record part sebagai list of dict (salinan)"""
+        raise NotImplementedError
+
+    def insert(self, part, version=1):
+        """Tambah satu part baru, hasilnya record yang tersimpan.
+
+        ``version`` hanya diisi saat record dipindah dari storage lain
+        (mis. shard plant lain) agar nomor versinya tetap naik.
+        """
+        raise NotImplementedError
+
+    def insert_many(self, parts):
+        """Tambah banyak part sekaligus; part yang nomornya sudah ada dilewati.
+
+        Hasilnya list record yang benar-benar ditambahkan.
+        """
+        raise NotImplementedError
+
+    def update(self, part_number, part, expected_version=None):
+        """Ganti record ``part_number`` dengan ``part``, hasilnya record versi baru"""
+        raise NotImplementedError
+
+    def update_many(self, parts, expected_versions=None):
+        """Ganti banyak record sekaligus dalam satu tulisan (semua atau tidak sama sekali).
+
+        ``expected_versions`` berisi versi yang diharapkan per nomor part;
+        satu saja yang tidak cocok membatalkan seluruh batch.
+        """
+        raise NotImplementedError
+
+    def mark_replaced(self, part_number, install_date, expected_version=None):
+        """Catat part sudah diganti: tanggal pasang di-reset ke ``install_date``"""
+        raise NotImplementedError
+
+    def delete(self, part_number, expected_version=None):
+        """Hapus satu part"""
+        raise NotImplementedError
+
+    def replace_all(self, parts):
+        """Ganti seluruh isi storage, hasilnya list record yang tersimpan"""
+        raise NotImplementedError
+
+
+class JsonStorage(PartStorage):
+    """Storage JSON: snapshot ``parts_data.json`` ditambah journal mutasi append-only.
+
+    Setiap perubahan ditulis sebagai satu baris event di
+    ``parts_data.json.journal`` lalu di-fsync, sehingga biaya tulis
+    sebanding dengan ukuran record dan crash di tengah penulisan hanya bisa
+    merusak baris terakhir (dipotong saat replay). Saat startup journal
+    di-replay di atas snapshot terakhir. Jika journal sudah panjang, snapshot
+    baru ditulis di thread background (file sementara + ``os.replace``).
+
+    Event bersifat idempotent per ``part_number`` sehingga journal yang
+    ter-replay dua kali (crash saat kompaksi) tetap menghasilkan data yang sama.
+
+    Semua tulisan memegang ``parts_data.json.lock`` dan lebih dulu membaca
+    event baru dari proses lain, sehingga pengecekan versi selalu memakai
+    data terbaru.
+    """
+
+    COMPACT_EVERY = 1000  # jumlah event journal sebelum kompaksi
+
+    def __init__(self, data_file=DEFAULT_JSON_FILE):
+        self.data_file = data_file
+        self.journal_file = data_file + ".journal"
+        # Segmen journal yang sedang dikompaksi ke snapshot
+        self.pending_file = data_file + ".journal.compacting"
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(data_file + ".lock")
+        self._compact_lock = FileLock(data_file + ".compact.lock")
+        self._compactor = None
+        self.generation = 0
+        with self._file_lock, self._lock:
+            self._load()
+        if self._journal_events:
+            self.compact(background=True)
+
+    def _snapshot_stamps(self):
+        return (_file_stamp(self.data_file), _file_stamp(self.pending_file))
+
+    def _journal_size(self):
+        stamp = _file_stamp(self.journal_file)
+        return stamp[1] if stamp else 0
+
+    def _load(self):
+        """Baca snapshot + journal dari awal (pemanggil memegang file lock)"""
+        self._stamp = self._snapshot_stamps()
+        self._parts = {}
+        for part in self._read_snapshot():
+            self._parts[str(part['part_number'])] = part
+        self._journal_events = 0
+        for path in (self.pending_file, self.journal_file):
+            events, offset = self._read_journal(path)
+            for event in events:
+                self._apply(event)
+            self._journal_events += len(events)
+        self._journal_offset = offset
+        self.generation += 1
+
+    def _catch_up(self):
+        """Terapkan perubahan dari proses lain (pemanggil memegang file lock)"""
+        if self._snapshot_stamps() != self._stamp or self._journal_size() < self._journal_offset:
+            self._load()
+            return True
+        if self._journal_size() == self._journal_offset:
+            return False
+        events, self._journal_offset = self._read_journal(self.journal_file, self._journal_offset)
+        for event in events:
+            self._apply(event)
+        self._journal_events += len(events)
+        self.generation += 1
+        return True
+
+    def refresh(self):
+        # Jalur cepat tanpa lock: cukup stat file
+        if self._snapshot_stamps() == self._stamp and self._journal_size() == self._journal_offset:
+            return False
+        with self._file_lock, self._lock:
+            return self._catch_up()
+
+    def _read_snapshot(self):
+        if os.path.exists(self.data_file):
+            with open(self.data_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return []
+
+    def _read_journal(self, path, offset=0):
+        """Event journal mulai ``offset`` dan offset akhir baris valid terakhir"""
+        if not os.path.exists(path):
+            return [], 0
+        events = []
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    break
+                offset += len(line)
+        if path == self.journal_file and offset < self._journal_size():
+            # Baris terakhir terpotong karena crash saat menulis; buang agar
+            # event berikutnya tidak tersambung ke potongan tersebut
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+        return events, offset
+
+    def _apply(self, event):
+        """Terapkan satu event journal ke data di memori"""
+        op = event['op']
+        if op == 'insert':
+            self._parts[event['part']['part_number']] = event['part']
+        elif op in ('insert_many', 'update_many'):
+            for part in event['parts']:
+                self._parts[part['part_number']] = part
+        elif op == 'update':
+            self._parts.pop(event['part_number'], None)
+            self._parts[event['part']['part_number']] = event['part']
+        elif op == 'replaced':
+            part = self._parts.get(event['part_number'])
+            if part is not None:
+                self._parts[event['part_number']] = dict(
+                    part, install_date=event['install_date'], version=event['version']
+                )
+        elif op == 'delete':
+            self._parts.pop(event['part_number'], None)
+        elif op == 'reset':
+            self._parts = {part['part_number']: part for part in event['parts']}
+
+    @contextmanager
+    def _writing(self):
+        """Lock antar proses + data terbaru untuk satu operasi tulis"""
+        with self._file_lock, self._lock:
+            self._catch_up()
+            yield
+
+    def _commit(self, event):
+        """Tulis event ke journal (fsync), lalu terapkan ke memori"""
+        event = dict(event, ts=datetime.now().isoformat(timespec='seconds'))
+        line = (json.dumps(event, ensure_ascii=False, default=plain_value) + "\n").encode('utf-8')
+        with open(self.journal_file, 'ab') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            self._journal_offset = f.tell()
+        self._apply(json.loads(line))
+        self._journal_events += 1
+        if self._journal_events >= self.COMPACT_EVERY:
+            self.compact(background=True)
+
+    def compact(self, background=False):
+        """Tulis snapshot baru dari data di memori lalu buang journal lama.
+
+        Tanpa ``background`` kompaksi yang sedang berjalan di background
+        ditunggu lebih dulu, sehingga snapshot sudah lengkap saat kembali.
+        """
+        with self._lock:
+            compactor = self._compactor
+            if compactor is not None and compactor.is_alive():
+                if background:
+                    return
+            elif background:
+                self._compactor = threading.Thread(target=self._compact, name="journal-compactor", daemon=True)
+                self._compactor.start()
+                return
+        if compactor is not None:
+            compactor.join()
+        self._compact()
+
+    def _compact(self):
+        # Hanya satu kompaksi pada satu waktu, termasuk dari proses lain
+        if not self._compact_lock.acquire(blocking=False):
+            return
+        try:
+            with self._file_lock, self._lock:
+                self._catch_up()
+                parts = list(self._parts.values())
+                self._rotate_journal()
+                self._journal_events = 0
+                self._journal_offset = 0
+                self._stamp = self._snapshot_stamps()
+
+            # Serialisasi snapshot di luar lock agar penulisan lain tidak menunggu;
+            # selama itu segmen pending tetap ada sehingga pembaca tetap konsisten
+            _atomic_write_json(self.data_file, parts)
+            with self._file_lock, self._lock:
+                if os.path.exists(self.pending_file):
+                    os.remove(self.pending_file)
+                self._stamp = self._snapshot_stamps()
+        finally:
+            self._compact_lock.release()
+
+    def _rotate_journal(self):
+        """Pindahkan journal aktif ke segmen pending; tulisan baru masuk journal baru"""
+        if not os.path.exists(self.journal_file):
+            return
+        if os.path.exists(self.pending_file):
+            # Sisa kompaksi yang belum selesai: gabungkan agar urutan event terjaga
+            with open(self.journal_file, 'rb') as src, open(self.pending_file, 'ab') as dst:
+                dst.write(src.read())
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.remove(self.journal_file)
+        else:
+            os.replace(self.journal_file, self.pending_file)
+
+    def _current(self, part_number, expected_version):
+        current = self._parts.get(part_number)
+        if current is None:
+            raise KeyError(part_number)
+        _check_version(part_number, current, expected_version)
+        return current
+
+    def load_all(self):
+        with self._lock:
+            return [dict(p) for p in self._parts.values()]
+
+    def insert(self, part, version=1):
+        record = new_record(part, version)
+        with self._writing():
+            if record['part_number'] in self._parts:
+                raise DuplicatePartError(record['part_number'])
+            self._commit({'op': 'insert', 'part': record})
+        return record
+
+    def insert_many(self, parts):
+        with self._writing():
+            records = {}
+            for part in parts:
+                record = new_record(part, 1)
+                if record['part_number'] not in self._parts:
+                    records.setdefault(record['part_number'], record)
+            records = list(records.values())
+            if records:
+                self._commit({'op': 'insert_many', 'parts': records})
+        return records
+
+    def update(self, part_number, part, expected_version=None):
+        part_number = str(part_number)
+        with self._writing():
+            current = self._current(part_number, expected_version)
+            record = new_record(part, current.get('version', 0) + 1)
+            if record['part_number'] != part_number and record['part_number'] in self._parts:
+                raise DuplicatePartError(record['part_number'])
+            self._commit({'op': 'update', 'part_number': part_number, 'part': record})
+        return record
+
+    def update_many(self, parts, expected_versions=None):
+        expected_versions = expected_versions or {}
+        with self._writing():
+            records = []
+            for part in parts:
+                part_number = str(part['part_number'])
+                current = self._current(part_number, expected_versions.get(part_number))
+                records.append(new_record(part, current.get('version', 0) + 1))
+            if records:
+                self._commit({'op': 'update_many', 'parts': records})
+        return records
+
+    def mark_replaced(self, part_number, install_date, expected_version=None):
+        part_number = str(part_number)
+        with self._writing():
+            current = self._current(part_number, expected_version)
+            version = current.get('version', 0) + 1
+            self._commit({
+                'op': 'replaced', 'part_number': part_number,
+                'previous_install_date': current.get('install_date'),
+                'install_date': install_date, 'version': version
+            })
+        return dict(current, install_date=install_date, version=version)
+
+    def delete(self, part_number, expected_version=None):
+        part_number = str(part_number)
+        with self._writing():
+            self._current(part_number, expected_version)
+            self._commit({'op': 'delete', 'part_number': part_number})
+
+    def replace_all(self, parts):
+        with self._writing():
+            records = {}
+            for part in parts:
+                previous = self._parts.get(str(part['part_number']), {})
+                record = new_record(part, previous.get('version', 0) + 1)
+                records[record['part_number']] = record
+            records = list(records.values())
+            self._commit({'op': 'reset', 'parts': records})
+        self.compact(background=True)
+        return records
+
+
+class SqliteStorage(PartStorage):
+    """Storage SQLite: operasi per-record O(1) lewat primary key ``part_number``.
+
+    Operasi baca-ubah-tulis dijalankan dalam transaksi ``BEGIN IMMEDIATE``
+    sehingga penguncian antar proses ditangani SQLite sendiri.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS parts (
+            part_number TEXT PRIMARY KEY,
+            part_code TEXT,
+            machine_name TEXT,
+            material TEXT,
+            install_date TEXT,
+            recommended_usage NUMERIC,
+            category TEXT,
+            version INTEGER NOT NULL DEFAULT 1,
+            extra TEXT
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+    COLUMNS = PART_COLUMNS + ['version', 'extra']
+    BUSY_TIMEOUT = 30  # detik menunggu lock database dari proses lain
+
+    def __init__(self, db_file=DEFAULT_SQLITE_FILE):
+        self.db_file = db_file
+        # Streamlit menjalankan tiap session di thread berbeda; transaksi dikelola manual
+        self._conn = sqlite3.connect(
+            db_file, timeout=self.BUSY_TIMEOUT, check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.RLock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Aman di mode WAL: database tetap konsisten, hanya commit terakhir yang bisa hilang saat listrik mati
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        columns = [row[1] for row in self._select("PRAGMA table_info(parts)")]
+        if 'version' not in columns:
+            # Database dari versi sebelum ada nomor versi per record
+            self._conn.execute("ALTER TABLE parts ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        self._data_version = self._select("PRAGMA data_version")[0][0]
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            if self._conn.in_transaction:
+                yield
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _row(self, record):
+        extra = {k: v for k, v in record.items() if k not in self.COLUMNS}
+        values = [record.get(column) for column in PART_COLUMNS]
+        return values + [record['version'], json.dumps(extra, ensure_ascii=False) if extra else None]
+
+    def _record(self, row):
+        part = dict(zip(PART_COLUMNS + ['version'], row[:len(PART_COLUMNS) + 1]))
+        if row[-1]:
+            part.update(json.loads(row[-1]))
+        return part
+
+    def _select(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _get(self, part_number):
+        rows = self._select(
+            f"SELECT {', '.join(self.COLUMNS)} FROM parts WHERE part_number = ?", (part_number,)
+        )
+        return self._record(rows[0]) if rows else None
+
+    def _current(self, part_number, expected_version):
+        current = self._get(part_number)
+        if current is None:
+            raise KeyError(part_number)
+        _check_version(part_number, current, expected_version)
+        return current
+
+    def _insert_sql(self, conflict=""):
+        placeholders = ', '.join('?' * len(self.COLUMNS))
+        return f"INSERT {conflict} INTO parts ({', '.join(self.COLUMNS)}) VALUES ({placeholders})"
+
+    def refresh(self):
+        # data_version hanya berubah oleh commit dari koneksi lain
+        data_version = self._select("PRAGMA data_version")[0][0]
+        changed = data_version != self._data_version
+        self._data_version = data_version
+        return changed
+
+    def load_all(self):
+        rows = self._select(f"SELECT {', '.join(self.COLUMNS)} FROM parts ORDER BY rowid")
+        return [self._record(row) for row in rows]
+
+    def insert(self, part, version=1):
+        record = new_record(part, version)
+        try:
+            with self._transaction():
+                self._conn.execute(self._insert_sql(), self._row(record))
+        except sqlite3.IntegrityError:
+            raise DuplicatePartError(record['part_number'])
+        return record
+
+    def insert_many(self, parts):
+        inserted = []
+        sql = self._insert_sql("OR IGNORE")
+        with self._transaction():
+            for part in parts:
+                record = new_record(part, 1)
+                if self._conn.execute(sql, self._row(record)).rowcount:
+                    inserted.append(record)
+        return inserted
+
+    def update(self, part_number, part, expected_version=None):
+        part_number = str(part_number)
+        assignments = ', '.join(f"{column} = ?" for column in self.COLUMNS)
+        with self._transaction():
+            current = self._current(part_number, expected_version)
+            record = new_record(part, current['version'] + 1)
+            try:
+                self._conn.execute(
+                    f"UPDATE parts SET {assignments} WHERE part_number = ?",
+                    self._row(record) + [part_number]
+                )
+            except sqlite3.IntegrityError:
+                raise DuplicatePartError(record['part_number'])
+        return record
+
+    def update_many(self, parts, expected_versions=None):
+        expected_versions = expected_versions or {}
+        assignments = ', '.join(f"{column} = ?" for column in self.COLUMNS)
+        with self._transaction():
+            records = []
+            for part in parts:
+                part_number = str(part['part_number'])
+                current = self._current(part_number, expected_versions.get(part_number))
+                records.append(new_record(part, current['version'] + 1))
+            self._conn.executemany(
+                f"UPDATE parts SET {assignments} WHERE part_number = ?",
+                (self._row(record) + [record['part_number']] for record in records)
+            )
+        return records
+
+    def mark_replaced(self, part_number, install_date, expected_version=None):
+        part_number = str(part_number)
+        with self._transaction():
+            current = self._current(part_number, expected_version)
+            return self.update(part_number, dict(current, install_date=install_date))
+
+    def delete(self, part_number, expected_version=None):
+        part_number = str(part_number)
+        with self._transaction():
+            self._current(part_number, expected_version)
+            self._conn.execute("DELETE FROM parts WHERE part_number = ?", (part_number,))
+
+    def replace_all(self, parts):
+        with self._transaction():
+            versions = dict(self._conn.execute("SELECT part_number, version FROM parts").fetchall())
+            records = {}
+            for part in parts:
+                record = new_record(part, versions.get(str(part['part_number']), 0) + 1)
+                records[record['part_number']] = record
+            records = list(records.values())
+            self._conn.execute("DELETE FROM parts")
+            self._conn.executemany(self._insert_sql(), (self._row(r) for r in records))
+        return records
+
+    def count(self):
+        return self._select("SELECT COUNT(*) FROM parts")[0][0]
+
+    def get_meta(self, key):
+        rows = self._select("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def set_meta(self, key, value):
+        with self._transaction():
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+
+def migrate_json_to_sqlite(json_file, storage):
+    """Migrasi satu kali dari data JSON (snapshot + journal) ke ``SqliteStorage``.
+
+    Migrasi dilewati jika sudah pernah dijalankan atau database sudah berisi
+    data. File JSON tidak dihapus. Mengembalikan jumlah part yang dimigrasi.
+    """
+    if storage.get_meta('migrated_from') or storage.count():
+        return 0
+    if not os.path.exists(json_file):
+        return 0
+    parts = JsonStorage(json_file).load_all()
+    inserted = storage.insert_many(parts)
+    storage.set_meta('migrated_from', os.path.abspath(json_file))
+    return len(inserted)
+
+
+def open_storage(backend=None):
+    """Buat storage sesuai env ``PART_STORAGE`` (``json`` atau ``sqlite``)"""
+    backend = (backend or os.environ.get("PART_STORAGE", "json")).lower()
+    json_file = os.environ.get("PART_DATA_FILE", DEFAULT_JSON_FILE)
+    if backend == "json":
+        return JsonStorage(json_file)
+    if backend == "sqlite":
+        storage = SqliteStorage(os.environ.get("PART_DB_FILE", DEFAULT_SQLITE_FILE))
+        migrate_json_to_sqlite(json_file, storage)
+        return storage
+    raise ValueError(f"Backend storage tidak dikenal: {backend}")
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def make_part(part_number, **fields):
+    part = {
+        'part_number': part_number,
+        'part_code': f"CODE-{part_number}",
+        'machine_name': "Mesin A",
+        'material': "Steel",
+        'install_date': "2025-01-01",
+        'recommended_usage': 2000,
+        'category': "Mechanical",
+    }
+    part.update(fields)
+    return part
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # Riwayat penggantian dan hour meter per test, tidak menyentuh data di direktori kerja
+    monkeypatch.setenv("PART_HISTORY_DIR", str(tmp_path / "replacement_history"))
+    monkeypatch.setenv("PART_METER_DIR", str(tmp_path / "meter_data"))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def open_store(request, tmp_path):
+    """Pembuka storage ``request.param``; setiap panggilan instance baru atas file yang sama"""
+    from storage import JsonStorage, SqliteStorage
+
+    if request.param == "json":
+        return lambda: JsonStorage(str(tmp_path / "parts_data.json"))
+    return lambda: SqliteStorage(str(tmp_path / "parts_data.db"))
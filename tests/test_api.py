@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+
+import api
+from api import ApiClient, PartApi
+from conftest import make_part
+from fleet import Fleet
+from storage import JsonStorage
+
+
+@pytest.fixture
+def fleet(tmp_path):
+    fleet = Fleet(JsonStorage(str(tmp_path / "parts_data.json")))
+    fleet.insert_many([make_part("P1"), make_part("P2", machine_name="Mesin B")])
+    return fleet
+
+
+@pytest.fixture
+def client(fleet):
+    return ApiClient(PartApi(fleet=fleet))
+
+
+def test_part_lookup_and_not_modified(client):
+    response = client.get("/api/parts/P1")
+    assert response.status == HTTPStatus.OK
+    assert response.body['part_number'] == "P1" and response.body['version'] == 1
+
+    cached = client.get("/api/parts/P1", headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status == HTTPStatus.NOT_MODIFIED
+
+
+def test_etag_changes_after_write(client, fleet):
+    etag = client.get("/api/summary").headers['ETag']
+    fleet.update("P1", make_part("P1", material="Karet"), expected_version=1)
+    response = client.get("/api/summary", headers={'If-None-Match': etag})
+    assert response.status == HTTPStatus.OK and response.headers['ETag'] != etag
+
+
+def test_unknown_part_is_not_found(client):
+    response = client.get("/api/parts/TIDAK-ADA")
+    assert response.status == HTTPStatus.NOT_FOUND
+    assert "TIDAK-ADA" in response.body['error']
+
+
+def test_invalid_parameter_is_bad_request(client):
+    assert client.get("/api/parts", {'limit': 'banyak'}).status == HTTPStatus.BAD_REQUEST
+    assert client.get("/api/parts", {'status': 'Rusak'}).status == HTTPStatus.BAD_REQUEST
+
+
+def test_upsert_with_outdated_etag_is_precondition_failed(client, fleet):
+    etag = client.get("/api/summary").headers['ETag']
+    fleet.insert(make_part("P3"))
+    response = client.post("/api/parts", [make_part("P4")], headers={'If-Match': etag})
+    assert response.status == HTTPStatus.PRECONDITION_FAILED
+    assert "P4" not in fleet
+
+
+def test_upsert_conflicting_with_concurrent_write_is_conflict(client, fleet, monkeypatch):
+    apply_upsert = api.apply_upsert
+
+    def apply_after_other_writer(plan, target):
+        # Operator lain mengubah part di antara analisa dan penulisan rencana
+        target.update("P2", make_part("P2", material="Karet"), expected_version=1)
+        return apply_upsert(plan, target)
+
+    monkeypatch.setattr(api, "apply_upsert", apply_after_other_writer)
+    response = client.post("/api/parts", [make_part("P2", machine_name="Mesin C")])
+    assert response.status == HTTPStatus.CONFLICT
+    assert fleet.get("P2")['material'] == "Karet"
+
+
+def test_upsert_reports_new_and_changed_parts(client, fleet):
+    response = client.post("/api/parts", [make_part("P1"), make_part("P2", material="Karet"), make_part("P3")])
+    assert response.status == HTTPStatus.OK
+    assert (response.body['new'], response.body['changed'], response.body['unchanged']) == (1, 1, 1)
+    assert "P3" in fleet and fleet.get("P2")['material'] == "Karet"
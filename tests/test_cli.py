@@ -0,0 +1,11 @@
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+def test_import_cli_does_not_load_pandas():
+    # Parser harus bisa dibangun (``--help``) tanpa meng-import pandas/numpy
+    code = "import sys, cli; cli.build_parser(); print(sorted(m for m in ('pandas', 'numpy') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,64 @@
+import io
+
+import pytest
+
+from conftest import make_part
+from fleet import Fleet
+from importer import apply_upsert, plan_upsert
+from storage import JsonStorage, StaleRecordError
+
+HEADER = "part_number,part_code,machine_name,material,install_date,recommended_usage,category\n"
+
+
+def csv_source(*rows):
+    return io.StringIO(HEADER + "".join(",".join(str(value) for value in row) + "\n" for row in rows))
+
+
+@pytest.fixture
+def fleet(tmp_path):
+    fleet = Fleet(JsonStorage(str(tmp_path / "parts_data.json")))
+    fleet.insert_many([make_part("P1"), make_part("P2")])
+    return fleet
+
+
+def test_plan_classifies_rows_without_writing(fleet):
+    source = csv_source(
+        ("P1", "CODE-P1", "Mesin A", "Steel", "2025-01-01", 2000, "Mechanical"),  # tidak berubah
+        ("P2", "CODE-P2", "Mesin B", "Steel", "2025-01-01", 2000, "Mechanical"),  # berubah
+        ("P3", "CODE-P3", "Mesin A", "Steel", "2025-01-01", 2000, "Mechanical"),  # baru
+        ("P4", "CODE-P4", "Mesin A", "Steel", "bukan-tanggal", 2000, "Mechanical"),  # ditolak
+    )
+    plan = plan_upsert(source, fleet)
+    assert (plan.new, plan.changed, plan.unchanged, plan.rejected) == (1, 1, 1, 1)
+    assert list(plan.rejected_rows()['part_number']) == ["P4"]
+    assert fleet.get("P2")['machine_name'] == "Mesin A" and "P3" not in fleet
+
+
+def test_apply_writes_only_the_difference(fleet):
+    plan = plan_upsert(csv_source(
+        ("P1", "CODE-P1", "Mesin A", "Steel", "2025-01-01", 2000, "Mechanical"),
+        ("P2", "CODE-P2", "Mesin B", "Steel", "2025-01-01", 2000, "Mechanical"),
+        ("P3", "CODE-P3", "Mesin A", "Steel", "2025-01-01", 2000, "Mechanical"),
+    ), fleet)
+    apply_upsert(plan, fleet)
+    assert (plan.inserted, plan.updated) == (1, 1)
+    assert fleet.get("P1")['version'] == 1
+    assert fleet.get("P2")['machine_name'] == "Mesin B" and fleet.get("P2")['version'] == 2
+    assert "P3" in fleet
+
+
+def test_last_duplicate_row_wins(fleet):
+    plan = plan_upsert(csv_source(
+        ("P2", "CODE-P2", "Mesin B", "Steel", "2025-01-01", 2000, "Mechanical"),
+        ("P2", "CODE-P2", "Mesin C", "Steel", "2025-01-01", 2000, "Mechanical"),
+    ), fleet)
+    apply_upsert(plan, fleet)
+    assert fleet.get("P2")['machine_name'] == "Mesin C"
+
+
+def test_apply_rejects_plan_when_part_changed_meanwhile(fleet):
+    plan = plan_upsert(csv_source(("P2", "CODE-P2", "Mesin B", "Steel", "2025-01-01", 2000, "Mechanical")), fleet)
+    fleet.update("P2", make_part("P2", material="Karet"), expected_version=1)
+    with pytest.raises(StaleRecordError):
+        apply_upsert(plan, fleet)
+    assert fleet.get("P2")['material'] == "Karet"
@@ -0,0 +1,64 @@
+import pytest
+
+from conftest import make_part
+from storage import DuplicatePartError, StaleRecordError
+
+
+def by_number(parts):
+    return sorted(parts, key=lambda part: part['part_number'])
+
+
+def test_insert_sets_version_and_rejects_duplicate(open_store):
+    store = open_store()
+    record = store.insert(make_part("P1"))
+    assert record['version'] == 1
+    with pytest.raises(DuplicatePartError):
+        store.insert(make_part("P1"))
+
+
+def test_insert_many_skips_existing_numbers(open_store):
+    store = open_store()
+    store.insert(make_part("P1"))
+    stored = store.insert_many([make_part("P1"), make_part("P2"), make_part("P3")])
+    assert sorted(record['part_number'] for record in stored) == ["P2", "P3"]
+    numbers = [part['part_number'] for part in store.load_all()]
+    assert len(numbers) == len(set(numbers)) == 3
+
+
+def test_update_bumps_version_and_rejects_stale_write(open_store):
+    store = open_store()
+    store.insert(make_part("P1", counter=0))
+    updated = store.update("P1", make_part("P1", counter=1), expected_version=1)
+    assert updated['version'] == 2
+    with pytest.raises(StaleRecordError):
+        store.update("P1", make_part("P1", counter=99), expected_version=1)
+    assert next(p for p in store.load_all() if p['part_number'] == "P1")['counter'] == 1
+
+
+def test_concurrent_instances_do_not_lose_updates(open_store):
+    first, second = open_store(), open_store()
+    first.insert(make_part("HOT", counter=0))
+    second.refresh()
+    for store in (first, second, first, second):
+        store.refresh()
+        current = next(p for p in store.load_all() if p['part_number'] == "HOT")
+        store.update("HOT", dict(current, counter=current['counter'] + 1), expected_version=current['version'])
+    first.refresh()
+    assert next(p for p in first.load_all() if p['part_number'] == "HOT")['counter'] == 4
+
+
+def test_reload_from_disk_matches_memory(open_store):
+    store = open_store()
+    store.insert_many([make_part(f"P{n}") for n in range(20)])
+    store.update("P3", make_part("P3", material="Karet"), expected_version=1)
+    store.mark_replaced("P4", "2025-06-01")
+    store.delete("P5")
+    assert by_number(open_store().load_all()) == by_number(store.load_all())
+
+
+def test_replace_all_keeps_version_sequence(open_store):
+    store = open_store()
+    store.insert(make_part("P1"))
+    records = store.replace_all([make_part("P1"), make_part("P2")])
+    assert {record['part_number']: record['version'] for record in records} == {"P1": 2, "P2": 1}
+    assert by_number(open_store().load_all()) == by_number(records)